@@ -5,22 +5,64 @@ Provides all the main functional classes for analyzing HAR files
 
 import functools
 import datetime
+import heapq
+import itertools
 import json
+import operator
 import re
-from typing import List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Union
 
-from collections import Counter
+from collections import Counter, OrderedDict
 from functools import cached_property
 
-# I know this import is stupid, but I cannot use dateutil.parser without it
-from dateutil import parser
-
+from .columns import EntryColumns, EntryView
 from .errors import PageNotFoundError
 from .http import Request, Response
+from .indexes import EntryIndex
+from .initiators import DependencyGraph
+from .timeline import (
+    EntryOffsets,
+    IntervalTree,
+    bucket_activity,
+    concurrency_profile,
+    idle_periods,
+    duration_to_microseconds,
+    entry_intervals,
+    merge_intervals,
+    parse_timestamp,
+    timestamp_to_microseconds,
+    to_milliseconds,
+    union_length,
+)
 from .mixins import MimicDict
+from .waterfall import Waterfall
 
 DECIMAL_PRECISION = 0
 
+#: Criteria of ``HarPage.filter_entries`` that ``HarPage.get_load_time``
+#: takes, any other keyword argument is ignored
+LOAD_TIME_CRITERIA = (
+    "request_type",
+    "content_type",
+    "status_code",
+    "http_version",
+    "load_time__gt",
+    "regex",
+    "url",
+    "host",
+    "request_header",
+    "response_header",
+)
+
+
+def _freeze(value):
+    """Hashable version of a filter criterion, for memo keys"""
+    if isinstance(value, dict):
+        return tuple(sorted(value.items()))
+    if isinstance(value, list):
+        return tuple(value)
+    return value
+
 
 def convert_to_entry(func):
     """Wrapper function for converting dicts of entries to HarEnrty Objects"""
@@ -38,6 +80,7 @@ def convert_to_entry(func):
 
 
 class HarParser:
+    # pylint: disable=R0904
     """
     A Basic HAR parser that also adds helpful stuff for analyzing the
     performance of a web page.
@@ -116,11 +159,12 @@ class HarParser:
             )
 
         # TODO - headers are empty in some HAR data.... need fallbacks here
-        for h in getattr(entry, header_type).headers:
-            if h["name"].lower() == header.lower() and h["value"] is not None:
-                if regex and re.search(value, h["value"], flags=re.IGNORECASE):
+        header_index = getattr(entry, header_type).header_index
+        for header_value in header_index.get(header.lower(), []):
+            if header_value is not None:
+                if regex and re.search(value, header_value, flags=re.IGNORECASE):
                     return True
-                if value == h["value"]:
+                if value == header_value:
                     return True
         return False
 
@@ -225,6 +269,48 @@ class HarParser:
             return re.search(status_code, str(entry.response.status)) is not None
         return str(entry.response.status) == status_code
 
+    @staticmethod
+    @convert_to_entry
+    def match_url(entry: "HarEntry", url: str, regex: bool = True) -> bool:
+        """
+        Helper function that returns entries with a request URL matching
+        the given `url` argument. The regex search is case-sensitive because
+        URL paths are.
+
+        :param entry: Entry to analyze
+        :type entry: HarEntry
+        :param url: URL to match
+        :type url: str
+        :param regex: Whether to use a regex or string match
+        :type regex: bool
+        :return: URL matches
+        :rtype: bool
+        """
+        if regex:
+            return re.search(url, entry.request.url) is not None
+        return entry.request.url == url
+
+    @staticmethod
+    @convert_to_entry
+    def match_host(entry: "HarEntry", host: str, regex: bool = True) -> bool:
+        """
+        Helper function that returns entries with a host (taken from the
+        request URL) matching the given `host` argument.
+
+        :param entry: Entry to analyze
+        :type entry: HarEntry
+        :param host: Host to match
+        :type host: str
+        :param regex: Whether to use a regex or string match
+        :type regex: bool
+        :return: Host matches
+        :rtype: bool
+        """
+        hostname = entry.request.hostname or ""
+        if regex:
+            return re.search(host, hostname, flags=re.IGNORECASE) is not None
+        return hostname == host.lower()
+
     @staticmethod
     def create_asset_timeline(asset_list: List["HarEntry"]) -> dict:
         """
@@ -233,6 +319,9 @@ class HarParser:
         one of the requested assets was loaded. The value is a `list` of ALL
         assets that were loading at that time.
 
+        This creates one key for every millisecond an asset was loading, so
+        use ``get_asset_load_time`` if you only need the total load time.
+
         :param asset_list: The assets to create a timeline for.
         :type asset_list: List[HarEntry]
         :return: Milliseconds and assets that were loaded
@@ -259,6 +348,162 @@ class HarParser:
 
         return results
 
+    @staticmethod
+    def get_asset_load_time(asset_list: List["HarEntry"]) -> Union[int, float]:
+        """
+        Returns how long at least one of the assets was loading, in ms. This
+        is the length of the union of each asset's ``[start, start + time)``
+        interval, found by sorting the intervals and sweeping over them once,
+        so it doesn't depend on how long the requests took like
+        ``create_asset_timeline`` does. It is exact to the microsecond.
+
+        :param asset_list: The assets to get the load time of.
+        :type asset_list: List[HarEntry]
+        :return: Load time in ms, an ``int`` when it is a whole number
+        :rtype: Union[int, float]
+        """
+        return to_milliseconds(union_length(entry_intervals(asset_list)))
+
+    @cached_property
+    def index(self) -> EntryIndex:
+        """
+        Inverted indexes over all entries of the HAR file. Each index
+        (host, mime type, method, status and path) is built on first use.
+
+        :return: Index of the entries
+        :rtype: EntryIndex
+        """
+        return EntryIndex(self.har_data["entries"])
+
+    def find_entries(
+        self,
+        host: Union[str, Iterable[str]] = None,
+        path_prefix: str = None,
+        mime_type: Union[str, Iterable[str]] = None,
+        method: Union[str, Iterable[str]] = None,
+        status: Union[int, Iterable[int]] = None,
+    ) -> List["HarEntry"]:
+        # pylint: disable=R0913
+        """
+        Exact match lookup of entries using the indexes in ``self.index``,
+        which is much faster than ``HarPage.filter_entries`` for repeated
+        queries on large files. All criteria must match, and every criterion
+        besides ``path_prefix`` also accepts a collection of values, e.g.
+        ``find_entries(host="cdn.example.com", status=range(500, 600))``.
+
+        :param host: Host of the request URL
+        :type host: Union[str, Iterable[str]]
+        :param path_prefix: Prefix of the request URL path, matched on whole
+            path segments
+        :type path_prefix: str
+        :param mime_type: Mime type of the response, without parameters
+        :type mime_type: Union[str, Iterable[str]]
+        :param method: Request method
+        :type method: Union[str, Iterable[str]]
+        :param status: Response status
+        :type status: Union[int, Iterable[int]]
+        :return: Matching entries in the order of the HAR file
+        :rtype: List[HarEntry]
+        """
+        raw_entries = self.har_data["entries"]
+        rows = self.index.lookup(
+            host=host,
+            path_prefix=path_prefix,
+            mime_type=mime_type,
+            method=method,
+            status=status,
+        )
+        return [HarEntry(raw_entries[row], self.offsets) for row in rows]
+
+    @cached_property
+    def offsets(self) -> EntryOffsets:
+        """
+        Start and end of every entry as integer microseconds, parsed once
+        for all pages and entries of the HAR file
+
+        :return: Entry offsets
+        :rtype: EntryOffsets
+        """
+        return EntryOffsets(self.har_data["entries"], self.har_data.get("pages", []))
+
+    @cached_property
+    def columns(self) -> EntryColumns:
+        """
+        Columnar view of all entries of the HAR file, used for fast filtering
+
+        :return: Entry columns
+        :rtype: EntryColumns
+        """
+        return EntryColumns(
+            self.har_data["entries"],
+            wrap=functools.partial(HarEntry, offsets=self.offsets),
+            offsets=self.offsets,
+        )
+
+    def filter_entries(
+        self,
+        page_id: str = None,
+        request_type: str = None,
+        content_type: str = None,
+        status_code: str = None,
+        http_version: str = None,
+        load_time__gt: int = None,
+        regex: bool = True,
+        url: str = None,
+        host: str = None,
+        request_header: Dict[str, str] = None,
+        response_header: Dict[str, str] = None,
+    ) -> EntryView:
+        # pylint: disable=R0913
+        """
+        Same criteria as ``HarPage.filter_entries``, but evaluated as masks
+        over ``self.columns`` for all entries of the file at once. Regexes are
+        only run once per distinct value, which makes this the right choice
+        for large files.
+
+        :param page_id: Only include entries of this page
+        :type page_id: str
+        :param request_type: The request type (i.e. - GET or POST)
+        :type request_type: str
+        :param content_type: Regex to use for finding content type
+        :type content_type: str
+        :param status_code: The desired status code
+        :type status_code: str
+        :param http_version: HTTP version of request
+        :type http_version: str
+        :param load_time__gt: Load time in milliseconds. If
+            provided, an entry whose load time is less than this value will
+            be excluded from the results.
+        :type load_time__gt: int
+        :param regex: Whether to use regex or exact match.
+        :type regex: bool
+        :param url: The request URL
+        :type url: str
+        :param host: The host of the request URL
+        :type host: str
+        :param request_header: Request header names and the values they
+            must match. Every header given must match.
+        :type request_header: Dict[str, str]
+        :param response_header: Response header names and the values they
+            must match. Every header given must match.
+        :type response_header: Dict[str, str]
+        :return: Lazy sequence of the matching entries in the order of the file
+        :rtype: EntryView
+        """
+        return self.columns.filter(
+            page_id=page_id,
+            request_type=request_type,
+            content_type=content_type,
+            status_code=status_code,
+            http_version=http_version,
+            load_time__gt=load_time__gt,
+            regex=regex,
+            url=url,
+            host=host,
+            request_header=request_header,
+            response_header=response_header,
+        )
+
     @property
     def pages(self) -> List["HarPage"]:
         """
@@ -268,16 +513,22 @@ class HarParser:
         :return: HarPages in the file
         :rtype: List[HarPage]
         """
+        return list(self.iter_pages())
+
+    def iter_pages(self) -> Iterator["HarPage"]:
+        """
+        Generator of the HarPage objects of the HAR file, created one at a
+        time as they are consumed.
+
+        :return: HarPages in the file
+        :rtype: Iterator[HarPage]
+        """
         # Start with a page object for unknown entries if the HAR data has
         # any entries with no page ID
-        pages = []
         if any("pageref" not in entry for entry in self.har_data["entries"]):
-            pages.append(HarPage("unknown", har_parser=self))
+            yield HarPage("unknown", har_parser=self)
         for har_page in self.har_data.get("pages", []):
-            page = HarPage(har_page["id"], har_parser=self)
-            pages.append(page)
-
-        return pages
+            yield HarPage(har_page["id"], har_parser=self)
 
     @property
     def browser(self) -> str:
@@ -322,11 +573,14 @@ class HarParser:
 
 
 class HarPage:
-    # pylint: disable=R0904
+    # pylint: disable=R0902,R0904
     """
     An object representing one page of a HAR resource
     """
 
+    #: Number of ``get_load_time`` criteria to keep the matching entries of
+    load_time_cache_size = 128
+
     def __init__(
         self, page_id: str, har_parser: "HarParser" = None, har_data: dict = None
     ):
@@ -340,6 +594,7 @@ class HarPage:
         """
         self.page_id = page_id
         self._index = 0
+        self._load_time_slices = OrderedDict()
         if har_parser is None and har_data is None:
             raise ValueError("Either parser or har_data is required")
         if har_parser:
@@ -465,8 +720,12 @@ class HarPage:
         http_version: str = None,
         load_time__gt: int = None,
         regex: bool = True,
+        url: str = None,
+        host: str = None,
+        request_header: Dict[str, str] = None,
+        response_header: Dict[str, str] = None,
     ) -> List["HarEntry"]:
-        # pylint: disable=R0913,W0105
+        # pylint: disable=R0912,R0913,R0914,W0105
         """
         Generate a list of entries with from criteria
 
@@ -484,12 +743,74 @@ class HarPage:
         :type load_time__gt: int
         :param regex: Whether to use regex or exact match.
         :type regex: bool
+        :param url: The request URL
+        :type url: str
+        :param host: The host of the request URL
+        :type host: str
+        :param request_header: Request header names and the values they
+            must match. Every header given must match.
+        :type request_header: Dict[str, str]
+        :param response_header: Response header names and the values they
+            must match. Every header given must match.
+        :type response_header: Dict[str, str]
         :return: List of entry objects based on the filtered criteria.
         :rtype: List[HarEntry]
         """
-        results = []
+        return list(
+            self._ifilter(
+                self.entries,
+                request_type=request_type,
+                content_type=content_type,
+                status_code=status_code,
+                http_version=http_version,
+                load_time__gt=load_time__gt,
+                regex=regex,
+                url=url,
+                host=host,
+                request_header=request_header,
+                response_header=response_header,
+            )
+        )
 
-        for entry in self.entries:
+    def ifilter_entries(self, sort: bool = False, **kwargs) -> Iterator["HarEntry"]:
+        """
+        Generator version of ``filter_entries``. It takes the same criteria,
+        but streams the entries from ``iter_entries`` and never keeps a list
+        of them, which is what you want in long-lived processes that go
+        through a lot of HAR files.
+
+        :param sort: Whether to yield the entries chronologically
+        :type sort: bool
+        :return: Entries matching the criteria
+        :rtype: Iterator[HarEntry]
+        """
+        return self._ifilter(self.iter_entries(sort=sort), **kwargs)
+
+    def _ifilter(
+        self,
+        entries: Iterable["HarEntry"],
+        request_type: str = None,
+        content_type: str = None,
+        status_code: str = None,
+        http_version: str = None,
+        load_time__gt: int = None,
+        regex: bool = True,
+        url: str = None,
+        host: str = None,
+        request_header: Dict[str, str] = None,
+        response_header: Dict[str, str] = None,
+    ) -> Iterator["HarEntry"]:
+        # pylint: disable=R0912,R0913,R0914,W0105
+        """
+        Yields the ``entries`` matching the criteria of ``filter_entries``
+        """
+        header_criteria = [
+            ("request", name, value) for name, value in (request_header or {}).items()
+        ] + [
+            ("response", name, value) for name, value in (response_header or {}).items()
+        ]
+
+        for entry in entries:
             """
             So yea... this is a bit ugly. We are looking for:
 
@@ -497,6 +818,8 @@ class HarPage:
                 * The content type using self._match_headers()
                 * The HTTP response status code using self._match_status_code()
                 * The HTTP version using self._match_headers()
+                * The URL and host using self._match_url() and self._match_host()
+                * Any headers using self._match_headers()
 
             Oh lords of python.... please forgive my soul
             """
@@ -519,11 +842,18 @@ class HarPage:
                 valid_entry = False
             if load_time__gt is not None and entry.time < load_time__gt:
                 valid_entry = False
+            if host is not None and not p.match_host(entry, host, regex=regex):
+                valid_entry = False
+            if url is not None and not p.match_url(entry, url, regex=regex):
+                valid_entry = False
+            for header_type, header, value in header_criteria:
+                if not valid_entry:
+                    break
+                if not p.match_headers(entry, header_type, header, value, regex=regex):
+                    valid_entry = False
 
             if valid_entry:
-                results.append(entry)
-
-        return results
+                yield entry
 
     def get_load_time(
         self,
@@ -548,6 +878,10 @@ class HarPage:
         self.get_load_time(content_types=['image']) (returns 2)
         self.get_load_time(content_types=['image'], asynchronous=False) (returns 4)
 
+        The matching entries and the union of their intervals are memoized
+        per page for the last ``load_time_cache_size`` criteria, so repeated
+        criteria don't filter the entries again.
+
         :param request_type: The request type (i.e. - GET or POST)
         :type request_type: str
         :param content_type: Regex to use for finding content type
@@ -556,23 +890,334 @@ class HarPage:
         :type status_code: str
         :param asynchronous: Whether to separate load times
         :type asynchronous: bool
+        :param kwargs: Any other criteria of ``filter_entries``, see
+            ``LOAD_TIME_CRITERIA``. Other keyword arguments are ignored.
         :return: Total load time
         :rtype: int
         """
-        entries = self.filter_entries(
+        asynchronous = kwargs.pop("async", asynchronous)
+        entries, intervals = self._load_time_slice(
             request_type=request_type,
             content_type=content_type,
             status_code=status_code,
+            **kwargs,
         )
-
-        asynchronous = kwargs.get("async", asynchronous)
-
         if not asynchronous:
             time = 0
             for entry in entries:
                 time += entry.time
             return time
-        return len(self.parser.create_asset_timeline(entries))
+        return to_milliseconds(sum(end - start for start, end in intervals))
+
+    def get_combined_load_time(
+        self, *criteria: dict, asynchronous: bool = True
+    ) -> Union[int, float]:
+        """
+        Load time of the entries matching any of the criteria, e.g. images
+        or CSS. Combined from the memoized interval unions of each criteria,
+        so slices already used with ``get_load_time`` aren't filtered again.
+
+        :param criteria: Keyword arguments of ``get_load_time`` for each
+            slice, e.g. ``{"content_type": "image.*"}``
+        :type criteria: dict
+        :param asynchronous: Whether to separate load times
+        :type asynchronous: bool
+        :return: Total load time
+        :rtype: Union[int, float]
+        """
+        slices = [self._load_time_slice(**arguments) for arguments in criteria]
+        if not asynchronous:
+            unique = {id(entry): entry for entries, _ in slices for entry in entries}
+            return sum(entry.time for entry in unique.values())
+        return to_milliseconds(
+            union_length(itertools.chain.from_iterable(merged for _, merged in slices))
+        )
+
+    def _load_time_slice(self, **criteria) -> tuple:
+        """
+        :param criteria: Criteria of ``filter_entries``, the ones not in
+            ``LOAD_TIME_CRITERIA`` are ignored
+        :return: The entries matching the criteria and the union of their
+            intervals, from a bounded LRU memo keyed by the criteria
+        :rtype: Tuple[List[HarEntry], List[Tuple[int, int]]]
+        """
+        criteria = {
+            name: value
+            for name, value in criteria.items()
+            if name in LOAD_TIME_CRITERIA
+        }
+        criteria.setdefault("regex", True)
+        key = tuple(
+            sorted(
+                (name, _freeze(value))
+                for name, value in criteria.items()
+                if value is not None
+            )
+        )
+        cached = self._load_time_slices.get(key)
+        if cached is not None:
+            self._load_time_slices.move_to_end(key)
+            return cached
+        entries = self.filter_entries(**criteria)
+        cached = (entries, merge_intervals(entry_intervals(entries)))
+        self._load_time_slices[key] = cached
+        while len(self._load_time_slices) > self.load_time_cache_size:
+            self._load_time_slices.popitem(last=False)
+        return cached
+
+    def get_asset_type(self, entry: "HarEntry") -> str:
+        """
+        Returns the first asset type in ``self.asset_types`` whose regex
+        matches the mime type of the entry.
+
+        :param entry: Entry to get the asset type of
+        :type entry: HarEntry
+        :return: Asset type, ``other`` if none match
+        :rtype: str
+        """
+        for asset_type, content_type in self.asset_types.items():
+            if self.parser.match_content_type(entry, content_type):
+                return asset_type
+        return "other"
+
+    def _group_entries(self, group_by: str) -> Dict[str, List["HarEntry"]]:
+        """
+        :param group_by: ``host`` or ``asset_type``
+        :type group_by: str
+        :return: Entries of the page grouped by host or asset type
+        :rtype: Dict[str, List[HarEntry]]
+        """
+        if group_by == "host":
+            key_func = operator.attrgetter("request.hostname")
+        elif group_by == "asset_type":
+            key_func = self.get_asset_type
+        else:
+            raise ValueError("group_by should be either:\n\n* 'host'\n* 'asset_type'")
+        groups = {}
+        for entry in self.entries:
+            groups.setdefault(key_func(entry), []).append(entry)
+        return groups
+
+    def concurrency_profile(self, group_by: str = None) -> dict:
+        """
+        Number of requests in flight over time, from one sweep over the
+        sorted start and end times of the entries.
+
+        :param group_by: Return a profile per ``host`` or ``asset_type``
+            instead of one for the whole page
+        :type group_by: str
+        :return: ``steps``, a list of ``(offset, count)`` with the offset in
+            ms from the start of the page, where each count lasts until the
+            next step. Also the ``peak`` and time weighted ``mean``
+            concurrency, and ``time_at_level``, the ms spent at each count.
+            When grouping, a ``dict`` of these per group.
+        :rtype: dict
+        """
+        if group_by is None:
+            return concurrency_profile(entry_intervals(self.entries), self._origin)
+        return {
+            group: concurrency_profile(entry_intervals(entries), self._origin)
+            for group, entries in self._group_entries(group_by).items()
+        }
+
+    def active_at(self, time: Union[int, float]) -> List["HarEntry"]:
+        """
+        Entries in flight at a point in time, from ``interval_tree``.
+
+        :param time: Time in ms from the start of the page
+        :type time: Union[int, float]
+        :return: Entries that started at or before ``time`` and had not
+            finished yet, in start order
+        :rtype: List[HarEntry]
+        """
+        return self.interval_tree.active_at(self._offset_to_microseconds(time))
+
+    def overlapping(
+        self,
+        start: Union["HarEntry", int, float],
+        end: Union[int, float] = None,
+    ) -> List["HarEntry"]:
+        """
+        Entries in flight during a window, or during another entry, from
+        ``interval_tree``.
+
+        :param start: Start of the window in ms from the start of the page,
+            or an entry to use the start and end of
+        :type start: Union[HarEntry, int, float]
+        :param end: End of the window in ms from the start of the page,
+            excluded. Not used when ``start`` is an entry.
+        :type end: Union[int, float]
+        :return: Entries overlapping the window, in start order. When
+            ``start`` is an entry, the entry itself is left out.
+        :rtype: List[HarEntry]
+        """
+        if isinstance(start, HarEntry):
+            if start.start_us is None:
+                return []
+            window = entry_intervals([start])[0]
+            return [
+                entry
+                for entry in self.interval_tree.overlapping(
+                    window[0], max(window[1], window[0] + 1)
+                )
+                if entry.raw_entry is not start.raw_entry
+            ]
+        if end is None:
+            raise ValueError("Give the end of the window, or an entry")
+        start = self._offset_to_microseconds(start)
+        end = self._offset_to_microseconds(end)
+        return self.interval_tree.overlapping(start, max(end, start + 1))
+
+    def _offset_to_microseconds(self, time: Union[int, float]) -> int:
+        """
+        :param time: Time in ms from the start of the page
+        :type time: Union[int, float]
+        :return: Microseconds since the epoch
+        :rtype: int
+        """
+        return self._origin + int(round(time * 1000))
+
+    def network_idle_periods(self, min_gap_ms: Union[int, float] = 0) -> dict:
+        """
+        Periods without any request in flight between the start of the page
+        and the end of the last response, from one sort and sweep over the
+        entry intervals.
+
+        :param min_gap_ms: Shortest gap in ms to report as an idle period,
+            and how long the network has to stay quiet after ``onLoad``
+        :type min_gap_ms: Union[int, float]
+        :return: ``periods``, the ``(start, end)`` of each idle period in ms
+            from the start of the page, the total ``busy`` and ``idle`` ms,
+            and ``network_quiet``, the first point after ``onLoad`` when no
+            request is in flight and none starts for ``min_gap_ms``, which
+            is when long polling and beacons stop. ``network_quiet`` is
+            ``None`` when the page has no ``onLoad`` time.
+        :rtype: dict
+        """
+        on_load = None
+        if self.page_id != "unknown":
+            on_load = self.pageTimings.get("onLoad")
+        return idle_periods(
+            entry_intervals(self.entries),
+            self._origin,
+            duration_to_microseconds(min_gap_ms),
+            (
+                None
+                if on_load is None or on_load < 0
+                else self._origin + duration_to_microseconds(on_load)
+            ),
+        )
+
+    def timing_breakdown(
+        self, percentiles: Iterable[float] = (50, 75, 90, 95, 99)
+    ) -> dict:
+        """
+        Totals, percentiles and per host and asset type splits of the time
+        the entries spent in each ``timings`` phase, computed over the
+        columns of ``HarParser.columns`` rather than entry by entry.
+
+        :param percentiles: Percentiles to compute, between 0 and 100
+        :type percentiles: Iterable[float]
+        :return: See ``EntryColumns.timing_breakdown``
+        :rtype: dict
+        """
+        columns = self.parser.columns
+        return columns.timing_breakdown(
+            columns.mask(page_id=self.page_id), self.asset_types, percentiles
+        )
+
+    def timeline_buckets(
+        self, resolution: Union[int, float] = 100, entries: List["HarEntry"] = None
+    ) -> dict:
+        """
+        Activity of the page in fixed width buckets, e.g. for charts. Unlike
+        ``HarParser.create_asset_timeline`` it doesn't create an object per
+        millisecond, so it also works for hour long sessions.
+
+        :param resolution: Width of each bucket in ms, e.g. 1, 10, 100 or 1000
+        :type resolution: Union[int, float]
+        :param entries: Entries to bucket, all entries of the page by default
+        :type entries: List[HarEntry]
+        :return: The ``resolution``, and ``bytes`` received, ``active``
+            requests and request ``starts`` per bucket, the first bucket
+            beginning at the start of the page. Bytes are the transferred
+            size, spread evenly over the receive phase of each request. The
+            buckets are NumPy arrays when NumPy is installed and
+            ``array.array`` otherwise.
+        :rtype: dict
+        """
+        records = []
+        for entry in self.entries if entries is None else entries:
+            if entry.start_us is None:
+                continue
+            start, end = entry.start_us, entry.end_us
+            receive = duration_to_microseconds(entry.timings.get("receive", 0))
+            records.append((start, end, end - receive, entry.response.transferSize))
+        buckets = bucket_activity(
+            records, self._origin, duration_to_microseconds(resolution)
+        )
+        buckets["resolution"] = resolution
+        return buckets
+
+    def waterfall(self, entries: List["HarEntry"] = None) -> Waterfall:
+        """
+        Packs the waterfall of the page into flat arrays with a string table
+        of the URLs, which is cheap to render and to serialize with
+        ``to_bytes`` or ``to_json``.
+
+        :param entries: Entries to include, all entries of the page by default
+        :type entries: List[HarEntry]
+        :return: Start offset in ms from the page start and the duration of
+            each timing phase of every entry
+        :rtype: Waterfall
+        """
+        entries = self.entries if entries is None else entries
+        return Waterfall.from_entries(
+            (entry for entry in entries if entry.start_us is not None), self._origin
+        )
+
+    def critical_path(self) -> dict:
+        """
+        The request chain with the longest total time, following the
+        initiator of each entry (Chrome only) through ``dependency_graph``.
+
+        :return: The ``entries`` of the chain from the first request, their
+            total ``time``, the ``start`` and ``end`` of the chain in ms from
+            the start of the page, and the ms of ``page_load_time`` during
+            which a request of the chain was loading as
+            ``load_time_contribution`` and as a ``load_time_share``. The
+            last two are ``None`` when the page has no load time.
+        :rtype: dict
+        """
+        chain = [
+            self.dependency_graph.entries[index]
+            for index in self.dependency_graph.critical_path()
+        ]
+        intervals = entry_intervals(chain)
+        result = {
+            "entries": chain,
+            "time": sum(max(entry.time, 0) for entry in chain),
+            "start": None,
+            "end": None,
+            "load_time_contribution": None,
+            "load_time_share": None,
+        }
+        if intervals:
+            result["start"] = to_milliseconds(intervals[0][0] - self._origin)
+            result["end"] = to_milliseconds(
+                max(end for _, end in intervals) - self._origin
+            )
+        if self.page_load_time:
+            load_end = self._origin + duration_to_microseconds(self.page_load_time)
+            contribution = to_milliseconds(
+                union_length(
+                    (max(start, self._origin), min(end, load_end))
+                    for start, end in intervals
+                )
+            )
+            result["load_time_contribution"] = contribution
+            result["load_time_share"] = contribution / self.page_load_time
+        return result
 
     @staticmethod
     def get_total_size(entries: List["HarEntry"]) -> int:
@@ -608,6 +1253,15 @@ class HarPage:
 
     # BEGIN PROPERTIES #
 
+    @cached_property
+    def _origin(self) -> int:
+        """
+        :return: Start of the page in microseconds since the epoch. The
+            unknown page has no start, so its first entry is used.
+        :rtype: int
+        """
+        return self.parser.offsets.page_origin(self.page_id)
+
     @cached_property
     def hostname(self) -> str:  # pylint: disable=R1710
         """
@@ -639,17 +1293,67 @@ class HarPage:
         :return: All entries that make up the page
         :rtype: List[HarEntry]
         """
-        page_entries = []
-        for entry in self.parser.har_data["entries"]:
-            if "pageref" not in entry:
-                if self.page_id == "unknown":
-                    page_entries.append(HarEntry(entry))
-            elif entry["pageref"] == self.page_id:
-                page_entries.append(HarEntry(entry))
-        # Make sure the entries are sorted chronologically
-        if all(x.startTime for x in page_entries):
-            return sorted(page_entries, key=lambda entry: entry.startTime)
-        return page_entries
+        return list(self.iter_entries(sort=True))
+
+    def iter_entries(self, sort: bool = False) -> Iterator["HarEntry"]:
+        """
+        Generator of the entries that make up the page. Unlike ``entries``,
+        nothing is cached, so the entries can be garbage collected as soon as
+        the caller is done with them.
+
+        :param sort: Yield the entries chronologically instead of in the
+            order of the HAR file. Entries are usually recorded almost in
+            order, so this merges the already sorted runs of entries rather
+            than sorting them all over again.
+        :type sort: bool
+        :return: Entries of the page
+        :rtype: Iterator[HarEntry]
+        """
+        page_entries = (
+            HarEntry(entry, self.parser.offsets)
+            for entry in self.parser.har_data["entries"]
+            if entry.get("pageref") == self.page_id
+            or (self.page_id == "unknown" and "pageref" not in entry)
+        )
+        if not sort:
+            yield from page_entries
+            return
+
+        runs = []
+        previous = None
+        for entry in page_entries:
+            start_time = entry.start_us
+            if start_time is None:
+                # Without start times there is nothing to sort on, so fall
+                # back on the order of the HAR file
+                yield from itertools.chain(*runs, [entry], page_entries)
+                return
+            if previous is None or start_time < previous:
+                runs.append([])
+            runs[-1].append(entry)
+            previous = start_time
+        # Ties are resolved in the order of the runs, so this is stable
+        yield from heapq.merge(*runs, key=operator.attrgetter("start_us"))
+
+    @cached_property
+    def dependency_graph(self) -> DependencyGraph:
+        """
+        :return: Which entry of the page started which, from the
+            ``initiator`` of each entry (Chrome only) and redirects
+        :rtype: DependencyGraph
+        """
+        return DependencyGraph(self.entries)
+
+    @cached_property
+    def interval_tree(self) -> IntervalTree:
+        """
+        :return: Interval tree over the ``[start, start + time)`` of the
+            entries with a start time, in microseconds since the epoch,
+            returning the entries themselves
+        :rtype: IntervalTree
+        """
+        entries = [entry for entry in self.entries if entry.start_us is not None]
+        return IntervalTree(entry_intervals(entries), entries)
 
     @cached_property
     def time_to_first_byte(self) -> Optional[int]:
@@ -1023,12 +1727,22 @@ class HarPage:
 
 
 class HarEntry(MimicDict):
+    # pylint: disable=R0904
     """
     An object that represent one entry in a HAR Page
     """
 
-    def __init__(self, entry: dict):
+    def __init__(self, entry: dict, offsets: EntryOffsets = None):
+        """
+        :param entry: Raw entry
+        :type entry: dict
+        :param offsets: Offsets of the entries of the HAR file the entry is
+            from, which ``start_us`` and the other offsets are read from
+            instead of parsing ``startedDateTime``
+        :type offsets: EntryOffsets
+        """
         self.raw_entry = entry
+        self._offsets = offsets
         super().__init__()
 
     def __str__(self):
@@ -1062,10 +1776,85 @@ class HarEntry(MimicDict):
         :return: Start time of entry
         :rtype: Optional[datetime.datetime]
         """
-        try:
-            return parser.parse(self.raw_entry.get("startedDateTime", ""))
-        except parser._parser.ParserError:
+        return parse_timestamp(self.raw_entry.get("startedDateTime", ""))
+
+    @cached_property
+    def _position(self) -> Optional[int]:
+        """
+        :return: Position of the entry in ``self._offsets``
+        :rtype: Optional[int]
+        """
+        if self._offsets is None:
             return None
+        return self._offsets.position(self.raw_entry)
+
+    @cached_property
+    def start_us(self) -> Optional[int]:
+        """
+        :return: Start of the entry in microseconds since the epoch
+        :rtype: Optional[int]
+        """
+        if self._position is not None:
+            return self._offsets.start[self._position]
+        return timestamp_to_microseconds(self.raw_entry.get("startedDateTime", ""))
+
+    @cached_property
+    def end_us(self) -> Optional[int]:
+        """
+        :return: End of the entry, ``start_us`` plus ``time``, in
+            microseconds since the epoch
+        :rtype: Optional[int]
+        """
+        if self._position is not None:
+            return self._offsets.end[self._position]
+        if self.start_us is None:
+            return None
+        return self.start_us + duration_to_microseconds(self.time)
+
+    def _relative(self, time: Optional[int], page: bool) -> Optional[int]:
+        if self._position is None or time is None:
+            return None
+        if page:
+            return time - self._offsets.page_origin(
+                self.raw_entry.get("pageref", "unknown")
+            )
+        return time - self._offsets.origin
+
+    @cached_property
+    def start_offset(self) -> Optional[int]:
+        """
+        :return: Start of the entry in microseconds after the start of its
+            page. Only set for entries from a parser or page.
+        :rtype: Optional[int]
+        """
+        return self._relative(self.start_us, True)
+
+    @cached_property
+    def end_offset(self) -> Optional[int]:
+        """
+        :return: End of the entry in microseconds after the start of its
+            page. Only set for entries from a parser or page.
+        :rtype: Optional[int]
+        """
+        return self._relative(self.end_us, True)
+
+    @cached_property
+    def har_start_offset(self) -> Optional[int]:
+        """
+        :return: Start of the entry in microseconds after the earliest entry
+            of the HAR file. Only set for entries from a parser or page.
+        :rtype: Optional[int]
+        """
+        return self._relative(self.start_us, False)
+
+    @cached_property
+    def har_end_offset(self) -> Optional[int]:
+        """
+        :return: End of the entry in microseconds after the earliest entry of
+            the HAR file. Only set for entries from a parser or page.
+        :rtype: Optional[int]
+        """
+        return self._relative(self.end_us, False)
 
     @cached_property
     def cache(self) -> str:
@@ -1083,6 +1872,15 @@ class HarEntry(MimicDict):
         """
         return self.raw_entry.get("cookies", [])
 
+    @cached_property
+    def initiator(self) -> dict:
+        """
+        :return: What started the request (Chrome only), e.g. ``{"type":
+            "parser", "url": ...}`` or a ``script`` with a ``stack``
+        :rtype: dict
+        """
+        return self.raw_entry.get("_initiator", {})
+
     @cached_property
     def pageref(self) -> str:
         """
@@ -1099,6 +1897,15 @@ class HarEntry(MimicDict):
         """
         return int(self.raw_entry["connection"])
 
+    @cached_property
+    def priority(self) -> Optional[str]:
+        """
+        :return: Priority the browser gave the request (Chrome only), e.g.
+            ``VeryHigh`` or ``Low``
+        :rtype: Optional[str]
+        """
+        return self.raw_entry.get("_priority")
+
     @cached_property
     def secure(self) -> bool:
         """
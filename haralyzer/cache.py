@@ -0,0 +1,192 @@
+"""
+On disk cache of the page summaries of HAR files, so aggregating runs again
+doesn't parse them again
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+from importlib import metadata
+from typing import Iterable, List, Optional, Union
+
+from .summary import SUMMARY_VERSION, summarize_har
+
+
+def library_version() -> str:
+    """
+    :return: Version of the installed haralyzer, ``unknown`` when it isn't
+        installed
+    :rtype: str
+    """
+    try:
+        return metadata.version("haralyzer")
+    except metadata.PackageNotFoundError:  # pragma: no cover
+        return "unknown"
+
+
+def content_hash(har: Union[dict, str, os.PathLike]) -> str:
+    """
+    :param har: A ``dict`` of a HAR file, or the path to one
+    :type har: Union[dict, str, os.PathLike]
+    :return: SHA-256 of the bytes of the file, or of the ``dict`` serialized
+        as JSON with sorted keys. A path and the ``dict`` of the same file
+        don't have the same hash.
+    :rtype: str
+    """
+    if isinstance(har, dict):
+        content = json.dumps(har, sort_keys=True)
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+    digest = hashlib.sha256()
+    with open(har, mode="rb") as har_file:
+        for chunk in iter(lambda: har_file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class SummaryCache:
+    """
+    SQLite table of the summaries of every page of HAR files, see
+    ``summary.summarize_har``, keyed by the content hash of each file and
+    the version of the library and of the summaries. A changed file, or a
+    new version, is summarized again. The hashes of paths are kept with
+    their size and modification time, so unchanged files aren't read again.
+    """
+
+    def __init__(self, path: Union[str, os.PathLike], version: Optional[str] = None):
+        """
+        :param path: SQLite database, created if it doesn't exist
+        :type path: Union[str, os.PathLike]
+        :param version: Version the summaries are stored under, the library
+            and summary versions by default
+        :type version: Optional[str]
+        """
+        self.path = path
+        self.version = version or f"{library_version()}/{SUMMARY_VERSION}"
+        self.connection = sqlite3.connect(os.fspath(path))
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS summaries ("
+            "hash TEXT NOT NULL, version TEXT NOT NULL, summaries TEXT NOT NULL, "
+            "PRIMARY KEY (hash, version))"
+        )
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS hashes ("
+            "path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime INTEGER NOT NULL, "
+            "hash TEXT NOT NULL)"
+        )
+        self.connection.commit()
+
+    def __repr__(self) -> str:
+        return f"SummaryCache({os.fspath(self.path)!r})"
+
+    def __len__(self) -> int:
+        query = "SELECT COUNT(*) FROM summaries WHERE version = ?"
+        return self.connection.execute(query, (self.version,)).fetchone()[0]
+
+    def __enter__(self) -> "SummaryCache":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def key(self, har: Union[dict, str, os.PathLike]) -> str:
+        """
+        :param har: A ``dict`` of a HAR file, or the path to one
+        :type har: Union[dict, str, os.PathLike]
+        :return: Its content hash, see ``content_hash``, only reading a path
+            again if its size or modification time changed
+        :rtype: str
+        """
+        if isinstance(har, dict):
+            return content_hash(har)
+        path = os.path.abspath(har)
+        stat = os.stat(path)
+        row = self.connection.execute(
+            "SELECT hash FROM hashes WHERE path = ? AND size = ? AND mtime = ?",
+            (path, stat.st_size, stat.st_mtime_ns),
+        ).fetchone()
+        if row is not None:
+            return row[0]
+        key = content_hash(path)
+        self.connection.execute(
+            "INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?)",
+            (path, stat.st_size, stat.st_mtime_ns, key),
+        )
+        self.connection.commit()
+        return key
+
+    def get(self, key: str) -> Optional[List[dict]]:
+        """
+        :param key: Content hash of a HAR file, see ``content_hash``
+        :type key: str
+        :return: Summaries of its pages, ``None`` if they aren't cached
+        :rtype: Optional[List[dict]]
+        """
+        row = self.connection.execute(
+            "SELECT summaries FROM summaries WHERE hash = ? AND version = ?",
+            (key, self.version),
+        ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def put(self, key: str, summaries: List[dict]):
+        """
+        :param key: Content hash of a HAR file, see ``content_hash``
+        :type key: str
+        :param summaries: Summaries of all its pages
+        :type summaries: List[dict]
+        """
+        self.connection.execute(
+            "INSERT OR REPLACE INTO summaries VALUES (?, ?, ?)",
+            (key, self.version, json.dumps(summaries)),
+        )
+        self.connection.commit()
+
+    def summarize(self, har: Union[dict, str, os.PathLike]) -> List[dict]:
+        """
+        :param har: A ``dict`` of a HAR file, or the path to one
+        :type har: Union[dict, str, os.PathLike]
+        :return: Cached summaries of all its pages, summarized and cached
+            first if needed
+        :rtype: List[dict]
+        """
+        # Cached summaries are found from the hash alone, without loading
+        # the JSON of the file
+        key = self.key(har)
+        summaries = self.get(key)
+        if summaries is None:
+            summaries = summarize_har(har)
+            self.put(key, summaries)
+        return summaries
+
+    def prune(self, keep: Iterable[str] = ()) -> int:
+        """
+        Deletes the summaries of other versions, and of the HAR files whose
+        hash isn't in ``keep`` if it is given.
+
+        :param keep: Content hashes to keep
+        :type keep: Iterable[str]
+        :return: Number of deleted HAR files
+        :rtype: int
+        """
+        keep = set(keep)
+        deleted = self.connection.execute(
+            "DELETE FROM summaries WHERE version != ?", (self.version,)
+        ).rowcount
+        if keep:
+            hashes = [
+                key
+                for (key,) in self.connection.execute("SELECT hash FROM summaries")
+                if key not in keep
+            ]
+            deleted += self.connection.executemany(
+                "DELETE FROM summaries WHERE hash = ?", [(key,) for key in hashes]
+            ).rowcount
+        self.connection.execute(
+            "DELETE FROM hashes WHERE hash NOT IN (SELECT hash FROM summaries)"
+        )
+        self.connection.commit()
+        return deleted
+
+    def close(self):
+        """Closes the database"""
+        self.connection.close()
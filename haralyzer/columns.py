@@ -0,0 +1,763 @@
+"""
+Columnar representation of HAR entries for fast filtering.
+
+Filters are evaluated as boolean masks over whole columns instead of one
+entry at a time. NumPy is used when it is installed, otherwise masks are
+stored as the bits of a Python ``int``, which still lets AND/OR run over all
+rows at once in C.
+"""
+
+import math
+import re
+from bisect import bisect_left
+from collections.abc import Sequence
+from functools import cached_property
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from .stats import percentile
+from .timeline import EntryOffsets
+from .urls import split_urls
+from .waterfall import PHASES
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+#: Phases of ``timings``, and the time Chrome queued the request, which is
+#: part of ``blocked``
+TIMING_PHASES = PHASES + ("_blocked_queueing",)
+
+
+def _match_func(pattern: str, regex: bool, flags: int = re.IGNORECASE) -> Callable:
+    """
+    Builds the same comparison used by the ``HarParser.match_*`` functions,
+    so both filter engines return the same entries.
+
+    :param pattern: Pattern or literal value to match
+    :type pattern: str
+    :param regex: Whether to use regex or exact match
+    :type regex: bool
+    :param flags: Flags passed to ``re.search``
+    :type flags: int
+    :return: Function that takes a value and returns whether it matches
+    :rtype: Callable
+    """
+    if not regex:
+        return lambda value: value == pattern
+    compiled = re.compile(pattern, flags=flags)
+    return lambda value: value == pattern or compiled.search(value) is not None
+
+
+class Categorical:
+    """
+    Dictionary encoded column. Each distinct value is stored once in
+    ``categories`` and every row holds the code of its value, so criteria only
+    have to be evaluated once per distinct value.
+    """
+
+    def __init__(self, values):
+        lookup = {}
+        self.codes = [lookup.setdefault(value, len(lookup)) for value in values]
+        self.categories = list(lookup)
+        # Backend specific encodings of the codes, built when first needed
+        self.cache = {}
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def select(self, predicate: Callable[[Any], bool]) -> List[bool]:
+        """
+        :param predicate: Function called once for each distinct value
+        :type predicate: Callable[[Any], bool]
+        :return: Whether each category matches the predicate
+        :rtype: List[bool]
+        """
+        return [bool(predicate(value)) for value in self.categories]
+
+
+class Numeric:
+    # pylint: disable=R0903
+    """A column of numbers"""
+
+    def __init__(self, values):
+        self.values = list(values)
+        # Backend specific encodings of the values, built when first needed
+        self.cache = {}
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+class NumpyMasks:
+    """Masks stored as NumPy boolean arrays"""
+
+    name = "numpy"
+
+    @staticmethod
+    def everything(size: int):
+        """
+        :return: Mask with every row set
+        """
+        return np.ones(size, dtype=bool)
+
+    @staticmethod
+    def from_categories(column: Categorical, selected: List[bool]):
+        """
+        :return: Mask of the rows whose category is selected
+        """
+        if "codes" not in column.cache:
+            column.cache["codes"] = np.asarray(column.codes, dtype=np.intp)
+        lookup = np.asarray(selected, dtype=bool)
+        if lookup.size == 0:
+            return np.zeros(len(column), dtype=bool)
+        return lookup[column.cache["codes"]]
+
+    @staticmethod
+    def at_least(column: Numeric, threshold: float):
+        """
+        :return: Mask of the rows with a value of at least ``threshold``
+        """
+        if "values" not in column.cache:
+            column.cache["values"] = np.asarray(column.values, dtype=float)
+        return column.cache["values"] >= threshold
+
+    @staticmethod
+    def intersect(left, right):
+        """
+        :return: Rows set in both masks
+        """
+        return left & right
+
+    @staticmethod
+    def union(left, right):
+        """
+        :return: Rows set in either mask
+        """
+        return left | right
+
+    @staticmethod
+    def rows(mask) -> List[int]:
+        """
+        :return: Positions of the set rows
+        """
+        return np.flatnonzero(mask).tolist()
+
+    @staticmethod
+    def count(mask) -> int:
+        """
+        :return: Number of set rows
+        """
+        return int(np.count_nonzero(mask))
+
+
+class BitsetMasks:
+    """Masks stored as the bits of a Python ``int``, bit N being row N"""
+
+    name = "bitset"
+
+    @staticmethod
+    def _from_rows(rows, size: int) -> int:
+        bitmap = bytearray((size + 7) // 8)
+        for row in rows:
+            bitmap[row >> 3] |= 1 << (row & 7)
+        return int.from_bytes(bitmap, "little")
+
+    @staticmethod
+    def everything(size: int) -> int:
+        """
+        :return: Mask with every row set
+        """
+        return (1 << size) - 1
+
+    @classmethod
+    def from_categories(cls, column: Categorical, selected: List[bool]) -> int:
+        """
+        :return: Mask of the rows whose category is selected
+        """
+        if "bitsets" not in column.cache:
+            rows = [[] for _ in column.categories]
+            for row, code in enumerate(column.codes):
+                rows[code].append(row)
+            column.cache["bitsets"] = [
+                cls._from_rows(category_rows, len(column)) for category_rows in rows
+            ]
+        mask = 0
+        for bitset, is_selected in zip(column.cache["bitsets"], selected):
+            if is_selected:
+                mask |= bitset
+        return mask
+
+    @classmethod
+    def at_least(cls, column: Numeric, threshold: float) -> int:
+        """
+        :return: Mask of the rows with a value of at least ``threshold``
+        """
+        if "order" not in column.cache:
+            order = sorted(range(len(column)), key=column.values.__getitem__)
+            column.cache["order"] = order
+            column.cache["sorted"] = [column.values[row] for row in order]
+        start = bisect_left(column.cache["sorted"], threshold)
+        # Only set the bits of the smaller side of the split
+        if start < len(column) - start:
+            below = cls._from_rows(column.cache["order"][:start], len(column))
+            return cls.everything(len(column)) ^ below
+        return cls._from_rows(column.cache["order"][start:], len(column))
+
+    @staticmethod
+    def intersect(left: int, right: int) -> int:
+        """
+        :return: Rows set in both masks
+        """
+        return left & right
+
+    @staticmethod
+    def union(left: int, right: int) -> int:
+        """
+        :return: Rows set in either mask
+        """
+        return left | right
+
+    @staticmethod
+    def rows(mask: int) -> List[int]:
+        """
+        :return: Positions of the set rows
+        """
+        bits = bin(mask)[:1:-1]
+        rows = []
+        row = bits.find("1")
+        while row != -1:
+            rows.append(row)
+            row = bits.find("1", row + 1)
+        return rows
+
+    @staticmethod
+    def count(mask: int) -> int:
+        """
+        :return: Number of set rows
+        """
+        return bin(mask).count("1")
+
+
+def _breakdown_numpy(
+    phases: Dict[str, Numeric],
+    groups: Dict[str, Categorical],
+    rows: Optional[List[int]],
+    percentiles: Iterable[float],
+) -> dict:
+    # pylint: disable=R0914
+    """NumPy version of ``EntryColumns.timing_breakdown``"""
+    for column in list(phases.values()) + list(groups.values()):
+        if isinstance(column, Numeric) and "values" not in column.cache:
+            column.cache["values"] = np.asarray(column.values, dtype=float)
+        if isinstance(column, Categorical) and "codes" not in column.cache:
+            column.cache["codes"] = np.asarray(column.codes, dtype=np.intp)
+    rows = slice(None) if rows is None else np.asarray(rows, dtype=np.intp)
+    codes = {name: column.cache["codes"][rows] for name, column in groups.items()}
+    counts = {
+        name: np.bincount(codes[name], minlength=len(column.categories))
+        for name, column in groups.items()
+    }
+    result = {
+        "count": 0,
+        "totals": {},
+        "percentiles": {},
+        **{name: {} for name in groups},
+    }
+    for phase, column in phases.items():
+        values = column.cache["values"][rows]
+        applied = ~np.isnan(values)
+        filled = np.where(applied, values, 0.0)
+        result["count"] = len(values)
+        result["totals"][phase] = float(filled.sum())
+        result["percentiles"][phase] = (
+            dict(zip(percentiles, np.percentile(values[applied], percentiles).tolist()))
+            if applied.any()
+            else None
+        )
+        for name, column in groups.items():
+            totals = np.bincount(
+                codes[name], weights=filled, minlength=len(column.categories)
+            )
+            for code in np.flatnonzero(counts[name]).tolist():
+                group = result[name].setdefault(
+                    column.categories[code],
+                    {"count": int(counts[name][code]), "totals": {}},
+                )
+                group["totals"][phase] = float(totals[code])
+    return result
+
+
+def _breakdown_python(
+    phases: Dict[str, Numeric],
+    groups: Dict[str, Categorical],
+    rows: Optional[List[int]],
+    percentiles: Iterable[float],
+) -> dict:
+    # pylint: disable=R0914
+    """Pure Python version of ``EntryColumns.timing_breakdown``"""
+    if rows is None:
+        rows = range(len(next(iter(phases.values()))))
+    result = {
+        "count": len(rows),
+        "totals": {},
+        "percentiles": {},
+        **{name: {} for name in groups},
+    }
+    for name, column in groups.items():
+        for row in rows:
+            group = result[name].setdefault(
+                column.categories[column.codes[row]], {"count": 0, "totals": {}}
+            )
+            group["count"] += 1
+    for phase, column in phases.items():
+        values = [column.values[row] for row in rows]
+        applied = sorted(value for value in values if not math.isnan(value))
+        result["totals"][phase] = float(sum(applied))
+        result["percentiles"][phase] = (
+            {value: percentile(applied, value) for value in percentiles}
+            if applied
+            else None
+        )
+        for name, column in groups.items():
+            totals = result[name]
+            for group in totals.values():
+                group["totals"][phase] = 0.0
+            for row, value in zip(rows, values):
+                if not math.isnan(value):
+                    category = column.categories[column.codes[row]]
+                    totals[category]["totals"][phase] += value
+    return result
+
+
+class EntryView(Sequence):
+    """
+    Lazy sequence of the entries selected by a filter. ``HarEntry`` objects
+    are only created for the items that are actually accessed.
+    """
+
+    def __init__(
+        self, entries: List[dict], rows: List[int], wrap: Optional[Callable] = None
+    ):
+        """
+        :param entries: Raw entries from the HAR file
+        :type entries: List[dict]
+        :param rows: Positions of the selected entries
+        :type rows: List[int]
+        :param wrap: Called with each raw entry that is accessed, usually
+            ``HarEntry``. Raw entries are returned if it is not given.
+        :type wrap: Optional[Callable]
+        """
+        self.entries = entries
+        self.rows = rows
+        self.wrap = wrap
+
+    def __repr__(self) -> str:
+        return f"EntryView of {len(self.rows)} entries"
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return EntryView(self.entries, self.rows[item], self.wrap)
+        entry = self.entries[self.rows[item]]
+        if self.wrap is None:
+            return entry
+        return self.wrap(entry)
+
+    @property
+    def raw_entries(self) -> List[dict]:
+        """
+        :return: Raw entries, without wrapping them in ``HarEntry``
+        :rtype: List[dict]
+        """
+        return [self.entries[row] for row in self.rows]
+
+
+class EntryColumns:
+    # pylint: disable=R0904
+    """
+    Column store of the fields of HAR entries used for filtering. Columns are
+    only built the first time a filter uses them.
+    """
+
+    def __init__(
+        self,
+        entries: List[dict],
+        use_numpy: Optional[bool] = None,
+        wrap: Optional[Callable] = None,
+        offsets: Optional[EntryOffsets] = None,
+    ):
+        """
+        :param entries: Raw entries from the HAR file
+        :type entries: List[dict]
+        :param use_numpy: Force NumPy masks on or off. By default NumPy is used
+            when it is installed.
+        :type use_numpy: Optional[bool]
+        :param wrap: Called with each raw entry accessed through a view
+        :type wrap: Optional[Callable]
+        :param offsets: Offsets of the entries, parsed from the entries when
+            first needed by default
+        :type offsets: Optional[EntryOffsets]
+        """
+        if use_numpy is None:
+            use_numpy = np is not None
+        if use_numpy and np is None:
+            raise ValueError("NumPy is not installed")
+        self.entries = entries
+        self.wrap = wrap
+        self.masks = NumpyMasks if use_numpy else BitsetMasks
+        self._headers = {}
+        self._asset_types = {}
+        if offsets is not None:
+            self.offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @cached_property
+    def urls(self) -> Dict[str, list]:
+        """
+        :return: Components of all request URLs, see ``split_urls``
+        :rtype: Dict[str, list]
+        """
+        return split_urls(entry["request"].get("url", "") for entry in self.entries)
+
+    @cached_property
+    def pageref(self) -> Categorical:
+        """
+        :return: Page of the entry, ``unknown`` if it has none
+        :rtype: Categorical
+        """
+        return Categorical(entry.get("pageref", "unknown") for entry in self.entries)
+
+    @cached_property
+    def method(self) -> Categorical:
+        """
+        :return: Request method
+        :rtype: Categorical
+        """
+        return Categorical(entry["request"].get("method", "") for entry in self.entries)
+
+    @cached_property
+    def mime_type(self) -> Categorical:
+        """
+        :return: Mime type of the response content
+        :rtype: Categorical
+        """
+        return Categorical(
+            entry["response"].get("content", {}).get("mimeType") or ""
+            for entry in self.entries
+        )
+
+    @cached_property
+    def status(self) -> Categorical:
+        """
+        :return: Response status as a string, which is what filters match on
+        :rtype: Categorical
+        """
+        return Categorical(str(entry["response"]["status"]) for entry in self.entries)
+
+    @cached_property
+    def http_version(self) -> Categorical:
+        """
+        :return: HTTP version of the response
+        :rtype: Categorical
+        """
+        return Categorical(entry["response"]["httpVersion"] for entry in self.entries)
+
+    @cached_property
+    def host(self) -> Categorical:
+        """
+        :return: Lower case host of the request URL
+        :rtype: Categorical
+        """
+        return Categorical(self.urls["hostname"])
+
+    @cached_property
+    def url(self) -> Categorical:
+        """
+        :return: Request URL
+        :rtype: Categorical
+        """
+        return Categorical(entry["request"].get("url", "") for entry in self.entries)
+
+    def header(self, header_type: str, name: str) -> Categorical:
+        """
+        Column of all the values of one header, built the first time the
+        header is filtered on. Each row holds a ``tuple`` of the values since
+        a header can be repeated.
+
+        :param header_type: Header type. Valid values: 'request', or 'response'
+        :type header_type: str
+        :param name: Name of the header, case-insensitive
+        :type name: str
+        :return: Header values of every entry
+        :rtype: Categorical
+        """
+        if header_type not in ["request", "response"]:
+            raise ValueError(
+                "Invalid header_type, should be either:\n\n* 'request'\n*'response'"
+            )
+        key = (header_type, name.lower())
+        if key not in self._headers:
+            self._headers[key] = Categorical(
+                tuple(
+                    header["value"]
+                    for header in entry[header_type]["headers"]
+                    if header["name"].lower() == key[1] and header["value"] is not None
+                )
+                for entry in self.entries
+            )
+        return self._headers[key]
+
+    @cached_property
+    def time(self) -> Numeric:
+        """
+        :return: Total time of the entry in ms
+        :rtype: Numeric
+        """
+        return Numeric(entry["time"] for entry in self.entries)
+
+    @cached_property
+    def offsets(self) -> EntryOffsets:
+        """
+        :return: Start and end of the entries in microseconds. Without the
+            pages, entries are relative to the earliest entry of their page.
+        :rtype: EntryOffsets
+        """
+        return EntryOffsets(self.entries)
+
+    @cached_property
+    def _page_offsets(self) -> tuple:
+        nan = float("nan")
+        return tuple(
+            Numeric(nan if value is None else value for value in values)
+            for values in self.offsets.page_offsets()
+        )
+
+    @property
+    def start(self) -> Numeric:
+        """
+        :return: Start of the entry in microseconds after the start of its
+            page, ``nan`` without a start time
+        :rtype: Numeric
+        """
+        return self._page_offsets[0]
+
+    @property
+    def end(self) -> Numeric:
+        """
+        :return: End of the entry in microseconds after the start of its
+            page, ``nan`` without a start time
+        :rtype: Numeric
+        """
+        return self._page_offsets[1]
+
+    @cached_property
+    def har_start(self) -> Numeric:
+        """
+        :return: Start of the entry in microseconds after the earliest entry,
+            ``nan`` without a start time
+        :rtype: Numeric
+        """
+        return Numeric(
+            float("nan") if start is None else start - self.offsets.origin
+            for start in self.offsets.start
+        )
+
+    @cached_property
+    def har_end(self) -> Numeric:
+        """
+        :return: End of the entry in microseconds after the earliest entry,
+            ``nan`` without a start time
+        :rtype: Numeric
+        """
+        return Numeric(
+            float("nan") if end is None else end - self.offsets.origin
+            for end in self.offsets.end
+        )
+
+    @cached_property
+    def timings(self) -> Dict[str, Numeric]:
+        """
+        :return: Time spent in each of ``TIMING_PHASES`` in ms, ``nan`` when
+            the phase did not apply (``-1``) or is missing
+        :rtype: Dict[str, Numeric]
+        """
+        nan = float("nan")
+        return {
+            phase: Numeric(
+                value if isinstance(value, (int, float)) and value >= 0 else nan
+                for value in (
+                    entry.get("timings", {}).get(phase) for entry in self.entries
+                )
+            )
+            for phase in TIMING_PHASES
+        }
+
+    def asset_type(self, asset_types: Dict[str, str]) -> Categorical:
+        """
+        :param asset_types: Asset types and the regex their mime types
+            match, like ``HarPage.asset_types``
+        :type asset_types: Dict[str, str]
+        :return: First asset type matching the mime type of each entry,
+            ``other`` if none match, like ``HarPage.get_asset_type``
+        :rtype: Categorical
+        """
+        key = tuple(asset_types.items())
+        if key not in self._asset_types:
+            matchers = [
+                (asset_type, _match_func(pattern, True)) for asset_type, pattern in key
+            ]
+            names = [
+                next((name for name, matches in matchers if matches(value)), "other")
+                for value in self.mime_type.categories
+            ]
+            self._asset_types[key] = Categorical(
+                names[code] for code in self.mime_type.codes
+            )
+        return self._asset_types[key]
+
+    def timing_breakdown(
+        self,
+        mask=None,
+        asset_types: Dict[str, str] = None,
+        percentiles: Iterable[float] = (50, 75, 90, 95, 99),
+    ) -> dict:
+        """
+        Sums and distributes the ``timings`` phases of the entries as a
+        reduction over the phase columns, with NumPy when it is used for
+        masks. Phases that did not apply (``-1``) count as 0 in totals and
+        are left out of percentiles.
+
+        :param mask: Only include the entries set in this mask
+        :param asset_types: Asset types to split by, see ``asset_type``.
+            Without them there is no ``by_asset_type`` split.
+        :type asset_types: Dict[str, str]
+        :param percentiles: Percentiles to compute, between 0 and 100
+        :type percentiles: Iterable[float]
+        :return: ``count`` of entries, ``totals`` in ms and ``percentiles``
+            of each of ``TIMING_PHASES`` (``None`` when no entry had the
+            phase), and ``by_host`` and ``by_asset_type`` with the
+            ``count`` and ``totals`` of each group.
+        :rtype: dict
+        """
+        percentiles = list(percentiles)
+        groups = {"by_host": self.host}
+        if asset_types is not None:
+            groups["by_asset_type"] = self.asset_type(asset_types)
+        rows = None if mask is None else self.masks.rows(mask)
+        if self.masks is NumpyMasks:
+            return _breakdown_numpy(self.timings, groups, rows, percentiles)
+        return _breakdown_python(self.timings, groups, rows, percentiles)
+
+    def _match(self, column: Categorical, pattern: str, regex: bool, flags: int):
+        return self.masks.from_categories(
+            column, column.select(_match_func(pattern, regex, flags))
+        )
+
+    def _match_header(self, header_type: str, name: str, pattern: str, regex: bool):
+        column = self.header(header_type, name)
+        matches = _match_func(pattern, regex)
+        return self.masks.from_categories(
+            column, column.select(lambda values: any(map(matches, values)))
+        )
+
+    def mask(
+        self,
+        page_id: str = None,
+        request_type: str = None,
+        content_type: str = None,
+        status_code: str = None,
+        http_version: str = None,
+        load_time__gt: int = None,
+        regex: bool = True,
+        url: str = None,
+        host: str = None,
+        request_header: Dict[str, str] = None,
+        response_header: Dict[str, str] = None,
+    ):
+        # pylint: disable=R0912,R0913,R0914
+        """
+        Evaluates the criteria of ``HarPage.filter_entries`` as a mask over
+        all entries. Regex criteria are run once per distinct value of the
+        column rather than once per entry.
+
+        :param page_id: Only include entries of this page
+        :type page_id: str
+        :param request_type: The request type (i.e. - GET or POST)
+        :type request_type: str
+        :param content_type: Regex to use for finding content type
+        :type content_type: str
+        :param status_code: The desired status code
+        :type status_code: str
+        :param http_version: HTTP version of request
+        :type http_version: str
+        :param load_time__gt: Load time in milliseconds. Entries that took
+            less time are excluded.
+        :type load_time__gt: int
+        :param regex: Whether to use regex or exact match.
+        :type regex: bool
+        :param url: The request URL
+        :type url: str
+        :param host: The host of the request URL
+        :type host: str
+        :param request_header: Request header names and the values they
+            must match
+        :type request_header: Dict[str, str]
+        :param response_header: Response header names and the values they
+            must match
+        :type response_header: Dict[str, str]
+        :return: Mask of the matching entries, see ``self.masks``
+        """
+        masks = []
+        if page_id is not None:
+            masks.append(self._match(self.pageref, page_id, False, 0))
+        if request_type is not None:
+            masks.append(self._match(self.method, request_type, regex, re.IGNORECASE))
+        if content_type is not None:
+            masks.append(
+                self._match(self.mime_type, content_type, regex, re.IGNORECASE)
+            )
+        if status_code is not None:
+            masks.append(self._match(self.status, status_code, regex, 0))
+        if http_version is not None:
+            masks.append(
+                self._match(self.http_version, http_version, regex, re.IGNORECASE)
+            )
+        if load_time__gt is not None:
+            masks.append(self.masks.at_least(self.time, load_time__gt))
+        if host is not None:
+            masks.append(
+                self._match(self.host, host if regex else host.lower(), regex, re.I)
+            )
+        if url is not None:
+            masks.append(self._match(self.url, url, regex, 0))
+        for name, value in (request_header or {}).items():
+            masks.append(self._match_header("request", name, value, regex))
+        for name, value in (response_header or {}).items():
+            masks.append(self._match_header("response", name, value, regex))
+
+        mask = self.masks.everything(len(self))
+        for other in masks:
+            mask = self.masks.intersect(mask, other)
+        return mask
+
+    def view(self, mask) -> EntryView:
+        """
+        :param mask: Mask returned by ``self.mask``
+        :return: Lazy sequence of the entries set in the mask
+        :rtype: EntryView
+        """
+        return EntryView(self.entries, self.masks.rows(mask), self.wrap)
+
+    def filter(self, **kwargs) -> EntryView:
+        """
+        Shortcut for ``self.view(self.mask(**kwargs))``
+
+        :return: Lazy sequence of matching entries
+        :rtype: EntryView
+        """
+        return self.view(self.mask(**kwargs))
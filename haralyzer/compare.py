@@ -0,0 +1,199 @@
+"""
+Statistical comparison of a baseline and a candidate set of runs, with
+bootstrap confidence intervals of the difference and the Mann-Whitney U
+test
+"""
+
+import math
+import random
+import statistics
+from typing import Optional, Sequence, Tuple, Union
+
+from .stats import percentile
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+Number = Union[int, float]
+
+#: Statistics the runs can be compared by
+STATISTICS = ("mean", "median")
+
+# Largest number of resampled values drawn at once with NumPy
+_CHUNK_SIZE = 1 << 20
+
+
+def mann_whitney_u(
+    baseline: Sequence[Number], candidate: Sequence[Number]
+) -> Tuple[float, float]:
+    """
+    Two sided Mann-Whitney U test, with the normal approximation corrected
+    for ties and continuity like SciPy's ``asymptotic`` method.
+
+    :param baseline: Values of the first sample
+    :type baseline: Sequence[Union[int, float]]
+    :param candidate: Values of the second sample
+    :type candidate: Sequence[Union[int, float]]
+    :return: U of ``baseline``, and the p-value, which is 1.0 when every
+        value is tied
+    :rtype: Tuple[float, float]
+    """
+    size_a, size_b = len(baseline), len(candidate)
+    if not size_a or not size_b:
+        raise ValueError("Both samples need at least one value")
+    combined = sorted(
+        [(value, True) for value in baseline] + [(value, False) for value in candidate]
+    )
+    size = len(combined)
+    rank_sum = 0.0
+    ties = 0
+    start = 0
+    while start < size:
+        stop = start + 1
+        while stop < size and combined[stop][0] == combined[start][0]:
+            stop += 1
+        # Tied values share the average of their ranks, which start at 1
+        rank = (start + stop + 1) / 2
+        rank_sum += rank * sum(1 for _, first in combined[start:stop] if first)
+        ties += (stop - start) ** 3 - (stop - start)
+        start = stop
+    u_statistic = rank_sum - size_a * (size_a + 1) / 2
+    mean = size_a * size_b / 2
+    variance = size_a * size_b / 12 * (size + 1 - ties / (size * (size - 1) or 1))
+    if variance <= 0:
+        return u_statistic, 1.0
+    z_score = max(abs(u_statistic - mean) - 0.5, 0) / math.sqrt(variance)
+    return u_statistic, min(1.0, math.erfc(z_score / math.sqrt(2)))
+
+
+def _bootstrap_numpy(baseline, candidate, statistic, iterations, seed):
+    """Resampled differences, drawn in chunks of whole iterations"""
+    rng = np.random.default_rng(seed)
+    reduce = np.mean if statistic == "mean" else np.median
+    samples = [np.asarray(baseline, dtype=float), np.asarray(candidate, dtype=float)]
+    chunk = max(1, _CHUNK_SIZE // max(len(baseline), len(candidate)))
+    deltas = []
+    for done in range(0, iterations, chunk):
+        count = min(chunk, iterations - done)
+        values_a, values_b = (
+            reduce(sample[rng.integers(0, len(sample), (count, len(sample)))], axis=1)
+            for sample in samples
+        )
+        deltas.append(values_b - values_a)
+    return np.sort(np.concatenate(deltas)).tolist()
+
+
+def _bootstrap_python(baseline, candidate, statistic, iterations, seed):
+    """Resampled differences, one iteration at a time"""
+    # The bootstrap is statistical resampling, not security related
+    rng = random.Random(seed)  # nosec B311
+    reduce = statistics.fmean if statistic == "mean" else statistics.median
+    deltas = [
+        reduce(rng.choices(candidate, k=len(candidate)))
+        - reduce(rng.choices(baseline, k=len(baseline)))
+        for _ in range(iterations)
+    ]
+    return sorted(deltas)
+
+
+def bootstrap_ci(
+    baseline: Sequence[Number],
+    candidate: Sequence[Number],
+    statistic: str = "mean",
+    iterations: int = 10000,
+    confidence: float = 0.95,
+    seed: Optional[int] = None,
+    use_numpy: Optional[bool] = None,
+) -> Tuple[float, float]:
+    # pylint: disable=R0913
+    """
+    Percentile bootstrap confidence interval of the difference of a
+    statistic between the candidate and the baseline. Both samples are
+    resampled with replacement ``iterations`` times, as index arrays of many
+    iterations at once with NumPy.
+
+    :param baseline: Values of the baseline runs
+    :type baseline: Sequence[Union[int, float]]
+    :param candidate: Values of the candidate runs
+    :type candidate: Sequence[Union[int, float]]
+    :param statistic: One of ``STATISTICS``
+    :type statistic: str
+    :param iterations: Number of resamples
+    :type iterations: int
+    :param confidence: Confidence level of the interval
+    :type confidence: float
+    :param seed: Seed of the random numbers, for reproducible intervals
+    :type seed: Optional[int]
+    :param use_numpy: Force NumPy on or off. By default NumPy is used when
+        it is installed.
+    :type use_numpy: Optional[bool]
+    :return: Lower and upper bound of the difference
+    :rtype: Tuple[float, float]
+    """
+    if statistic not in STATISTICS:
+        raise ValueError("statistic must be one of:\n" + "\n".join(STATISTICS))
+    if not baseline or not candidate:
+        raise ValueError("Both samples need at least one value")
+    if iterations < 1 or not 0 < confidence < 1:
+        raise ValueError("iterations should be positive and confidence below 1")
+    if use_numpy is None:
+        use_numpy = np is not None
+    if use_numpy and np is None:
+        raise ValueError("NumPy is not installed")
+    resample = _bootstrap_numpy if use_numpy else _bootstrap_python
+    deltas = resample(baseline, candidate, statistic, iterations, seed)
+    tail = (1 - confidence) * 100 / 2
+    return percentile(deltas, tail), percentile(deltas, 100 - tail)
+
+
+def compare_samples(
+    baseline: Sequence[Number],
+    candidate: Sequence[Number],
+    statistic: str = "mean",
+    iterations: int = 10000,
+    confidence: float = 0.95,
+    seed: Optional[int] = None,
+    use_numpy: Optional[bool] = None,
+) -> dict:
+    # pylint: disable=R0913
+    """
+    :param baseline: Values of the baseline runs
+    :type baseline: Sequence[Union[int, float]]
+    :param candidate: Values of the candidate runs
+    :type candidate: Sequence[Union[int, float]]
+    :param statistic: One of ``STATISTICS``
+    :type statistic: str
+    :param iterations: Number of bootstrap resamples
+    :type iterations: int
+    :param confidence: Confidence level of the interval
+    :type confidence: float
+    :param seed: Seed of the bootstrap
+    :type seed: Optional[int]
+    :param use_numpy: Force NumPy on or off for the bootstrap
+    :type use_numpy: Optional[bool]
+    :return: ``statistic`` of the ``baseline`` and the ``candidate``, their
+        ``delta`` (candidate minus baseline), the ``relative`` delta
+        (``None`` for a baseline of 0), its ``ci`` from ``bootstrap_ci``,
+        ``u`` and ``p_value`` from ``mann_whitney_u``, and the ``counts`` of
+        values
+    :rtype: dict
+    """
+    if statistic not in STATISTICS:
+        raise ValueError("statistic must be one of:\n" + "\n".join(STATISTICS))
+    reduce = statistics.fmean if statistic == "mean" else statistics.median
+    value_a, value_b = reduce(baseline), reduce(candidate)
+    u_statistic, p_value = mann_whitney_u(baseline, candidate)
+    return {
+        "baseline": value_a,
+        "candidate": value_b,
+        "delta": value_b - value_a,
+        "relative": (value_b - value_a) / value_a if value_a else None,
+        "ci": bootstrap_ci(
+            baseline, candidate, statistic, iterations, confidence, seed, use_numpy
+        ),
+        "u": u_statistic,
+        "p_value": p_value,
+        "counts": (len(baseline), len(candidate)),
+    }
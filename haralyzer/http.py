@@ -1,11 +1,14 @@
 """Creates the Request and Response sub class that are used by each entry"""
 
 from functools import cached_property
-from typing import Optional
+from typing import Dict, List, Optional
+from urllib.parse import SplitResult, parse_qs, urlsplit
 from .mixins import HttpTransaction
+from .urls import DEFAULT_PORTS
 
 
 class Request(HttpTransaction):
+    # pylint: disable=R0904
     """Request object for an HarEntry"""
 
     def __str__(self):
@@ -79,6 +82,85 @@ class Request(HttpTransaction):
         """
         return self.raw_entry["url"]
 
+    # URL Components
+
+    @cached_property
+    def _split_url(self) -> SplitResult:
+        """
+        :return: URL of the request split into its components, parsed once
+        :rtype: SplitResult
+        """
+        return urlsplit(self.url)
+
+    @cached_property
+    def scheme(self) -> str:
+        """
+        :return: Lower case scheme of the request URL
+        :rtype: str
+        """
+        return self._split_url.scheme.lower()
+
+    @cached_property
+    def hostname(self) -> Optional[str]:
+        """
+        Unlike ``host``, which is the Host header, this is taken from the URL
+        so it is also set for HTTP/2 requests.
+
+        :return: Lower case host of the request URL
+        :rtype: Optional[str]
+        """
+        return self._split_url.hostname
+
+    @cached_property
+    def port(self) -> Optional[int]:
+        """
+        :return: Port of the request URL, or the default port of the scheme
+        :rtype: Optional[int]
+        """
+        try:
+            port = self._split_url.port
+        except ValueError:
+            port = None
+        if port is None:
+            return DEFAULT_PORTS.get(self.scheme)
+        return port
+
+    @cached_property
+    def path(self) -> str:
+        """
+        :return: Path of the request URL
+        :rtype: str
+        """
+        return self._split_url.path
+
+    @cached_property
+    def query_params(self) -> Dict[str, List[str]]:
+        """
+        Query parameters of the request. Uses the ``queryString`` recorded in
+        the HAR file and only parses the URL when it is missing.
+
+        :return: Parameter name to all of its values
+        :rtype: Dict[str, List[str]]
+        """
+        query_string = self.raw_entry.get("queryString")
+        if not query_string:
+            return parse_qs(self._split_url.query, keep_blank_values=True)
+        params = {}
+        for param in query_string:
+            params.setdefault(param["name"], []).append(param["value"])
+        return params
+
+    @cached_property
+    def origin(self) -> str:
+        """
+        :return: Scheme, host and non default port of the request URL
+        :rtype: str
+        """
+        origin = f"{self.scheme}://{self.hostname or ''}"
+        if self.port is not None and self.port != DEFAULT_PORTS.get(self.scheme):
+            origin += f":{self.port}"
+        return origin
+
     # Header Values
 
     @cached_property
@@ -293,6 +375,20 @@ class Response(HttpTransaction):
         """
         return self.raw_entry["content"]["text"]
 
+    @cached_property
+    def transferSize(self) -> int:
+        """
+        :return: Bytes transferred, from ``_transferSize`` when the browser
+            recorded it and the header and body sizes otherwise
+        :rtype: int
+        """
+        transfer_size = self.raw_entry.get("_transferSize", -1)
+        if transfer_size >= 0:
+            return transfer_size
+        return max(self.raw_entry.get("headersSize", -1), 0) + max(
+            self.raw_entry.get("bodySize", -1), 0
+        )
+
     @cached_property
     def textEncoding(self) -> str:
         """
@@ -0,0 +1,222 @@
+"""
+Lazily built inverted indexes over the entries of a HAR file
+"""
+
+from collections import defaultdict
+from functools import cached_property
+from typing import Dict, Iterable, List, Optional, Set, Union
+
+from .urls import split_urls
+
+
+def _normalize_mime_type(mime_type: Optional[str]) -> str:
+    """
+    Strips parameters (``; charset=...``) and case from a mime type so
+    ``text/html; charset=UTF-8`` and ``text/html`` share the same key.
+
+    :param mime_type: Mime type from the HAR file
+    :type mime_type: Optional[str]
+    :return: Normalized mime type
+    :rtype: str
+    """
+    if not mime_type:
+        return ""
+    return mime_type.split(";", 1)[0].strip().lower()
+
+
+def _as_values(value: Union[str, int, Iterable]) -> list:
+    """
+    Allows index queries to take either a single value or a collection of
+    values, which are OR'd together.
+
+    :param value: Value or values to look up
+    :return: List of values
+    :rtype: list
+    """
+    if isinstance(value, (str, int)):
+        return [value]
+    return list(value)
+
+
+class PathTrie:
+    """
+    Trie of URL path segments. Every node keeps the positions of all the
+    entries at or below it, so a prefix query is a walk down the trie
+    instead of a scan over every entry.
+    """
+
+    def __init__(self):
+        self._root = {"children": {}, "rows": []}
+
+    @staticmethod
+    def _segments(path: str) -> List[str]:
+        return [segment for segment in path.split("/") if segment]
+
+    def insert(self, path: str, row: int):
+        """
+        Adds the entry at position ``row`` under ``path``
+
+        :param path: URL path of the entry
+        :type path: str
+        :param row: Position of the entry in the HAR file
+        :type row: int
+        """
+        node = self._root
+        node["rows"].append(row)
+        for segment in self._segments(path):
+            node = node["children"].setdefault(segment, {"children": {}, "rows": []})
+            node["rows"].append(row)
+
+    def lookup(self, prefix: str) -> List[int]:
+        """
+        Returns the positions of all entries whose path starts with the
+        segments of ``prefix``. Matching is done on whole segments, so
+        ``/static`` matches ``/static/app.js`` but not ``/staticfiles/``.
+
+        :param prefix: Path prefix to search for
+        :type prefix: str
+        :return: Positions of matching entries
+        :rtype: List[int]
+        """
+        node = self._root
+        for segment in self._segments(prefix):
+            node = node["children"].get(segment)
+            if node is None:
+                return []
+        return node["rows"]
+
+
+class EntryIndex:
+    """
+    Hash indexes mapping host, mime type, method and status to the positions
+    of the entries in the HAR file. Each index is only built the first time
+    it is queried.
+    """
+
+    def __init__(self, entries: List[dict]):
+        """
+        :param entries: Raw entries from the HAR file
+        :type entries: List[dict]
+        """
+        self.entries = entries
+
+    @cached_property
+    def _urls(self) -> Dict[str, list]:
+        # Some HAR files have entries without a URL, they aren't indexed by
+        # host or path
+        return split_urls(entry["request"].get("url", "") for entry in self.entries)
+
+    @staticmethod
+    def _build(keys: Iterable) -> Dict[Union[str, int], List[int]]:
+        index = defaultdict(list)
+        for row, key in enumerate(keys):
+            if key is not None:
+                index[key].append(row)
+        return dict(index)
+
+    @cached_property
+    def hosts(self) -> Dict[str, List[int]]:
+        """
+        :return: Lower case host of the request URL to entry positions
+        :rtype: Dict[str, List[int]]
+        """
+        return self._build(hostname or None for hostname in self._urls["hostname"])
+
+    @cached_property
+    def mime_types(self) -> Dict[str, List[int]]:
+        """
+        :return: Normalized response mime type to entry positions
+        :rtype: Dict[str, List[int]]
+        """
+        return self._build(
+            _normalize_mime_type(entry["response"].get("content", {}).get("mimeType"))
+            for entry in self.entries
+        )
+
+    @cached_property
+    def methods(self) -> Dict[str, List[int]]:
+        """
+        :return: Upper case request method to entry positions
+        :rtype: Dict[str, List[int]]
+        """
+        return self._build(
+            entry["request"]["method"].upper() if "method" in entry["request"] else None
+            for entry in self.entries
+        )
+
+    @cached_property
+    def statuses(self) -> Dict[int, List[int]]:
+        """
+        :return: Response status to entry positions
+        :rtype: Dict[int, List[int]]
+        """
+        return self._build(entry["response"]["status"] for entry in self.entries)
+
+    @cached_property
+    def paths(self) -> PathTrie:
+        """
+        :return: Trie of request URL paths. URLs without a path, like
+            ``data:`` URLs, aren't in it, and an empty path after a host is
+            ``/``.
+        :rtype: PathTrie
+        """
+        trie = PathTrie()
+        for row, (hostname, path) in enumerate(
+            zip(self._urls["hostname"], self._urls["path"])
+        ):
+            if path.startswith("/") or (hostname and not path):
+                trie.insert(path, row)
+        return trie
+
+    @staticmethod
+    def _union(index: dict, values: list) -> Set[int]:
+        rows = set()
+        for value in values:
+            rows.update(index.get(value, ()))
+        return rows
+
+    def lookup(
+        self,
+        host: Union[str, Iterable[str]] = None,
+        path_prefix: str = None,
+        mime_type: Union[str, Iterable[str]] = None,
+        method: Union[str, Iterable[str]] = None,
+        status: Union[int, Iterable[int]] = None,
+    ) -> List[int]:
+        # pylint: disable=R0913
+        """
+        Returns the positions of entries matching ALL the given criteria.
+        Every criterion except ``path_prefix`` also takes a collection of
+        values, any of which may match (``status=range(500, 600)``).
+
+        :param host: Host of the request URL
+        :param path_prefix: Prefix of the request URL path
+        :type path_prefix: str
+        :param mime_type: Mime type of the response, without parameters
+        :param method: Request method
+        :param status: Response status
+        :return: Sorted positions of the matching entries
+        :rtype: List[int]
+        """
+        candidates = []
+        if host is not None:
+            values = [value.lower() for value in _as_values(host)]
+            candidates.append(self._union(self.hosts, values))
+        if mime_type is not None:
+            values = [_normalize_mime_type(value) for value in _as_values(mime_type)]
+            candidates.append(self._union(self.mime_types, values))
+        if method is not None:
+            values = [value.upper() for value in _as_values(method)]
+            candidates.append(self._union(self.methods, values))
+        if status is not None:
+            values = [int(value) for value in _as_values(status)]
+            candidates.append(self._union(self.statuses, values))
+        if path_prefix is not None:
+            candidates.append(set(self.paths.lookup(path_prefix)))
+
+        if not candidates:
+            return list(range(len(self.entries)))
+        # Intersect starting from the smallest set to keep the work minimal
+        candidates.sort(key=len)
+        rows = candidates[0].intersection(*candidates[1:])
+        return sorted(rows)
@@ -0,0 +1,107 @@
+"""
+Dependency graph of the entries of a page, built from the ``_initiator``
+data Chrome adds to HAR files
+"""
+
+from functools import cached_property
+from typing import Iterable, List, Optional
+
+from .timeline import duration_to_microseconds
+
+
+def initiator_url(initiator: dict) -> Optional[str]:
+    """
+    :param initiator: ``_initiator`` of an entry
+    :type initiator: dict
+    :return: URL of the document or script that started the request, the
+        innermost script with a URL for a ``script`` initiator
+    :rtype: Optional[str]
+    """
+    if not initiator:
+        return None
+    if initiator.get("url"):
+        return initiator["url"]
+    stack = initiator.get("stack")
+    while stack:
+        for frame in stack.get("callFrames", []):
+            if frame.get("url"):
+                return frame["url"]
+        stack = stack.get("parent")
+    return None
+
+
+class DependencyGraph:
+    """
+    Which entry started which, from the initiator URL of each entry or the
+    redirect that led to it. Built in one pass over the entries in start
+    order with a URL to entry index, so a parent always starts before its
+    children and the graph is a forest.
+    """
+
+    def __init__(self, entries: Iterable):
+        """
+        :param entries: Entries sorted by start time
+        :type entries: Iterable[HarEntry]
+        """
+        self.entries = list(entries)
+        self.parents: List[Optional[int]] = [None] * len(self.entries)
+        self.children: List[List[int]] = [[] for _ in self.entries]
+        by_url = {}
+        redirects = {}
+        for index, entry in enumerate(self.entries):
+            url = initiator_url(entry.initiator)
+            parent = by_url.get(url) if url else None
+            if parent is None:
+                parent = redirects.get(entry.url)
+            if parent is not None:
+                self.parents[index] = parent
+                self.children[parent].append(index)
+            # A URL fetched again starts the requests made after it
+            by_url[entry.url] = index
+            if entry.response.redirectURL:
+                redirects[entry.response.redirectURL] = index
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @cached_property
+    def roots(self) -> List[int]:
+        """
+        :return: Positions of the entries without a known initiator
+        :rtype: List[int]
+        """
+        return [index for index, parent in enumerate(self.parents) if parent is None]
+
+    def chain(self, index: int) -> List[int]:
+        """
+        :param index: Position of an entry
+        :type index: int
+        :return: Positions of the entries that led to it, from the root to
+            the entry itself
+        :rtype: List[int]
+        """
+        chain = []
+        while index is not None:
+            chain.append(index)
+            index = self.parents[index]
+        return chain[::-1]
+
+    def critical_path(self) -> List[int]:
+        """
+        Longest chain weighted by the time of each entry. Parents come
+        before their children, so one pass in order gives the weight of the
+        chain ending at every entry. Ties go to the chain whose last entry
+        started last.
+
+        :return: Positions of the entries of the chain, from the root
+        :rtype: List[int]
+        """
+        if not self.entries:
+            return []
+        totals = []
+        for index, entry in enumerate(self.entries):
+            parent = self.parents[index]
+            weight = duration_to_microseconds(entry.time)
+            totals.append(weight + (0 if parent is None else totals[parent]))
+        last = max(range(len(totals)), key=lambda index: (totals[index], index))
+        return self.chain(last)
@@ -0,0 +1,232 @@
+"""
+Runs by URL matrix of repeated runs of a page, to find the resources that
+are slow or unstable across runs
+"""
+
+import math
+from array import array
+from itertools import zip_longest
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+from .stats import RunningStats, percentile
+from .urls import normalize_url
+from .waterfall import PHASES
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+#: Value of each cell of a ``UrlMatrix``: the time of the entry, the time
+#: of each of its ``timings`` phases and its transfer size
+METRICS = ("time",) + PHASES + ("transfer_size",)
+
+
+class UrlMatrix:
+    """
+    Time, timing phases and transfer size of every URL in every run. Each
+    URL has a column, looked up through a URL to column dict, and each run a
+    row, stored as one typed array of the ``METRICS`` of each column in
+    turn. Runs that did not request a URL are ``nan``. Requests of the same
+    URL in one run add up, and phases that did not apply (``-1``) count as 0.
+    """
+
+    def __init__(
+        self,
+        runs: Iterable[Iterable] = (),
+        normalize: Union[bool, Callable[[str], str]] = False,
+        use_numpy: Optional[bool] = None,
+    ):
+        """
+        :param runs: Entries of each run, e.g. ``HarPage.entries``
+        :type runs: Iterable[Iterable[HarEntry]]
+        :param normalize: Normalize the URLs with ``urls.normalize_url``, or
+            with this function, so e.g. cache busting query strings don't
+            split a resource into several columns
+        :type normalize: Union[bool, Callable[[str], str]]
+        :param use_numpy: Force NumPy on or off for ``url_stats``. By default
+            NumPy is used when it is installed.
+        :type use_numpy: Optional[bool]
+        """
+        if use_numpy is None:
+            use_numpy = np is not None
+        if use_numpy and np is None:
+            raise ValueError("NumPy is not installed")
+        self.use_numpy = use_numpy
+        self.normalize = normalize_url if normalize is True else normalize or None
+        self.urls: List[str] = []
+        self.url_index: Dict[str, int] = {}
+        self.rows: List[array] = []
+        for entries in runs:
+            self.add_run(entries)
+
+    def __repr__(self) -> str:
+        return f"UrlMatrix(runs={self.runs}, urls={len(self.urls)})"
+
+    @property
+    def runs(self) -> int:
+        """
+        :return: Number of runs
+        :rtype: int
+        """
+        return len(self.rows)
+
+    @property
+    def shape(self) -> tuple:
+        """
+        :return: Number of runs and of URLs
+        :rtype: tuple
+        """
+        return self.runs, len(self.urls)
+
+    def add_run(self, entries: Iterable):
+        """
+        Adds a row, in one pass over the entries of the run. Rows only have
+        the columns known when they were added, later columns are ``nan``.
+
+        :param entries: Entries of the run
+        :type entries: Iterable[HarEntry]
+        """
+        width = len(METRICS)
+        row = array("d", [math.nan]) * (len(self.urls) * width)
+        for entry in entries:
+            url = entry.url if self.normalize is None else self.normalize(entry.url)
+            column = self.url_index.get(url)
+            if column is None:
+                column = self.url_index[url] = len(self.urls)
+                self.urls.append(url)
+                row.extend(array("d", [math.nan]) * width)
+            values = [entry.time]
+            values += [
+                value if value and value > 0 else 0
+                for value in map(entry.timings.get, PHASES)
+            ]
+            values.append(entry.response.transferSize)
+            start = column * width
+            stop = start + width
+            if math.isnan(row[start]):
+                row[start:stop] = array("d", values)
+            else:
+                row[start:stop] = array(
+                    "d",
+                    [total + value for total, value in zip(row[start:stop], values)],
+                )
+        self.rows.append(row)
+
+    def column(self, url: str, metric: str = "time") -> array:
+        """
+        :param url: URL of the column, normalized if the matrix is
+        :type url: str
+        :param metric: One of ``METRICS``
+        :type metric: str
+        :return: Value of the metric in each run, ``nan`` when missing
+        :rtype: array.array
+        """
+        position = self.url_index[url] * len(METRICS) + METRICS.index(metric)
+        return array(
+            "d",
+            [row[position] if position < len(row) else math.nan for row in self.rows],
+        )
+
+    def values(self, url: str, metric: str = "time") -> List[float]:
+        """
+        :param url: URL of the column, normalized if the matrix is
+        :type url: str
+        :param metric: One of ``METRICS``
+        :type metric: str
+        :return: Value of the metric in each run that requested the URL
+        :rtype: List[float]
+        """
+        return [value for value in self.column(url, metric) if not math.isnan(value)]
+
+    def to_numpy(self, metric: str = "time"):
+        """
+        :param metric: One of ``METRICS``
+        :type metric: str
+        :return: Runs by URLs array of the metric, ``nan`` when missing
+        :rtype: numpy.ndarray
+        """
+        if np is None:
+            raise ValueError("NumPy is not installed")
+        width = len(METRICS)
+        position = METRICS.index(metric)
+        matrix = np.full((self.runs, len(self.urls)), np.nan)
+        for index, row in enumerate(self.rows):
+            columns = len(row) // width
+            matrix[index, :columns] = np.frombuffer(row)[position::width]
+        return matrix
+
+    def url_stats(
+        self, metric: str = "time", percentiles: Iterable[float] = (50, 75, 95, 99)
+    ) -> Dict[str, dict]:
+        """
+        Spread of a metric of each URL over the runs that requested it.
+
+        :param metric: One of ``METRICS``
+        :type metric: str
+        :param percentiles: Percentiles to compute, between 0 and 100
+        :type percentiles: Iterable[float]
+        :return: For each URL, the ``count`` of runs that requested it, the
+            ``missing`` runs, and the ``mean``, sample ``stdev`` (0 for a
+            single run), ``min``, ``max`` and ``percentiles`` of the metric
+        :rtype: Dict[str, dict]
+        """
+        if metric not in METRICS:
+            raise ValueError("metric must be one of:\n" + "\n".join(METRICS))
+        percentiles = list(percentiles)
+        if not self.urls:
+            return {}
+        if self.use_numpy:
+            return self._url_stats_numpy(metric, percentiles)
+        results = {}
+        width = len(METRICS)
+        position = METRICS.index(metric)
+        # Transpose the slices of the metric from every row into columns
+        columns = zip_longest(
+            *(row[position::width] for row in self.rows), fillvalue=math.nan
+        )
+        for url, values in zip(self.urls, columns):
+            ordered = sorted(value for value in values if not math.isnan(value))
+            stats = RunningStats(ordered)
+            results[url] = {
+                "count": stats.count,
+                "missing": self.runs - stats.count,
+                "mean": stats.mean,
+                "stdev": stats.stdev if stats.count > 1 else 0.0,
+                "min": stats.min,
+                "max": stats.max,
+                "percentiles": {
+                    value: percentile(ordered, value) for value in percentiles
+                },
+            }
+        return results
+
+    def _url_stats_numpy(
+        self, metric: str, percentiles: List[float]
+    ) -> Dict[str, dict]:
+        """Same as ``url_stats``, reduced over all columns at once"""
+        matrix = self.to_numpy(metric)
+        present = ~np.isnan(matrix)
+        counts = present.sum(axis=0)
+        means = np.where(present, matrix, 0.0).sum(axis=0) / counts
+        squares = np.where(present, (matrix - means) ** 2, 0.0).sum(axis=0)
+        stdevs = np.sqrt(squares / np.maximum(counts - 1, 1))
+        columns = {
+            "count": counts.tolist(),
+            "mean": means.tolist(),
+            "stdev": stdevs.tolist(),
+            "min": np.nanmin(matrix, axis=0).tolist(),
+            "max": np.nanmax(matrix, axis=0).tolist(),
+        }
+        quantiles = []
+        if percentiles:
+            quantiles = np.nanpercentile(matrix, percentiles, axis=0).tolist()
+        results = {}
+        for column, url in enumerate(self.urls):
+            stats = {name: values[column] for name, values in columns.items()}
+            stats["missing"] = self.runs - stats["count"]
+            stats["percentiles"] = {
+                value: row[column] for value, row in zip(percentiles, quantiles)
+            }
+            results[url] = stats
+        return results
@@ -3,13 +3,26 @@
 import abc
 from collections.abc import MutableMapping
 from functools import cached_property
-from typing import Any, Optional
+from typing import Any, Dict, List, Optional
 
 
 class GetHeaders:
     # pylint: disable=R0903
     """Mixin to get a header"""
 
+    @cached_property
+    def header_index(self) -> Dict[str, List[str]]:
+        """
+        Index of the headers, built once so lookups don't rescan the list
+
+        :return: Lower case header name to all of its values, in order
+        :rtype: Dict[str, List[str]]
+        """
+        index = {}
+        for header in self.raw_entry["headers"]:
+            index.setdefault(header["name"].lower(), []).append(header["value"])
+        return index
+
     def get_header_value(self, name: str) -> Optional[str]:
         """
         Returns the header value of the header defined in ``name``
@@ -19,9 +32,9 @@ class GetHeaders:
         :return: Value of the header
         :rtype: Optional[str]
         """
-        for header in self.raw_entry["headers"]:
-            if header["name"].lower() == name.lower():
-                return header["value"]
+        values = self.header_index.get(name.lower())
+        if values:
+            return values[0]
         return None
 
     @cached_property
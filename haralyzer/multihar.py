@@ -1,15 +1,53 @@
 """Contains the mutlihar parse object"""
 
+import itertools
+import operator
+import os
+from collections import deque
+from collections.abc import Sequence
+from concurrent.futures import Future, ProcessPoolExecutor
 from functools import cached_property
-from statistics import stdev
-from statistics import mean
-from typing import Union, List
+from typing import Callable, Dict, Hashable, Iterable, Iterator, Optional, Union, List
 from .assets import HarParser
+from .cache import SummaryCache
+from .columns import EntryColumns
+from .compare import compare_samples
+from .matrix import UrlMatrix
+from .stats import (
+    MAD_SCALE,
+    QuantileSketch,
+    RunningStats,
+    histogram,
+    iqr_fences,
+    median_absolute_deviation,
+    percentile,
+    trimmed_mean,
+)
+from .summary import (
+    METRICS,
+    Align,
+    load_har,
+    page_key,
+    select_pages,
+    select_summaries,
+    summarize_har,
+    summarize_pages,
+    summary_metrics,
+)
 
 DECIMAL_PRECISION = 0
 
+#: Outlier policies, and their default threshold: the share of runs trimmed
+#: at each end, the number of scaled MADs from the median, or the multiple
+#: of the interquartile range outside the quartiles
+OUTLIER_THRESHOLDS = {"trim": 0.1, "mad": 3.0, "iqr": 1.5}
+
+# Cached properties built from the HAR files rather than from the summaries
+_SOURCES = ("parsers", "pages", "_har_summaries", "summaries")
+
 
 class MultiHarParser:
+    # pylint: disable=R0902,R0904
     """
     An object that represents multiple HAR files OF THE SAME CONTENT.
     It is used to gather overall statistical data in situations where you have
@@ -17,11 +55,30 @@ class MultiHarParser:
     testing.
     """
 
-    def __init__(self, har_data, page_id=None, decimal_precision=DECIMAL_PRECISION):
+    #: Relative accuracy of the percentile sketches, see ``sketches``
+    sketch_relative_accuracy = 0.01
+
+    def __init__(
+        self,
+        har_data,
+        page_id=None,
+        decimal_precision=DECIMAL_PRECISION,
+        parallel=False,
+        max_workers=None,
+        outliers=None,
+        outlier_threshold=None,
+        outlier_metric="page",
+        align="id",
+        cache=None,
+    ):
+        # pylint: disable=R0913
         """
         :param har_data: A list of dict representing the JSON
         of a HAR file. See the docstring of HarParser.__init__ for more detail.
-        :type har_data: List[dict]
+        Paths of HAR files work too. Any other iterable, like a generator,
+        is streamed: it is consumed once and only the running statistics of
+        ``stats`` are kept, so memory doesn't grow with the number of runs.
+        :type har_data: Iterable[Union[dict, str]]
         :param page_id: If a page ID is provided, the
         multiparser will return aggregate results for this specific page. If
         not, it will assume that there is only one page in the run (this was
@@ -29,10 +86,56 @@ class MultiHarParser:
         :type page_id: str
         :param decimal_precision: The precision of the.
         :type decimal_precision: int
+        :param parallel: Summarize the HAR files in a pool of processes.
+            Each worker loads one HAR file and only sends back the summaries
+            of its pages, see ``summaries``. Give paths rather than dicts so
+            this process never loads the HAR files.
+        :type parallel: bool
+        :param max_workers: Number of processes, one per CPU by default
+        :type max_workers: int
+        :param outliers: Leave outlier runs out of the aggregates, see
+            ``set_outlier_policy``
+        :type outliers: str
+        :param outlier_threshold: Threshold of the outlier policy
+        :type outlier_threshold: float
+        :param outlier_metric: Metric the runs are judged by
+        :type outlier_metric: str
+        :param align: What ``page_id`` is matched with, as page IDs differ
+            between runs and browsers: ``id``, ``url``, ``title``, navigation
+            ``order``, or a function of the ``page_id``, ``url``, ``title``
+            and ``order`` of a page, see ``summary.page_key``. With
+            ``parallel``, a function is applied in this process, so it
+            doesn't have to be picklable.
+        :type align: Union[str, Callable[[dict], Hashable]]
+        :param cache: Summary cache, or the path of its SQLite database.
+            The summaries of every page of each HAR file are stored by
+            content hash, and the aggregates load them from there instead of
+            parsing the HAR file again. ``pages`` and ``parsers`` still parse
+            the HAR files. A cache opened from a path is closed by
+            ``close``, or at the end of a ``with`` block.
+        :type cache: Union[haralyzer.cache.SummaryCache, str, os.PathLike]
         """
         self.har_data = har_data
         self.page_id = page_id
         self.decimal_precision = decimal_precision
+        self.parallel = parallel
+        self.max_workers = max_workers
+        self.streaming = not isinstance(har_data, Sequence)
+        page_key(align)
+        self.align = align
+        self._owns_cache = cache is not None and not isinstance(cache, SummaryCache)
+        self.cache = SummaryCache(cache) if self._owns_cache else cache
+        #: ID of each HAR file of ``har_data``, for ``remove_har``
+        self.har_ids = [] if self.streaming else list(range(len(har_data)))
+        self._next_id = len(self.har_ids)
+        self.set_outlier_policy(outliers, outlier_threshold, outlier_metric)
+
+    def _require_sequence(self, name: str):
+        if self.streaming:
+            raise ValueError(
+                f"{name} needs har_data as a list, streamed HAR files are only "
+                "aggregated into stats"
+            )
 
     def get_load_times(self, asset_type: str) -> list:
         """
@@ -43,10 +146,10 @@ class MultiHarParser:
         :return: List of load times
         :rtype: list
         """
+        self._require_sequence("get_load_times")
         load_times = []
-        search_str = f"{asset_type}_load_time"
-        for har_page in self.pages:
-            val = getattr(har_page, search_str, None)
+        for summary in self.kept_summaries:
+            val = summary["load_times"].get(asset_type)
             if val is not None:
                 load_times.append(val)
         return load_times
@@ -61,44 +164,732 @@ class MultiHarParser:
             depending on the self.decimal_precision
         :rtype: int, float
         """
-        load_times = []
         # Handle edge cases like TTFB
-        if asset_type == "ttfb":
-            for page in self.pages:
-                if page.time_to_first_byte is not None:
-                    load_times.append(page.time_to_first_byte)
-        elif asset_type not in self.asset_types and asset_type != "page":
+        if (
+            asset_type != "ttfb"
+            and asset_type not in self.asset_types
+            and asset_type != "page"
+        ):
             raise ValueError(
                 f"asset_type must be one of:\nttfb\n{0}".format(
                     "\n".join(self.asset_types)
                 )
             )
+        stats = self.stats.get(asset_type, RunningStats())
+        if not stats.count or not stats.total:
+            return 0
+        return round(stats.stdev, self.decimal_precision)
+
+    def _metric_values(self, metric: str, exact: Optional[bool]) -> Optional[list]:
+        """
+        :param metric: One of ``summary.METRICS``
+        :type metric: str
+        :param exact: Whether to use the sorted values rather than the
+            sketch, by default unless ``har_data`` is streamed
+        :type exact: Optional[bool]
+        :return: Sorted values of the metric, or ``None`` to use the sketch
+        :rtype: Optional[list]
+        """
+        if metric not in METRICS:
+            raise ValueError("metric must be one of:\n" + "\n".join(METRICS))
+        if exact is None:
+            exact = not self.streaming
+        if not exact:
+            return None
+        self._require_sequence("Exact percentiles")
+        values = (
+            summary_metrics(summary).get(metric) for summary in self.kept_summaries
+        )
+        return sorted(value for value in values if value is not None)
+
+    def get_percentiles(
+        self,
+        asset_type: str,
+        percentiles: Iterable[float] = (50, 75, 95, 99),
+        exact: Optional[bool] = None,
+    ) -> Dict[float, Optional[Union[int, float]]]:
+        """
+        Percentiles of a load time, TTFB or size metric over all pages.
+        Exact ones are interpolated from the sorted values like
+        ``numpy.percentile``, approximate ones come from ``sketches``
+        within ``sketch_relative_accuracy``.
+
+        :param asset_type: Asset type of a load time, ``ttfb``,
+            ``<type>_size`` or ``transfer_size``, see ``summary.METRICS``
+        :type asset_type: str
+        :param percentiles: Percentiles to compute, between 0 and 100
+        :type percentiles: Iterable[float]
+        :param exact: Whether to compute them from the sorted values, by
+            default unless ``har_data`` is streamed
+        :type exact: bool
+        :return: Each percentile, rounded to ``self.decimal_precision``, or
+            ``None`` when no page has the metric
+        :rtype: Dict[float, Union[int, float, None]]
+        """
+        values = self._metric_values(asset_type, exact)
+        if values is None:
+            sketch = self.sketches.get(asset_type, QuantileSketch())
+            results = {value: sketch.percentile(value) for value in percentiles}
+        elif not values:
+            results = {value: None for value in percentiles}
         else:
-            load_times = self.get_load_times(asset_type)
+            results = {value: percentile(values, value) for value in percentiles}
+        return {
+            value: None if result is None else round(result, self.decimal_precision)
+            for value, result in results.items()
+        }
 
-        if not load_times or not sum(load_times):
-            return 0
-        return round(stdev(load_times), self.decimal_precision)
+    def get_histogram(
+        self, asset_type: str, bins: int = 10, exact: Optional[bool] = None
+    ) -> List[tuple]:
+        """
+        Distribution of a load time, TTFB or size metric over all pages.
 
-    @property
+        :param asset_type: Metric, see ``get_percentiles``
+        :type asset_type: str
+        :param bins: Number of equal width bins of an exact histogram. The
+            approximate one has the logarithmic buckets of the sketch.
+        :type bins: int
+        :param exact: Whether to bin the values, by default unless
+            ``har_data`` is streamed
+        :type exact: bool
+        :return: ``(lower, upper, count)`` of each bin, see
+            ``stats.histogram`` and ``QuantileSketch.histogram``
+        :rtype: List[tuple]
+        """
+        values = self._metric_values(asset_type, exact)
+        if values is None:
+            return self.sketches.get(asset_type, QuantileSketch()).histogram()
+        return histogram(values, bins)
+
+    def _mean(self, asset_type: str) -> Union[int, float]:
+        """
+        :param asset_type: Asset type, or ``ttfb``
+        :type asset_type: str
+        :return: Mean rounded to ``self.decimal_precision``
+        :rtype: int, float
+        """
+        return round(
+            self.stats.get(asset_type, RunningStats()).mean, self.decimal_precision
+        )
+
+    def timing_breakdown(
+        self, percentiles: Iterable[float] = (50, 75, 90, 95, 99)
+    ) -> dict:
+        """
+        Totals, percentiles and per host and asset type splits of the time
+        spent in each ``timings`` phase by the entries of all pages, reduced
+        over one set of columns built straight from the raw entries.
+
+        :param percentiles: Percentiles to compute, between 0 and 100
+        :type percentiles: Iterable[float]
+        :return: See ``EntryColumns.timing_breakdown``
+        :rtype: dict
+        """
+        entries = []
+        for parser, pages in itertools.groupby(
+            self.pages, key=operator.attrgetter("parser")
+        ):
+            page_ids = {page.page_id for page in pages}
+            entries.extend(
+                entry
+                for entry in parser.har_data["entries"]
+                if entry.get("pageref", "unknown") in page_ids
+            )
+        # The asset types of the pages, rather than of the summaries, which
+        # would summarize every page
+        asset_types = self.pages[0].asset_types if self.pages else {}
+        return EntryColumns(entries).timing_breakdown(
+            asset_types=asset_types, percentiles=percentiles
+        )
+
+    def url_matrix(
+        self, normalize: Union[bool, Callable[[str], str]] = False
+    ) -> UrlMatrix:
+        """
+        Time, timing phases and transfer size of every URL in every run, with
+        a row per page, to find the resources that are slow or unstable
+        across runs with ``UrlMatrix.url_stats``.
+
+        :param normalize: Normalize the URLs, see ``UrlMatrix``
+        :type normalize: Union[bool, Callable[[str], str]]
+        :return: Runs by URL matrix of the pages
+        :rtype: haralyzer.matrix.UrlMatrix
+        """
+        return UrlMatrix((page.entries for page in self.pages), normalize=normalize)
+
+    def steps(self, align: Optional[Align] = None) -> Dict[Hashable, dict]:
+        """
+        Aggregates multi page journeys per step. The pages of every run are
+        matched by their key with one pass over the per run summaries and a
+        dict of the steps by key, i.e. a hash join. Pages with the same key
+        in one run both count towards the step. Use it without ``page_id``,
+        so every page is summarized.
+
+        :param align: How pages are matched, see ``summary.page_key``,
+            ``self.align`` by default
+        :type align: Union[str, Callable[[dict], Hashable]]
+        :return: For each key, in order of first appearance, the number of
+            ``runs`` with the step and of ``missing`` runs, the
+            ``page_ids`` it had, and the ``stats`` of each metric of
+            ``summary.METRICS``
+        :rtype: Dict[Hashable, dict]
+        """
+        key = page_key(self.align if align is None else align)
+        steps = {}
+        for summaries in self._har_summaries:
+            seen = set()
+            for summary in summaries:
+                step_key = key(summary)
+                step = steps.get(step_key)
+                if step is None:
+                    step = steps[step_key] = {"runs": 0, "page_ids": [], "stats": {}}
+                if step_key not in seen:
+                    seen.add(step_key)
+                    step["runs"] += 1
+                if summary["page_id"] not in step["page_ids"]:
+                    step["page_ids"].append(summary["page_id"])
+                for metric, value in summary_metrics(summary).items():
+                    step["stats"].setdefault(metric, RunningStats()).add(value)
+        for step in steps.values():
+            step["missing"] = len(self._har_summaries) - step["runs"]
+        return steps
+
+    def compare(
+        self,
+        other: "MultiHarParser",
+        statistic: str = "mean",
+        iterations: int = 10000,
+        confidence: float = 0.95,
+        urls: bool = False,
+        url_metric: str = "time",
+        normalize: Union[bool, Callable[[str], str]] = False,
+        seed: Optional[int] = None,
+    ) -> dict:
+        # pylint: disable=R0913,R0914
+        """
+        Compares these runs, as the baseline, with the runs of ``other``,
+        as the candidate. Every metric of ``summary.METRICS`` both have, and
+        optionally every URL both requested, gets the difference of
+        ``statistic`` with a bootstrap confidence interval and a
+        Mann-Whitney U p-value, see ``compare.compare_samples``.
+
+        :param other: Candidate runs
+        :type other: MultiHarParser
+        :param statistic: ``mean`` or ``median``
+        :type statistic: str
+        :param iterations: Number of bootstrap resamples
+        :type iterations: int
+        :param confidence: Confidence level of the intervals
+        :type confidence: float
+        :param urls: Also compare ``url_metric`` of every URL, from
+            ``url_matrix``
+        :type urls: bool
+        :param url_metric: Metric of the URLs, see ``matrix.METRICS``
+        :type url_metric: str
+        :param normalize: Normalize the URLs, see ``url_matrix``
+        :type normalize: Union[bool, Callable[[str], str]]
+        :param seed: Seed of the bootstrap, for reproducible intervals
+        :type seed: Optional[int]
+        :return: Comparison of each metric in ``metrics``, and of each URL
+            in ``urls``
+        :rtype: dict
+        """
+        self._require_sequence("compare")
+        other._require_sequence("compare")  # pylint: disable=W0212
+        options = {
+            "statistic": statistic,
+            "iterations": iterations,
+            "confidence": confidence,
+            "seed": seed,
+        }
+        results = {"metrics": {}, "urls": {}}
+        for metric in METRICS:
+            baseline = self._metric_values(metric, True)
+            candidate = other._metric_values(metric, True)  # pylint: disable=W0212
+            if baseline and candidate:
+                results["metrics"][metric] = compare_samples(
+                    baseline, candidate, **options
+                )
+        if urls:
+            matrix, other_matrix = self.url_matrix(normalize), other.url_matrix(
+                normalize
+            )
+            for url in matrix.urls:
+                if url in other_matrix.url_index:
+                    results["urls"][url] = compare_samples(
+                        matrix.values(url, url_metric),
+                        other_matrix.values(url, url_metric),
+                        **options,
+                    )
+        return results
+
+    def set_outlier_policy(
+        self,
+        outliers: Optional[str] = None,
+        threshold: Optional[float] = None,
+        metric: str = "page",
+    ):
+        """
+        Sets which runs are left out of the aggregates, judged by one
+        metric of their summary. ``trim`` drops the ``threshold`` share of
+        runs at each end, so the means are trimmed means. ``mad`` drops the
+        runs more than ``threshold`` scaled median absolute deviations from
+        the median. ``iqr`` drops the runs outside the Tukey fences,
+        ``threshold`` interquartile ranges outside the quartiles. Only the
+        aggregates are dropped, the summaries are kept, so changing the
+        policy doesn't parse the HAR files again.
+
+        :param outliers: One of ``OUTLIER_THRESHOLDS``, or ``None`` to keep
+            every run
+        :type outliers: Optional[str]
+        :param threshold: Threshold of the policy, see
+            ``OUTLIER_THRESHOLDS`` for the defaults. At least 0 and below 0.5
+            for ``trim``, above 0 for ``mad`` and ``iqr``.
+        :type threshold: Optional[float]
+        :param metric: Metric of ``summary.METRICS`` the runs are judged by
+        :type metric: str
+        """
+        if outliers is not None and outliers not in OUTLIER_THRESHOLDS:
+            raise ValueError(
+                "outliers must be None or one of:\n" + "\n".join(OUTLIER_THRESHOLDS)
+            )
+        if metric not in METRICS:
+            raise ValueError("metric must be one of:\n" + "\n".join(METRICS))
+        if outliers is not None:
+            self._require_sequence("Outlier policies")
+        if threshold is None:
+            threshold = OUTLIER_THRESHOLDS.get(outliers)
+        elif outliers == "trim" and not 0 <= threshold < 0.5:
+            # Trimming half of the runs at each end would leave none
+            raise ValueError("The trim threshold should be between 0 and 0.5")
+        elif outliers in ("mad", "iqr") and threshold <= 0:
+            raise ValueError(f"The {outliers} threshold should be above 0")
+        self.outliers = outliers
+        self.outlier_threshold = threshold
+        self.outlier_metric = metric
+        self.invalidate(keep_summaries=True)
+
+    def add_har(self, har: Union[dict, str, os.PathLike]) -> Optional[int]:
+        """
+        Adds a run. Only the new HAR file is loaded and summarized, its
+        summaries are folded into ``stats`` and ``sketches``, and the
+        aggregates reduced from them are dropped, so they are computed again
+        on next use. With an outlier policy, the aggregates are reduced
+        again from the cached summaries. When ``har_data`` is streamed, the
+        run is only folded into ``stats`` and ``sketches``.
+
+        :param har: A ``dict`` of a HAR file, or the path to one
+        :type har: Union[dict, str, os.PathLike]
+        :return: ID of the run for ``remove_har``, ``None`` when streaming
+        :rtype: Optional[int]
+        """
+        if self.streaming:
+            self._fold(self._aggregates, self._summarize(har))
+            self._invalidate_derived(keep=("_aggregates",))
+            return None
+        cached = vars(self)
+        har_id = self._next_id
+        self._next_id += 1
+        if not isinstance(self.har_data, list):
+            self.har_data = list(self.har_data)
+        self.har_data.append(har)
+        self.har_ids.append(har_id)
+        if "parsers" in cached:
+            self.parsers.append(load_har(har))
+        keep = ("parsers", "_har_summaries")
+        if "_har_summaries" in cached:
+            if "parsers" in cached and self.cache is None:
+                summaries = summarize_pages(self.parsers[-1], self.page_id, self.align)
+            else:
+                summaries = self._summarize(har)
+            self._har_summaries.append(summaries)
+            if "_aggregates" in cached and not self.outliers:
+                self._fold(self._aggregates, summaries)
+                keep += ("_aggregates",)
+        self._invalidate_derived(keep)
+        return har_id
+
+    def remove_har(self, har_id: int):
+        """
+        Removes a run. Nothing is loaded again: the aggregates are reduced
+        again from the cached summaries of the other runs on next use.
+
+        :param har_id: ID of the run, see ``har_ids`` and ``add_har``
+        :type har_id: int
+        """
+        self._require_sequence("remove_har")
+        if har_id not in self.har_ids:
+            raise ValueError(f"No HAR file with the ID {har_id}")
+        index = self.har_ids.index(har_id)
+        if not isinstance(self.har_data, list):
+            self.har_data = list(self.har_data)
+        del self.har_data[index]
+        del self.har_ids[index]
+        cached = vars(self)
+        for name in ("parsers", "_har_summaries"):
+            if name in cached:
+                del cached[name][index]
+        self._invalidate_derived(keep=("parsers", "_har_summaries"))
+
+    def _invalidate_derived(self, keep: tuple):
+        """
+        :param keep: Cached properties to keep
+        :type keep: tuple
+        """
+        if self.streaming:
+            # Streamed HAR files are consumed, so their running aggregates
+            # couldn't be built again
+            keep += ("_aggregates",)
+        for name in list(vars(self)):
+            if name in keep:
+                continue
+            if isinstance(getattr(type(self), name, None), cached_property):
+                del self.__dict__[name]
+
+    def __enter__(self) -> "MultiHarParser":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Closes ``cache`` if it was opened from a path"""
+        if self._owns_cache:
+            self.cache.close()
+
+    def invalidate(self, keep_summaries: bool = False):
+        """
+        Drops the cached parsers, pages and aggregates, so they are built
+        again on next use. Call it after changing ``har_data`` or
+        ``page_id``, which also gives new ``har_ids`` if the number of HAR
+        files changed. When streaming, the running aggregates of the HAR
+        files already consumed are kept, since they can't be read again.
+
+        :param keep_summaries: Only drop what is reduced from the summaries
+        :type keep_summaries: bool
+        """
+        if keep_summaries:
+            self._invalidate_derived(keep=_SOURCES)
+            return
+        if not self.streaming and len(self.har_ids) != len(self.har_data):
+            self.har_ids = list(range(len(self.har_data)))
+            self._next_id = len(self.har_ids)
+        self._invalidate_derived(keep=())
+
+    @cached_property
+    def parsers(self) -> List[HarParser]:
+        """
+        Parser of each HAR file, built once and shared by all aggregates.
+
+        :return: Parsers of ``har_data``
+        :rtype: List[haralyzer.assets.HarParser]
+        """
+        self._require_sequence("parsers")
+        return [load_har(har) for har in self.har_data]
+
+    @cached_property
     def pages(self) -> List["HarPage"]:  # noqa: F821
         """
-        Aggregate pages of all the parser objects.
+        Aggregate pages of all the parser objects. Built once, see
+        ``invalidate``.
 
         :return: All the pages from parsers
         :rtype: List[haralyzer.assets.HarPage]
         """
         pages = []
-        for har_dict in self.har_data:
-            har_parser = HarParser(har_data=har_dict)
-            if self.page_id:
-                for page in har_parser.pages:
-                    if page.page_id == self.page_id:
-                        pages.append(page)
-            else:
-                pages = pages + har_parser.pages
+        for har_parser in self.parsers:
+            pages.extend(select_pages(har_parser, self.page_id, self.align))
         return pages
 
+    @cached_property
+    def summaries(self) -> List[dict]:
+        """
+        Summary of each page, which all the load time aggregates are reduced
+        from. With ``parallel``, the HAR files are loaded and summarized in
+        worker processes, which gives the same summaries as doing it here.
+
+        :return: Summary of each page, see ``summary.summarize_page``
+        :rtype: List[dict]
+        """
+        return [summary for summaries in self._har_summaries for summary in summaries]
+
+    @cached_property
+    def _har_summaries(self) -> List[List[dict]]:
+        """
+        :return: Summaries of the pages of each HAR file of ``har_data``
+        :rtype: List[List[dict]]
+        """
+        self._require_sequence("summaries")
+        if not self.parallel and self.cache is None:
+            return [
+                summarize_pages(parser, self.page_id, self.align)
+                for parser in self.parsers
+            ]
+        return list(self._iter_har_summaries())
+
+    def _iter_har_summaries(self) -> Iterator[List[dict]]:
+        """
+        Loads and summarizes the HAR files one at a time, or in worker
+        processes with ``parallel``, without keeping the HAR files or more
+        than a few summaries around.
+
+        :return: Summaries of the pages of each HAR file
+        :rtype: Iterator[List[dict]]
+        """
+        if not self.parallel:
+            for har in self.har_data:
+                yield self._summarize(har)
+            return
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            # Only submit a few HAR files ahead of the results, as
+            # executor.map would consume the whole iterable at once
+            window = 2 * (self.max_workers or os.cpu_count() or 1)
+            pending = deque()
+            for har in self.har_data:
+                pending.append(self._submit(executor, har))
+                if len(pending) >= window:
+                    yield self._collect(*pending.popleft())
+            while pending:
+                yield self._collect(*pending.popleft())
+
+    def _summarize(self, har: Union[dict, str, os.PathLike]) -> List[dict]:
+        """
+        :param har: A ``dict`` of a HAR file, or the path to one
+        :type har: Union[dict, str, os.PathLike]
+        :return: Summaries of the selected pages, from ``cache`` if it has
+            them
+        :rtype: List[dict]
+        """
+        if self.cache is None:
+            return summarize_har(har, self.page_id, self.align)
+        return select_summaries(self.cache.summarize(har), self.page_id, self.align)
+
+    def _submit(self, executor: ProcessPoolExecutor, har) -> tuple:
+        """
+        :param executor: Pool summarizing the HAR files missing from
+            ``cache``
+        :type executor: ProcessPoolExecutor
+        :param har: A ``dict`` of a HAR file, or the path to one
+        :type har: Union[dict, str, os.PathLike]
+        :return: Content hash to cache the summaries under, ``None`` if they
+            are not to be cached, and a future of the summaries, of all the
+            pages when ``_collect`` selects them
+        :rtype: tuple
+        """
+        if self.cache is None:
+            if callable(self.align):
+                # Functions, like lambdas, may not be picklable, so the pages
+                # are selected in this process
+                return None, executor.submit(summarize_har, har)
+            return None, executor.submit(summarize_har, har, self.page_id, self.align)
+        # Only the bytes of a path are hashed here, the workers load the JSON
+        key = self.cache.key(har)
+        summaries = self.cache.get(key)
+        if summaries is None:
+            return key, executor.submit(summarize_har, har)
+        future = Future()
+        future.set_result(summaries)
+        return None, future
+
+    def _collect(self, key: Optional[str], future: Future) -> List[dict]:
+        """
+        :param key: Content hash to cache the summaries under
+        :type key: Optional[str]
+        :param future: Future of the summaries, see ``_submit``
+        :type future: Future
+        :return: Summaries of the selected pages
+        :rtype: List[dict]
+        """
+        summaries = future.result()
+        if key is not None:
+            self.cache.put(key, summaries)
+        if self.cache is None and not callable(self.align):
+            return summaries
+        return select_summaries(summaries, self.page_id, self.align)
+
+    @cached_property
+    def _outliers(self) -> tuple:
+        """
+        :return: ``kept_summaries``, and ``outlier_report``
+        :rtype: tuple
+        """
+        summaries = self.summaries
+        values = [
+            summary_metrics(summary).get(self.outlier_metric) for summary in summaries
+        ]
+        runs = sorted(
+            (value, run) for run, value in enumerate(values) if value is not None
+        )
+        reasons = {}
+        if self.outliers == "trim" and runs:
+            cut = int(len(runs) * self.outlier_threshold)
+            stop = len(runs) - cut
+            for _, run in runs[:cut]:
+                reasons[run] = ("lowest", runs[cut][0])
+            for _, run in runs[stop:]:
+                reasons[run] = ("highest", runs[stop - 1][0])
+        elif self.outliers in ("mad", "iqr") and runs:
+            lower, upper = self._outlier_bounds([value for value, _ in runs])
+            for value, run in runs:
+                if value < lower:
+                    reasons[run] = ("below", lower)
+                elif value > upper:
+                    reasons[run] = ("above", upper)
+        har_ids = [
+            har_id
+            for har_id, har_summaries in zip(self.har_ids, self._har_summaries)
+            for _ in har_summaries
+        ]
+        report = [
+            {
+                "har_id": har_ids[run],
+                "page_id": summaries[run]["page_id"],
+                "metric": self.outlier_metric,
+                "value": values[run],
+                "policy": self.outliers,
+                "reason": reasons[run][0],
+                "bound": reasons[run][1],
+            }
+            for run in sorted(reasons)
+        ]
+        kept = [summary for run, summary in enumerate(summaries) if run not in reasons]
+        return kept, report
+
+    def _outlier_bounds(self, ordered: List[float]) -> tuple:
+        """
+        :param ordered: Sorted values of ``outlier_metric``
+        :type ordered: List[float]
+        :return: Lowest and highest value kept by the ``mad`` or ``iqr``
+            policy
+        :rtype: tuple
+        """
+        if self.outliers == "iqr":
+            return iqr_fences(ordered, self.outlier_threshold)
+        median = percentile(ordered, 50)
+        spread = self.outlier_threshold * MAD_SCALE * median_absolute_deviation(ordered)
+        return median - spread, median + spread
+
+    @property
+    def kept_summaries(self) -> List[dict]:
+        """
+        :return: Summaries of the runs the aggregates are reduced from, all
+            but the outliers of the outlier policy
+        :rtype: List[dict]
+        """
+        self._require_sequence("kept_summaries")
+        return self._outliers[0]
+
+    @property
+    def outlier_report(self) -> List[dict]:
+        """
+        Runs left out of the aggregates by the outlier policy, and why.
+
+        :return: For each excluded run, the ``har_id`` of its HAR file, see
+            ``remove_har``, its ``page_id``, the ``metric`` and its ``value``, the
+            ``policy``, and the ``reason``: ``lowest`` or ``highest`` share
+            for ``trim``, ``below`` or ``above`` the ``bound`` for ``mad``
+            and ``iqr``. For ``trim``, ``bound`` is the nearest kept value.
+        :rtype: List[dict]
+        """
+        self._require_sequence("outlier_report")
+        return self._outliers[1]
+
+    def get_robust_stats(self, asset_type: str, trim: float = 0.1) -> dict:
+        """
+        Robust statistics of a metric over every run, outliers included.
+
+        :param asset_type: Metric, see ``get_percentiles``
+        :type asset_type: str
+        :param trim: Share of the runs to drop at each end for the trimmed
+            mean
+        :type trim: float
+        :return: ``count``, ``median``, ``mad`` scaled by
+            ``stats.MAD_SCALE``, ``trimmed_mean``, and the ``iqr_fences``,
+            ``None`` when no run has the metric
+        :rtype: dict
+        """
+        if asset_type not in METRICS:
+            raise ValueError("metric must be one of:\n" + "\n".join(METRICS))
+        self._require_sequence("get_robust_stats")
+        values = (
+            summary_metrics(summary).get(asset_type) for summary in self.summaries
+        )
+        ordered = sorted(value for value in values if value is not None)
+        if not ordered:
+            return {
+                "count": 0,
+                "median": None,
+                "mad": None,
+                "trimmed_mean": None,
+                "iqr_fences": None,
+            }
+        return {
+            "count": len(ordered),
+            "median": percentile(ordered, 50),
+            "mad": MAD_SCALE * median_absolute_deviation(ordered),
+            "trimmed_mean": trimmed_mean(ordered, trim),
+            "iqr_fences": iqr_fences(ordered),
+        }
+
+    @cached_property
+    def _aggregates(self) -> dict:
+        """
+        :return: ``stats``, ``sketches``, and the ``asset_types`` of the
+            first page
+        :rtype: dict
+        """
+        aggregates = {"stats": {}, "sketches": {}, "asset_types": None}
+        if not self.streaming:
+            self._fold(aggregates, self.kept_summaries)
+            return aggregates
+        for summaries in self._iter_har_summaries():
+            self._fold(aggregates, summaries)
+        return aggregates
+
+    def _fold(self, aggregates: dict, summaries: Iterable[dict]):
+        """
+        :param aggregates: ``stats``, ``sketches`` and ``asset_types`` to
+            add the summaries to
+        :type aggregates: dict
+        :param summaries: Summaries of pages
+        :type summaries: Iterable[dict]
+        """
+        stats, sketches = aggregates["stats"], aggregates["sketches"]
+        for summary in summaries:
+            if aggregates["asset_types"] is None:
+                aggregates["asset_types"] = summary["asset_types"]
+            for metric, value in summary_metrics(summary).items():
+                stats.setdefault(metric, RunningStats()).add(value)
+                if metric not in sketches:
+                    sketches[metric] = QuantileSketch(self.sketch_relative_accuracy)
+                sketches[metric].add(value)
+
+    @property
+    def stats(self) -> Dict[str, RunningStats]:
+        """
+        Running count, mean, variance, minimum and maximum of each metric
+        of ``summary.METRICS`` over all pages, which the aggregate properties
+        and ``get_stdev`` are computed from.
+
+        :return: Statistics per metric
+        :rtype: Dict[str, RunningStats]
+        """
+        return self._aggregates["stats"]
+
+    @property
+    def sketches(self) -> Dict[str, QuantileSketch]:
+        """
+        Quantile sketch of each metric of ``summary.METRICS``, built in the
+        same pass as ``stats``, which approximate percentiles come from.
+        Sketches of other parsers, or saved with ``QuantileSketch.to_dict``,
+        can be merged in.
+
+        :return: Sketch per metric
+        :rtype: Dict[str, QuantileSketch]
+        """
+        return self._aggregates["sketches"]
+
     @cached_property
     def asset_types(self) -> dict:
         """
@@ -107,7 +898,7 @@ class MultiHarParser:
         :return: Asset types from HarPage
         :rtype: dict
         """
-        return self.pages[0].asset_types
+        return self._aggregates["asset_types"] or {}
 
     @cached_property
     def time_to_first_byte(self) -> Union[int, float]:
@@ -116,11 +907,7 @@ class MultiHarParser:
             Can be an `int` or `float` depending on the self.decimal_precision
         :rtype: int, float
         """
-        ttfb = []
-        for page in self.pages:
-            if page.time_to_first_byte is not None:
-                ttfb.append(page.time_to_first_byte)
-        return round(mean(ttfb), self.decimal_precision)
+        return self._mean("ttfb")
 
     @cached_property
     def page_load_time(self) -> Union[int, float]:
@@ -129,8 +916,7 @@ class MultiHarParser:
             Can be an `int` or `float` depending on the self.decimal_precision
         :rtype: int, float
         """
-        load_times = self.get_load_times("page")
-        return round(mean(load_times), self.decimal_precision)
+        return self._mean("page")
 
     @cached_property
     def js_load_time(self) -> Union[int, float]:
@@ -139,8 +925,7 @@ class MultiHarParser:
             Can be an `int` or `float` depending on the self.decimal_precision
         :rtype: int, float
         """
-        load_times = self.get_load_times("js")
-        return round(mean(load_times), self.decimal_precision)
+        return self._mean("js")
 
     @cached_property
     def css_load_time(self) -> Union[int, float]:
@@ -149,8 +934,7 @@ class MultiHarParser:
             Can be an `int` or `float` depending on the self.decimal_precision
         :rtype: int, float
         """
-        load_times = self.get_load_times("css")
-        return round(mean(load_times), self.decimal_precision)
+        return self._mean("css")
 
     @cached_property
     def image_load_time(self) -> Union[int, float]:
@@ -159,8 +943,7 @@ class MultiHarParser:
             Can be an `int` or `float` depending on the self.decimal_precision
         :rtype: int, float
         """
-        load_times = self.get_load_times("image")
-        return round(mean(load_times), self.decimal_precision)
+        return self._mean("image")
 
     @cached_property
     def html_load_time(self) -> Union[int, float]:
@@ -169,8 +952,7 @@ class MultiHarParser:
             Can be an `int` or `float` depending on the self.decimal_precision
         :rtype: int, float
         """
-        load_times = self.get_load_times("html")
-        return round(mean(load_times), self.decimal_precision)
+        return self._mean("html")
 
     @cached_property
     def audio_load_time(self) -> Union[int, float]:
@@ -179,8 +961,7 @@ class MultiHarParser:
             Can be an `int` or `float` depending on the self.decimal_precision
         :rtype: int, float
         """
-        load_times = self.get_load_times("audio")
-        return round(mean(load_times), self.decimal_precision)
+        return self._mean("audio")
 
     @cached_property
     def video_load_time(self) -> Union[int, float]:
@@ -189,5 +970,4 @@ class MultiHarParser:
             Can be an `int` or `float` depending on the self.decimal_precision
         :rtype: int, float
         """
-        load_times = self.get_load_times("video")
-        return round(mean(load_times), self.decimal_precision)
+        return self._mean("video")
@@ -0,0 +1,382 @@
+"""
+Online statistics, which aggregate a stream of values in constant memory,
+and exact percentiles, histograms and robust statistics of sorted values
+"""
+
+import math
+from statistics import StatisticsError
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+Number = Union[int, float]
+Bin = Tuple[Number, Number, int]
+
+#: Scales the median absolute deviation of normally distributed values to
+#: their standard deviation
+MAD_SCALE = 1.4826
+
+
+def percentile(ordered: Sequence[Number], value: Number) -> float:
+    """
+    :param ordered: Sorted values
+    :type ordered: Sequence[Union[int, float]]
+    :param value: Percentile between 0 and 100
+    :type value: Union[int, float]
+    :return: Percentile with linear interpolation, like NumPy's default
+    :rtype: float
+    """
+    position = (len(ordered) - 1) * value / 100
+    lower = math.floor(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def trimmed_mean(ordered: Sequence[Number], proportion: float = 0.1) -> float:
+    """
+    :param ordered: Sorted values
+    :type ordered: Sequence[Union[int, float]]
+    :param proportion: Share of the values to drop at each end, rounded down
+    :type proportion: float
+    :return: Mean of the remaining values
+    :rtype: float
+    """
+    if not 0 <= proportion < 0.5:
+        raise ValueError("The trimmed proportion should be between 0 and 0.5")
+    if not ordered:
+        raise StatisticsError("trimmed_mean requires at least one data point")
+    cut = int(len(ordered) * proportion)
+    stop = len(ordered) - cut
+    kept = ordered[cut:stop]
+    return sum(kept) / len(kept)
+
+
+def median_absolute_deviation(ordered: Sequence[Number]) -> float:
+    """
+    :param ordered: Sorted values
+    :type ordered: Sequence[Union[int, float]]
+    :return: Median of the distances to the median, not scaled by
+        ``MAD_SCALE``
+    :rtype: float
+    """
+    if not ordered:
+        raise StatisticsError(
+            "median_absolute_deviation requires at least one data point"
+        )
+    median = percentile(ordered, 50)
+    return percentile(sorted(abs(value - median) for value in ordered), 50)
+
+
+def iqr_fences(ordered: Sequence[Number], factor: float = 1.5) -> Tuple[float, float]:
+    """
+    :param ordered: Sorted values
+    :type ordered: Sequence[Union[int, float]]
+    :param factor: Multiple of the interquartile range between the
+        quartiles and the fences
+    :type factor: float
+    :return: Lower and upper Tukey fence
+    :rtype: Tuple[float, float]
+    """
+    if not ordered:
+        raise StatisticsError("iqr_fences requires at least one data point")
+    lower, upper = percentile(ordered, 25), percentile(ordered, 75)
+    return lower - factor * (upper - lower), upper + factor * (upper - lower)
+
+
+def histogram(ordered: Sequence[Number], bins: int = 10) -> List[Bin]:
+    """
+    :param ordered: Sorted values
+    :type ordered: Sequence[Union[int, float]]
+    :param bins: Number of equal width bins between the smallest and the
+        largest value
+    :type bins: int
+    :return: ``(lower, upper, count)`` of each bin. Bins include their lower
+        bound, and the last one also its upper bound.
+    :rtype: List[Tuple[Union[int, float], Union[int, float], int]]
+    """
+    if bins < 1:
+        raise ValueError("There should be at least one bin")
+    if not ordered:
+        return []
+    low, high = ordered[0], ordered[-1]
+    if low == high:
+        return [(low, high, len(ordered))]
+    width = (high - low) / bins
+    counts = [0] * bins
+    for value in ordered:
+        counts[min(int((value - low) / width), bins - 1)] += 1
+    return [
+        (
+            low + width * index,
+            high if index == bins - 1 else low + width * (index + 1),
+            count,
+        )
+        for index, count in enumerate(counts)
+    ]
+
+
+class RunningStats:
+    """
+    Count, sum, mean, sample variance, minimum and maximum of a stream of
+    numbers, using Welford's algorithm for the variance. Accumulators of
+    different streams can be merged.
+    """
+
+    def __init__(self, values: Iterable[Number] = ()):
+        """
+        :param values: Values to start with
+        :type values: Iterable[Union[int, float]]
+        """
+        self.count = 0
+        self.total: Number = 0
+        self.min: Optional[Number] = None
+        self.max: Optional[Number] = None
+        self._mean = 0.0
+        self._m2 = 0.0
+        for value in values:
+            self.add(value)
+
+    def __repr__(self) -> str:
+        return f"RunningStats(count={self.count}, total={self.total})"
+
+    def add(self, value: Number):
+        """
+        :param value: Value to add
+        :type value: Union[int, float]
+        """
+        self.count += 1
+        self.total += value
+        delta = value - self._mean
+        self._mean += delta / self.count
+        self._m2 += delta * (value - self._mean)
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def merge(self, other: "RunningStats") -> "RunningStats":
+        # pylint: disable=W0212
+        """
+        Adds the values of another accumulator, as if they had been added to
+        this one.
+
+        :param other: Accumulator to merge in
+        :type other: RunningStats
+        :return: This accumulator
+        :rtype: RunningStats
+        """
+        if not other.count:
+            return self
+        if not self.count:
+            self.count, self.total = other.count, other.total
+            self.min, self.max = other.min, other.max
+            self._mean, self._m2 = other._mean, other._m2
+            return self
+        count = self.count + other.count
+        delta = other._mean - self._mean
+        self._m2 += other._m2 + delta * delta * self.count * other.count / count
+        self._mean += delta * other.count / count
+        self.count = count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def to_dict(self) -> dict:
+        """
+        :return: JSON serializable state, e.g. to save partial results
+        :rtype: dict
+        """
+        return {
+            "count": self.count,
+            "total": self.total,
+            "min": self.min,
+            "max": self.max,
+            "mean": self._mean,
+            "m2": self._m2,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RunningStats":
+        """
+        :param data: Output of ``to_dict``
+        :type data: dict
+        :return: Accumulator with the same state
+        :rtype: RunningStats
+        """
+        stats = cls()
+        stats.count, stats.total = data["count"], data["total"]
+        stats.min, stats.max = data["min"], data["max"]
+        stats._mean, stats._m2 = data["mean"], data["m2"]
+        return stats
+
+    @property
+    def mean(self) -> Number:
+        """
+        :return: Mean of the values, from the exact sum like
+            ``statistics.mean``, and also an ``int`` when the values are
+            ``int`` and their mean is a whole number
+        :rtype: Union[int, float]
+        """
+        if not self.count:
+            raise StatisticsError("mean requires at least one data point")
+        if isinstance(self.total, int) and not self.total % self.count:
+            return self.total // self.count
+        return self.total / self.count
+
+    @property
+    def variance(self) -> float:
+        """
+        :return: Sample variance of the values
+        :rtype: float
+        """
+        if self.count < 2:
+            raise StatisticsError("variance requires at least two data points")
+        return self._m2 / (self.count - 1)
+
+    @property
+    def stdev(self) -> float:
+        """
+        :return: Sample standard deviation of the values
+        :rtype: float
+        """
+        return math.sqrt(self.variance)
+
+
+class QuantileSketch:
+    # pylint: disable=R0902
+    """
+    Mergeable quantile sketch in the style of DDSketch. Positive values are
+    counted in buckets whose bounds grow by a factor ``gamma``, so any
+    percentile is estimated within ``relative_accuracy`` of a value of the
+    stream, in memory that only grows with the logarithm of the range of
+    values. Zero and negative values share one bucket estimated as 0.
+    Sketches with the same accuracy can be merged, e.g. from worker
+    processes or saved partial results.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, values: Iterable[Number] = ()):
+        """
+        :param relative_accuracy: Largest relative error of the estimates
+        :type relative_accuracy: float
+        :param values: Values to start with
+        :type values: Iterable[Union[int, float]]
+        """
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("The relative accuracy should be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.min: Optional[Number] = None
+        self.max: Optional[Number] = None
+        for value in values:
+            self.add(value)
+
+    def __repr__(self) -> str:
+        return f"QuantileSketch(count={self.count}, bins={len(self.bins)})"
+
+    def add(self, value: Number):
+        """
+        :param value: Value to add
+        :type value: Union[int, float]
+        """
+        self.count += 1
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+        if value <= 0:
+            self.zero_count += 1
+            return
+        key = math.ceil(math.log(value) / self._log_gamma)
+        self.bins[key] = self.bins.get(key, 0) + 1
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """
+        :param other: Sketch to merge in, with the same accuracy
+        :type other: QuantileSketch
+        :return: This sketch
+        :rtype: QuantileSketch
+        """
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Only sketches with the same accuracy can be merged")
+        if not other.count:
+            return self
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    def _estimate(self, key: int) -> float:
+        """Value with the smallest relative error to every value of a bucket"""
+        return 2 * self.gamma**key / (self.gamma + 1)
+
+    def _clamp(self, value: float) -> Number:
+        return min(max(value, self.min), self.max)
+
+    def percentile(self, value: Number) -> Optional[float]:
+        """
+        :param value: Percentile between 0 and 100
+        :type value: Union[int, float]
+        :return: Estimate of the percentile, exact for 0 and 100, ``None``
+            without values
+        :rtype: Optional[float]
+        """
+        if not self.count:
+            return None
+        if value <= 0:
+            return self.min
+        rank = value / 100 * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return self._clamp(0)
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if rank < seen:
+                return self._clamp(self._estimate(key))
+        return self.max
+
+    def histogram(self) -> List[Bin]:
+        """
+        :return: ``(lower, upper, count)`` of each non empty bucket, in
+            order. Buckets include their upper bound.
+        :rtype: List[Tuple[Union[int, float], Union[int, float], int]]
+        """
+        bins = []
+        if self.zero_count:
+            bins.append((min(self.min, 0), 0, self.zero_count))
+        for key in sorted(self.bins):
+            bins.append((self.gamma ** (key - 1), self.gamma**key, self.bins[key]))
+        return bins
+
+    def to_dict(self) -> dict:
+        """
+        :return: JSON serializable state, e.g. to save partial results
+        :rtype: dict
+        """
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "count": self.count,
+            "min": self.min,
+            "max": self.max,
+            "zero_count": self.zero_count,
+            "bins": sorted(self.bins.items()),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "QuantileSketch":
+        """
+        :param data: Output of ``to_dict``
+        :type data: dict
+        :return: Sketch with the same state
+        :rtype: QuantileSketch
+        """
+        sketch = cls(data["relative_accuracy"])
+        sketch.count, sketch.zero_count = data["count"], data["zero_count"]
+        sketch.min, sketch.max = data["min"], data["max"]
+        sketch.bins = {int(key): count for key, count in data["bins"]}
+        return sketch
@@ -0,0 +1,261 @@
+"""
+Compact summaries of pages, which are cheap to send between processes and
+to reduce into the aggregates of ``MultiHarParser``
+"""
+
+import operator
+import os
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple, Union
+
+from .assets import HarPage, HarParser
+from .timeline import timestamp_to_microseconds
+
+#: Load times in a summary, see the ``*_load_time`` properties of HarPage
+LOAD_TIME_TYPES = (
+    "initial",
+    "content",
+    "page",
+    "image",
+    "css",
+    "text",
+    "js",
+    "audio",
+    "video",
+    "html",
+)
+
+#: Sizes in a summary, see the ``*_size`` properties of HarPage
+SIZE_TYPES = ("page", "image", "css", "text", "js", "audio", "video")
+
+#: Every metric of ``summary_metrics``: the load times, ``ttfb``, the sizes
+#: as ``<type>_size`` and ``transfer_size``
+METRICS = (
+    LOAD_TIME_TYPES
+    + ("ttfb",)
+    + tuple(f"{size_type}_size" for size_type in SIZE_TYPES)
+    + ("transfer_size",)
+)
+
+
+#: Version of the fields of a summary, part of the key of cached summaries
+SUMMARY_VERSION = 1
+
+#: Ways to match the pages of different runs, and the field of
+#: ``page_infos`` each one matches
+ALIGNMENTS = {"id": "page_id", "url": "url", "title": "title", "order": "order"}
+
+Align = Union[str, Callable[[dict], Hashable]]
+
+
+def load_har(har: Union[dict, str, os.PathLike]) -> HarParser:
+    """
+    :param har: A ``dict`` of a HAR file, or the path to one
+    :type har: Union[dict, str, os.PathLike]
+    :return: Parser of the HAR file
+    :rtype: HarParser
+    """
+    if isinstance(har, dict):
+        return HarParser(har_data=har)
+    return HarParser.from_file(har)
+
+
+def page_key(align: Align = "id") -> Callable[[dict], Hashable]:
+    """
+    :param align: One of ``ALIGNMENTS``, or a function of the ``page_infos``
+        dict of a page, or of its summary, which has the same fields
+    :type align: Union[str, Callable[[dict], Hashable]]
+    :return: Function giving the key pages are matched by across runs
+    :rtype: Callable[[dict], Hashable]
+    """
+    if callable(align):
+        return align
+    if align not in ALIGNMENTS:
+        raise ValueError("align must be callable or one of:\n" + "\n".join(ALIGNMENTS))
+    return operator.itemgetter(ALIGNMENTS[align])
+
+
+def page_infos(har_parser: HarParser) -> List[Tuple[HarPage, dict]]:
+    """
+    :param har_parser: Parser of a HAR file
+    :type har_parser: HarParser
+    :return: Each page of the HAR file, with its ``page_id``, ``url``,
+        ``title`` and navigation ``order``: its position among the pages
+        sorted by start time, ``None`` for the page of entries without one
+    :rtype: List[Tuple[HarPage, dict]]
+    """
+    pages = har_parser.pages
+    started = sorted(
+        (timestamp_to_microseconds(page.startedDateTime) or 0, position)
+        for position, page in enumerate(pages)
+        if page.page_id != "unknown"
+    )
+    orders = {position: order for order, (_, position) in enumerate(started)}
+    return [
+        (
+            page,
+            {
+                "page_id": page.page_id,
+                "url": page.url if page.entries else None,
+                "title": getattr(page, "title", None),
+                "order": orders.get(position),
+            },
+        )
+        for position, page in enumerate(pages)
+    ]
+
+
+def select_pages(
+    har_parser: HarParser, page_id: Optional[Hashable] = None, align: Align = "id"
+) -> List[HarPage]:
+    """
+    :param har_parser: Parser of a HAR file
+    :type har_parser: HarParser
+    :param page_id: Only select the pages with this key
+    :type page_id: Optional[Hashable]
+    :param align: What ``page_id`` is matched with, see ``page_key``
+    :type align: Union[str, Callable[[dict], Hashable]]
+    :return: All pages of the HAR file, or the pages with ``page_id``
+    :rtype: List[HarPage]
+    """
+    if page_id in (None, ""):
+        return har_parser.pages
+    if align == "id":
+        return [page for page in har_parser.pages if page.page_id == page_id]
+    key = page_key(align)
+    return [page for page, info in page_infos(har_parser) if key(info) == page_id]
+
+
+def _guarded(func: Callable, *args, **kwargs) -> Any:
+    """
+    :param func: Function computing a metric of a page
+    :type func: Callable
+    :return: Result of ``func``, ``None`` when the HAR file doesn't have the
+        data it needs
+    :rtype: Any
+    """
+    try:
+        return func(*args, **kwargs)
+    except (AttributeError, KeyError):
+        return None
+
+
+def _transfer_size(page: HarPage) -> int:
+    return sum(entry.response.transferSize for entry in page.entries)
+
+
+def summarize_page(page: HarPage, info: Optional[dict] = None) -> dict:
+    """
+    :param page: Page to summarize
+    :type page: HarPage
+    :param info: ``url``, ``title`` and ``order`` of the page, see
+        ``page_infos``
+    :type info: Optional[dict]
+    :return: The ``page_id``, ``url``, ``title`` and ``order`` of
+        ``info``, ``asset_types``, ``load_times``,
+        ``time_to_first_byte``, ``sizes``, total ``transfer_size`` and the
+        ``timings`` totals of ``HarPage.timing_breakdown``. Each metric is
+        ``None`` when the HAR file doesn't have the data, so one missing
+        field doesn't break the other metrics.
+    :rtype: dict
+    """
+    info = info or {}
+    timings = _guarded(page.timing_breakdown, percentiles=())
+    return {
+        "page_id": page.page_id,
+        "url": info.get("url"),
+        "title": info.get("title"),
+        "order": info.get("order"),
+        "asset_types": dict(page.asset_types),
+        "load_times": {
+            asset_type: _guarded(getattr, page, f"{asset_type}_load_time")
+            for asset_type in LOAD_TIME_TYPES
+        },
+        "time_to_first_byte": _guarded(getattr, page, "time_to_first_byte"),
+        "sizes": {
+            asset_type: _guarded(getattr, page, f"{asset_type}_size")
+            for asset_type in SIZE_TYPES
+        },
+        "transfer_size": _guarded(_transfer_size, page),
+        "timings": None if timings is None else timings["totals"],
+    }
+
+
+def summary_metrics(summary: dict) -> Dict[str, Union[int, float]]:
+    """
+    :param summary: Summary of a page, see ``summarize_page``
+    :type summary: dict
+    :return: Value of each metric of ``METRICS`` the page has, leaving out
+        the ``None`` ones
+    :rtype: Dict[str, Union[int, float]]
+    """
+    metrics = dict(summary["load_times"])
+    metrics["ttfb"] = summary["time_to_first_byte"]
+    for size_type, size in summary["sizes"].items():
+        metrics[f"{size_type}_size"] = size
+    metrics["transfer_size"] = summary["transfer_size"]
+    return {metric: value for metric, value in metrics.items() if value is not None}
+
+
+def summarize_pages(
+    har_parser: HarParser, page_id: Optional[Hashable] = None, align: Align = "id"
+) -> List[dict]:
+    """
+    :param har_parser: Parser of a HAR file
+    :type har_parser: HarParser
+    :param page_id: Only summarize the pages with this key
+    :type page_id: Optional[Hashable]
+    :param align: What ``page_id`` is matched with, see ``page_key``
+    :type align: Union[str, Callable[[dict], Hashable]]
+    :return: Summary of each page, see ``summarize_page``
+    :rtype: List[dict]
+    """
+    key = page_key(align)
+    return [
+        summarize_page(page, info)
+        for page, info in page_infos(har_parser)
+        if page_id in (None, "") or key(info) == page_id
+    ]
+
+
+def select_summaries(
+    summaries: List[dict], page_id: Optional[Hashable] = None, align: Align = "id"
+) -> List[dict]:
+    """
+    :param summaries: Summaries of the pages of a HAR file
+    :type summaries: List[dict]
+    :param page_id: Only select the summaries of the pages with this key
+    :type page_id: Optional[Hashable]
+    :param align: What ``page_id`` is matched with, see ``page_key``
+    :type align: Union[str, Callable[[dict], Hashable]]
+    :return: Same as ``summarize_pages`` with ``page_id`` and ``align``
+    :rtype: List[dict]
+    """
+    if page_id in (None, ""):
+        return summaries
+    key = page_key(align)
+    return [summary for summary in summaries if key(summary) == page_id]
+
+
+def summarize_har(
+    har: Union[dict, str, os.PathLike],
+    page_id: Optional[Hashable] = None,
+    align: Align = "id",
+) -> List[dict]:
+    """
+    Loads one HAR file and summarizes its pages. This is what each worker
+    of a parallel ``MultiHarParser`` runs, so only the summaries have to be
+    sent back.
+
+    :param har: A ``dict`` of a HAR file, or the path to one
+    :type har: Union[dict, str, os.PathLike]
+    :param page_id: Only summarize the pages with this key
+    :type page_id: Optional[Hashable]
+    :param align: What ``page_id`` is matched with, see ``page_key``. A
+        function has to be picklable to be sent to a worker, so
+        ``MultiHarParser`` applies functions itself with
+        ``select_summaries``.
+    :type align: Union[str, Callable[[dict], Hashable]]
+    :return: Summary of each page, see ``summarize_page``
+    :rtype: List[dict]
+    """
+    return summarize_pages(load_har(har), page_id, align)
@@ -0,0 +1,558 @@
+"""
+Interval based timeline calculations.
+
+All times are integer microseconds so results are exact and the sweeps don't
+depend on ``datetime`` arithmetic.
+"""
+
+import datetime
+from array import array
+from itertools import accumulate
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from dateutil import parser
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+MICROSECOND = datetime.timedelta(microseconds=1)
+
+Interval = Tuple[int, int]
+
+
+def to_microseconds(timestamp: datetime.datetime) -> int:
+    """
+    :param timestamp: Date and time to convert
+    :type timestamp: datetime.datetime
+    :return: Microseconds since the epoch
+    :rtype: int
+    """
+    if timestamp.tzinfo is None:
+        return (timestamp - EPOCH.replace(tzinfo=None)) // MICROSECOND
+    return (timestamp - EPOCH) // MICROSECOND
+
+
+def parse_timestamp(value: str) -> Optional[datetime.datetime]:
+    """
+    Parses a timestamp of a HAR file. The ISO 8601 timestamps browsers write
+    are handled by ``datetime.fromisoformat``, which is much faster than
+    ``dateutil``, and anything else falls back on ``dateutil``.
+
+    :param value: Timestamp, e.g. ``2017-11-13T12:03:02.550Z``
+    :type value: str
+    :return: Date and time, ``None`` if it can't be parsed
+    :rtype: Optional[datetime.datetime]
+    """
+    if not value:
+        return None
+    try:
+        if value.endswith("Z"):
+            return datetime.datetime.fromisoformat(value[:-1] + "+00:00")
+        return datetime.datetime.fromisoformat(value)
+    except ValueError:
+        pass
+    try:
+        return parser.parse(value)
+    except (ValueError, OverflowError):
+        return None
+
+
+def timestamp_to_microseconds(value: str) -> Optional[int]:
+    """
+    :param value: Timestamp of a HAR file
+    :type value: str
+    :return: Microseconds since the epoch, ``None`` if it can't be parsed
+    :rtype: Optional[int]
+    """
+    timestamp = parse_timestamp(value)
+    return None if timestamp is None else to_microseconds(timestamp)
+
+
+def duration_to_microseconds(milliseconds: Union[int, float]) -> int:
+    """
+    :param milliseconds: Duration in ms, as used in HAR files
+    :type milliseconds: Union[int, float]
+    :return: Duration in whole microseconds, never negative
+    :rtype: int
+    """
+    return max(int(round(milliseconds * 1000)), 0)
+
+
+def to_milliseconds(microseconds: int) -> Union[int, float]:
+    """
+    :param microseconds: Duration in microseconds
+    :type microseconds: int
+    :return: Duration in ms, an ``int`` when there is no fraction
+    :rtype: Union[int, float]
+    """
+    if microseconds % 1000 == 0:
+        return microseconds // 1000
+    return microseconds / 1000
+
+
+class EntryOffsets:
+    """
+    Start and end of every entry of a HAR file as integer microseconds since
+    the epoch, parsed once so timeline code only does integer arithmetic.
+    Offsets are relative to the start of the page of the entry, or to the
+    ``origin``, the earliest entry of the file.
+    """
+
+    def __init__(self, entries: List[dict], pages: Iterable[dict] = ()):
+        """
+        :param entries: Raw entries of the HAR file
+        :type entries: List[dict]
+        :param pages: Raw pages of the HAR file. Entries of a page that is
+            not in ``pages``, like the ``unknown`` page, are relative to
+            the earliest entry of that page.
+        :type pages: Iterable[dict]
+        """
+        self.start: List[Optional[int]] = []
+        self.end: List[Optional[int]] = []
+        for entry in entries:
+            start = timestamp_to_microseconds(entry.get("startedDateTime"))
+            self.start.append(start)
+            self.end.append(
+                None
+                if start is None
+                else start + duration_to_microseconds(entry.get("time", 0))
+            )
+        known = [start for start in self.start if start is not None]
+        self.origin: int = min(known, default=0)
+
+        self.page_origins: Dict[str, int] = {}
+        for page in pages:
+            start = timestamp_to_microseconds(page.get("startedDateTime"))
+            if start is not None:
+                self.page_origins[page["id"]] = start
+        earliest = {}
+        for entry, start in zip(entries, self.start):
+            pageref = entry.get("pageref", "unknown")
+            if start is not None and start < earliest.get(pageref, start + 1):
+                earliest[pageref] = start
+        for pageref, start in earliest.items():
+            self.page_origins.setdefault(pageref, start)
+
+        self._pagerefs = [entry.get("pageref", "unknown") for entry in entries]
+        self._positions = {
+            id(entry): position for position, entry in enumerate(entries)
+        }
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    def position(self, entry: dict) -> Optional[int]:
+        """
+        :param entry: Raw entry
+        :type entry: dict
+        :return: Position of the entry, ``None`` if it is not in the file
+        :rtype: Optional[int]
+        """
+        return self._positions.get(id(entry))
+
+    def page_origin(self, page_id: str) -> int:
+        """
+        :param page_id: Page ID
+        :type page_id: str
+        :return: Start of the page, ``origin`` if it has no start or entries
+        :rtype: int
+        """
+        return self.page_origins.get(page_id, self.origin)
+
+    def page_offsets(self) -> Tuple[List[Optional[int]], List[Optional[int]]]:
+        """
+        :return: Start and end of every entry relative to the start of its
+            page, ``None`` for entries without a start time
+        :rtype: Tuple[List[Optional[int]], List[Optional[int]]]
+        """
+        origins = [self.page_origin(pageref) for pageref in self._pagerefs]
+        return (
+            [_shift(start, origin) for start, origin in zip(self.start, origins)],
+            [_shift(end, origin) for end, origin in zip(self.end, origins)],
+        )
+
+
+def _shift(time: Optional[int], origin: int) -> Optional[int]:
+    return None if time is None else time - origin
+
+
+def entry_intervals(entries: Iterable) -> List[Interval]:
+    """
+    :param entries: Entries to get the intervals of. Entries without a
+        start time are skipped.
+    :type entries: Iterable[HarEntry]
+    :return: ``[start, end)`` of each entry in microseconds since the epoch
+    :rtype: List[Tuple[int, int]]
+    """
+    intervals = []
+    for entry in entries:
+        if entry.start_us is not None:
+            intervals.append((entry.start_us, entry.end_us))
+    return intervals
+
+
+def merge_intervals(intervals: Iterable[Interval]) -> List[Interval]:
+    """
+    Sorts half-open ``[start, end)`` intervals and merges the ones that
+    overlap or touch.
+
+    :param intervals: Start and end of each interval
+    :type intervals: Iterable[Tuple[int, int]]
+    :return: Sorted, disjoint intervals covering the same time
+    :rtype: List[Tuple[int, int]]
+    """
+    merged = []
+    for start, end in sorted(intervals):
+        if end <= start:
+            continue
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def union_length(intervals: Iterable[Interval]) -> int:
+    """
+    :param intervals: Start and end of each interval
+    :type intervals: Iterable[Tuple[int, int]]
+    :return: Total time covered by at least one interval
+    :rtype: int
+    """
+    return sum(end - start for start, end in merge_intervals(intervals))
+
+
+class IntervalTree:
+    """
+    Static centered interval tree over half-open ``[start, end)`` intervals
+    for point and window queries in ``O(log n + k)``. Each node holds the
+    intervals containing its center, the median start of its intervals,
+    sorted by start and by end, so a query only scans the intervals it
+    reports. Zero length intervals count as lasting one unit.
+    """
+
+    def __init__(self, intervals: Iterable[Interval], items: Sequence = None):
+        """
+        :param intervals: Start and end of each interval
+        :type intervals: Iterable[Tuple[int, int]]
+        :param items: Item to return for each interval, the position of the
+            interval by default
+        :type items: Sequence
+        """
+        self.intervals = [(start, max(end, start + 1)) for start, end in intervals]
+        self.items = range(len(self.intervals)) if items is None else items
+        if len(self.items) != len(self.intervals):
+            raise ValueError("Every interval needs an item")
+        self._root = self._build(list(range(len(self.intervals))))
+
+    def __len__(self) -> int:
+        return len(self.intervals)
+
+    def _build(self, positions: List[int]) -> tuple:
+        """
+        :return: ``(center, by_start, by_end, left, right)`` of the root
+            of the positions, ``None`` when there are none
+        :rtype: tuple
+        """
+        if not positions:
+            return None
+        intervals = self.intervals
+        starts = sorted(intervals[position][0] for position in positions)
+        center = starts[len(starts) // 2]
+        left, right, here = [], [], []
+        for position in positions:
+            start, end = intervals[position]
+            if end <= center:
+                left.append(position)
+            elif start > center:
+                right.append(position)
+            else:
+                here.append(position)
+        return (
+            center,
+            sorted(here, key=lambda position: intervals[position][0]),
+            sorted(here, key=lambda position: -intervals[position][1]),
+            self._build(left),
+            self._build(right),
+        )
+
+    def overlapping(self, start: int, end: int) -> list:
+        """
+        :param start: Start of the window
+        :type start: int
+        :param end: End of the window, excluded
+        :type end: int
+        :return: Items of the intervals overlapping ``[start, end)``, in the
+            order the intervals were given
+        :rtype: list
+        """
+        found = []
+        intervals = self.intervals
+        nodes = [self._root] if self._root else []
+        while nodes:
+            center, by_start, by_end, left, right = nodes.pop()
+            if end <= center:
+                for position in by_start:
+                    if intervals[position][0] >= end:
+                        break
+                    found.append(position)
+                children = (left,)
+            elif start > center:
+                for position in by_end:
+                    if intervals[position][1] <= start:
+                        break
+                    found.append(position)
+                children = (right,)
+            else:
+                # Every interval of the node contains the center
+                found.extend(by_start)
+                children = (left, right)
+            nodes.extend(child for child in children if child)
+        return [self.items[position] for position in sorted(found)]
+
+    def active_at(self, time: int) -> list:
+        """
+        :param time: Point in time
+        :type time: int
+        :return: Items of the intervals with ``start <= time < end``
+        :rtype: list
+        """
+        return self.overlapping(time, time + 1)
+
+
+def idle_periods(
+    intervals: Iterable[Interval],
+    origin: int = 0,
+    min_gap: int = 0,
+    quiet_after: Optional[int] = None,
+) -> dict:
+    """
+    Finds the gaps without any interval between ``origin`` and the end of
+    the last interval, from one sort and sweep over the intervals. Time
+    before ``origin`` is ignored.
+
+    :param intervals: Start and end of each interval
+    :type intervals: Iterable[Tuple[int, int]]
+    :param origin: Start of the analysed time, and what the offsets in the
+        result are relative to
+    :type origin: int
+    :param min_gap: Shortest gap to report as an idle period
+    :type min_gap: int
+    :param quiet_after: Time to look for the network quiet point from
+    :type quiet_after: Optional[int]
+    :return: ``periods``, the ``(start, end)`` of each idle period of at
+        least ``min_gap``, the total ``busy`` and ``idle`` time, the latter
+        including gaps shorter than ``min_gap``, and ``network_quiet``, the
+        first time from ``quiet_after`` when nothing is in flight and
+        nothing starts for at least ``min_gap``, or the end of the last
+        interval. Times are in ms.
+    :rtype: dict
+    """
+    merged = merge_intervals(
+        (max(start, origin), end) for start, end in intervals if end > origin
+    )
+    periods = []
+    busy = 0
+    quiet = None
+    previous = origin
+    for start, end in merged:
+        if start > previous and start - previous >= min_gap:
+            periods.append((previous, start))
+        if quiet is None and quiet_after is not None and start > quiet_after:
+            candidate = max(previous, quiet_after)
+            if start > candidate and start - candidate >= min_gap:
+                quiet = candidate
+        busy += end - start
+        previous = end
+    if quiet is None and quiet_after is not None:
+        quiet = max(previous, quiet_after)
+    return {
+        "periods": [
+            (to_milliseconds(start - origin), to_milliseconds(end - origin))
+            for start, end in periods
+        ],
+        "busy": to_milliseconds(busy),
+        "idle": to_milliseconds(previous - origin - busy),
+        "network_quiet": None if quiet is None else to_milliseconds(quiet - origin),
+    }
+
+
+def concurrency_profile(intervals: Iterable[Interval], origin: int = 0) -> dict:
+    """
+    Sweeps over the start and end events of the intervals once to get the
+    number of intervals in flight over time.
+
+    :param intervals: Start and end of each interval
+    :type intervals: Iterable[Tuple[int, int]]
+    :param origin: Time the offsets in the result are relative to
+    :type origin: int
+    :return: ``steps``, a list of ``(offset, count)`` where each step lasts
+        until the next one, the ``peak`` and time weighted ``mean`` count
+        between the first start and the last end, and ``time_at_level``,
+        the time spent at each count. Times are in ms.
+    :rtype: dict
+    """
+    events = []
+    for start, end in intervals:
+        if end > start:
+            events.append((start, 1))
+            events.append((end, -1))
+    # Ends sort before starts at the same time as the intervals are half-open
+    events.sort()
+
+    steps = []
+    time_at_level = {}
+    count = 0
+    for index, (time, change) in enumerate(events):
+        count += change
+        if index + 1 < len(events) and events[index + 1][0] == time:
+            continue
+        if index + 1 < len(events):
+            duration = events[index + 1][0] - time
+            time_at_level[count] = time_at_level.get(count, 0) + duration
+        if not steps or steps[-1][1] != count:
+            steps.append((time, count))
+
+    span = events[-1][0] - events[0][0] if events else 0
+    busy = sum(level * duration for level, duration in time_at_level.items())
+    return {
+        "steps": [(to_milliseconds(time - origin), count) for time, count in steps],
+        "peak": max(time_at_level, default=0),
+        "mean": busy / span if span else 0,
+        "time_at_level": {
+            level: to_milliseconds(duration)
+            for level, duration in sorted(time_at_level.items())
+        },
+    }
+
+
+def _bucket_activity_numpy(records: list, size: int, resolution: int) -> dict:
+    # pylint: disable=R0914
+    """NumPy version of ``bucket_activity``, with every step vectorized"""
+    start, end, receive_start, size_bytes = (
+        np.asarray(column, dtype=dtype)
+        for column, dtype in zip(zip(*records), (np.int64, np.int64, np.int64, float))
+    )
+    first = start // resolution
+    last = np.maximum(first, (end - 1) // resolution)
+    active = np.bincount(first, minlength=size + 1) - np.bincount(
+        last + 1, minlength=size + 1
+    )
+
+    # Bytes are spread evenly over the receive phase. The buckets at either
+    # end get their share directly, the ones in between through a difference
+    # array of the per bucket rate.
+    receive_first = receive_start // resolution
+    receive_last = np.maximum(receive_first, (end - 1) // resolution)
+    duration = np.maximum(end - receive_start, 1)
+    rate = size_bytes / duration
+    single = receive_first == receive_last
+    head = np.where(
+        single, size_bytes, rate * ((receive_first + 1) * resolution - receive_start)
+    )
+    tail = np.where(single, 0, rate * (end - receive_last * resolution))
+    full = np.where(single, 0, rate * resolution)
+    received = (
+        np.bincount(receive_first, weights=head, minlength=size + 1)
+        + np.bincount(receive_last, weights=tail, minlength=size + 1)
+        + np.cumsum(
+            np.bincount(receive_first + 1, weights=full, minlength=size + 2)
+            - np.bincount(receive_last, weights=full, minlength=size + 2)
+        )[: size + 1]
+    )
+    return {
+        "bytes": received[:size],
+        "active": np.cumsum(active)[:size],
+        "starts": np.bincount(first, minlength=size)[:size],
+    }
+
+
+def _bucket_activity_python(records: list, size: int, resolution: int) -> dict:
+    # pylint: disable=R0914
+    """Pure Python version of ``bucket_activity``"""
+    active = [0] * (size + 1)
+    starts = [0] * size
+    received = [0.0] * (size + 1)
+    full = [0.0] * (size + 2)
+    for start, end, receive_start, size_bytes in records:
+        first = start // resolution
+        last = max(first, (end - 1) // resolution)
+        active[first] += 1
+        active[last + 1] -= 1
+        starts[first] += 1
+
+        receive_first = receive_start // resolution
+        receive_last = max(receive_first, (end - 1) // resolution)
+        if receive_first == receive_last:
+            received[receive_first] += size_bytes
+            continue
+        rate = size_bytes / (end - receive_start)
+        received[receive_first] += rate * (
+            (receive_first + 1) * resolution - receive_start
+        )
+        received[receive_last] += rate * (end - receive_last * resolution)
+        full[receive_first + 1] += rate * resolution
+        full[receive_last] -= rate * resolution
+    for index, rate in enumerate(accumulate(full[: size + 1])):
+        received[index] += rate
+    return {
+        "bytes": array("d", received[:size]),
+        "active": array("q", list(accumulate(active))[:size]),
+        "starts": array("q", starts),
+    }
+
+
+def bucket_activity(
+    records: Iterable[Tuple[int, int, int, float]],
+    origin: int,
+    resolution: int,
+    use_numpy: bool = None,
+) -> dict:
+    """
+    Fills fixed width buckets with the activity of the records, using
+    difference arrays and a cumulative sum so the work only depends on the
+    number of records and buckets, not on how long each record took.
+
+    :param records: ``(start, end, receive_start, bytes)`` of each request.
+        Bytes are spread evenly over ``[receive_start, end)``.
+    :type records: Iterable[Tuple[int, int, int, float]]
+    :param origin: Start of the first bucket
+    :type origin: int
+    :param resolution: Width of each bucket
+    :type resolution: int
+    :param use_numpy: Force NumPy on or off. By default NumPy is used when it
+        is installed.
+    :type use_numpy: bool
+    :return: ``bytes`` received, ``active`` requests and request ``starts``
+        in each bucket, as NumPy arrays or ``array.array``
+    :rtype: dict
+    """
+    if resolution < 1:
+        raise ValueError("The resolution should be at least one microsecond")
+    if use_numpy is None:
+        use_numpy = np is not None
+    shifted = []
+    for start, end, receive_start, size_bytes in records:
+        start = max(start - origin, 0)
+        end = max(end - origin, start)
+        # Bytes without a receive phase land in the last bucket of the request
+        receive_start = min(max(receive_start - origin, start), max(end - 1, start))
+        shifted.append((start, end, receive_start, max(size_bytes, 0)))
+    if not shifted:
+        size = 0
+    else:
+        size = max(max(end, start + 1) for start, end, _, _ in shifted)
+        size = -(-size // resolution)
+    if use_numpy and not shifted:
+        return {
+            "bytes": np.zeros(0),
+            "active": np.zeros(0, dtype=np.int64),
+            "starts": np.zeros(0, dtype=np.int64),
+        }
+    if use_numpy:
+        return _bucket_activity_numpy(shifted, size, resolution)
+    return _bucket_activity_python(shifted, size, resolution)
@@ -0,0 +1,104 @@
+"""
+Helpers for splitting request URLs into their components
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+DEFAULT_PORTS = {
+    "http": 80,
+    "https": 443,
+    "ws": 80,
+    "wss": 443,
+}
+
+
+def _split_netloc(scheme: str, netloc: str) -> Tuple[str, Optional[int]]:
+    """
+    Splits a netloc into the lower case host name and port. Falls back on the
+    default port of the scheme when the URL does not give one.
+
+    :param scheme: Scheme of the URL
+    :type scheme: str
+    :param netloc: Network location of the URL
+    :type netloc: str
+    :return: Host name and port
+    :rtype: Tuple[str, Optional[int]]
+    """
+    parts = urlsplit(f"{scheme}://{netloc}")
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    if port is None:
+        port = DEFAULT_PORTS.get(scheme)
+    return parts.hostname or "", port
+
+
+def split_urls(urls: Iterable[str]) -> Dict[str, List]:
+    """
+    Splits many URLs at once into columns of ``scheme``, ``hostname``,
+    ``port``, ``path`` and ``query``.
+
+    Network locations repeat heavily across the entries of a HAR file, so
+    each distinct one is only parsed once and the rest of the URL is split
+    with plain string operations. The returned host names are shared string
+    objects, which keeps grouping by host cheap.
+
+    :param urls: URLs to split
+    :type urls: Iterable[str]
+    :return: Column name to a list with one value per URL
+    :rtype: Dict[str, List]
+    """
+    columns = {"scheme": [], "hostname": [], "port": [], "path": [], "query": []}
+    netlocs = {}
+    for url in urls:
+        scheme, separator, rest = url.partition("://")
+        if not separator or not scheme.isalpha():
+            parts = urlsplit(url)
+            scheme, netloc = parts.scheme.lower(), parts.netloc
+            path, query = parts.path, parts.query
+        else:
+            scheme = scheme.lower()
+            rest = rest.partition("#")[0]
+            rest, _, query = rest.partition("?")
+            slash = rest.find("/")
+            if slash == -1:
+                netloc, path = rest, ""
+            else:
+                netloc, path = rest[:slash], rest[slash:]
+        key = (scheme, netloc)
+        location = netlocs.get(key)
+        if location is None:
+            location = netlocs[key] = _split_netloc(scheme, netloc)
+        columns["scheme"].append(scheme)
+        columns["hostname"].append(location[0])
+        columns["port"].append(location[1])
+        columns["path"].append(path)
+        columns["query"].append(query)
+    return columns
+
+
+def normalize_url(url: str, keep_query: bool = False) -> str:
+    """
+    Normalizes a URL so requests of the same resource match across runs:
+    lower case scheme and host name, no default port, ``/`` for an empty
+    path, and no fragment.
+
+    :param url: URL to normalize
+    :type url: str
+    :param keep_query: Keep the query string, with its parameters sorted,
+        rather than dropping it
+    :type keep_query: bool
+    :return: Normalized URL
+    :rtype: str
+    """
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    hostname, port = _split_netloc(scheme, parts.netloc)
+    if port not in (None, DEFAULT_PORTS.get(scheme)):
+        hostname = f"{hostname}:{port}"
+    query = ""
+    if keep_query and parts.query:
+        query = "&".join(sorted(parts.query.split("&")))
+    return urlunsplit((scheme, hostname, parts.path or "/", query, ""))
@@ -0,0 +1,190 @@
+"""
+Compact, serializable waterfall of the entries of a page
+"""
+
+import json
+import struct
+import sys
+from array import array
+from typing import Iterable, List, Union
+
+PHASES = ("blocked", "dns", "connect", "ssl", "send", "wait", "receive")
+
+_MAGIC = b"HARW"
+_VERSION = 1
+# Magic, version, number of entries, number of URLs
+_HEADER = struct.Struct("<4sBII")
+_LENGTH = struct.Struct("<I")
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder == "big":  # pragma: no cover
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_little_endian(typecode: str, data: bytes) -> array:
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == "big":  # pragma: no cover
+        values.byteswap()
+    return values
+
+
+class Waterfall:
+    """
+    Waterfall of a page packed into flat arrays, which is much cheaper to
+    render and serialize than ``HarEntry`` objects and ``timings`` dicts.
+
+    Entry ``i`` starts ``offsets[i]`` ms after the page, its URL is
+    ``urls[url_index[i]]`` and the ms it spent in each of ``PHASES`` are
+    ``durations[i * len(PHASES):(i + 1) * len(PHASES)]``. Phases that did not
+    apply (``-1`` in the HAR file) are 0.
+    """
+
+    def __init__(
+        self,
+        offsets: Iterable[float],
+        durations: Iterable[float],
+        url_index: Iterable[int],
+        urls: List[str],
+    ):
+        """
+        :param offsets: Start of each entry in ms after the page start
+        :type offsets: Iterable[float]
+        :param durations: Duration of each phase of each entry, flattened
+        :type durations: Iterable[float]
+        :param url_index: Position of the URL of each entry in ``urls``
+        :type url_index: Iterable[int]
+        :param urls: String table of the distinct URLs
+        :type urls: List[str]
+        """
+        self.offsets = array("d", offsets)
+        self.durations = array("d", durations)
+        self.url_index = array("I", url_index)
+        self.urls = list(urls)
+        if len(self.durations) != len(self.offsets) * len(PHASES) or len(
+            self.url_index
+        ) != len(self.offsets):
+            raise ValueError("Every entry needs an offset, URL and all phases")
+
+    @classmethod
+    def from_entries(cls, entries: Iterable, origin: Union[int, float]) -> "Waterfall":
+        """
+        :param entries: Entries of the waterfall, with a start time
+        :type entries: Iterable[HarEntry]
+        :param origin: Start of the page in microseconds since the epoch
+        :type origin: Union[int, float]
+        :return: Waterfall of the entries
+        :rtype: Waterfall
+        """
+        offsets, durations, url_index, urls = [], [], [], {}
+        for entry in entries:
+            offsets.append((entry.start_us - origin) / 1000)
+            timings = entry.timings
+            for phase in PHASES:
+                duration = timings.get(phase)
+                durations.append(duration if duration and duration > 0 else 0)
+            url_index.append(urls.setdefault(entry.url, len(urls)))
+        return cls(offsets, durations, url_index, list(urls))
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __getitem__(self, index: int) -> dict:
+        """
+        :param index: Position of the entry
+        :type index: int
+        :return: ``url``, ``offset`` and each phase of one entry
+        :rtype: dict
+        """
+        start = index * len(PHASES)
+        stop = start + len(PHASES)
+        row = {"url": self.urls[self.url_index[index]], "offset": self.offsets[index]}
+        row.update(zip(PHASES, self.durations[start:stop]))
+        return row
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Waterfall):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def to_dict(self) -> dict:
+        """
+        :return: Column oriented, JSON serializable representation
+        :rtype: dict
+        """
+        return {
+            "phases": list(PHASES),
+            "urls": self.urls,
+            "url_index": self.url_index.tolist(),
+            "offsets": self.offsets.tolist(),
+            "durations": self.durations.tolist(),
+        }
+
+    def to_json(self) -> str:
+        """
+        :return: ``to_dict`` as a compact JSON string
+        :rtype: str
+        """
+        return json.dumps(self.to_dict(), separators=(",", ":"))
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Waterfall":
+        """
+        :param data: Output of ``to_dict``
+        :type data: dict
+        :return: Waterfall
+        :rtype: Waterfall
+        """
+        if tuple(data.get("phases", PHASES)) != PHASES:
+            raise ValueError(f"Phases should be {PHASES}")
+        return cls(data["offsets"], data["durations"], data["url_index"], data["urls"])
+
+    def to_bytes(self) -> bytes:
+        """
+        Packs the waterfall into a little-endian binary format: a header,
+        the offsets, URL indexes and durations as raw arrays, and then the
+        length prefixed UTF-8 URLs.
+
+        :return: Packed waterfall
+        :rtype: bytes
+        """
+        parts = [
+            _HEADER.pack(_MAGIC, _VERSION, len(self), len(self.urls)),
+            _little_endian(self.offsets),
+            _little_endian(self.url_index),
+            _little_endian(self.durations),
+        ]
+        for url in self.urls:
+            encoded = url.encode("utf-8")
+            parts.append(_LENGTH.pack(len(encoded)))
+            parts.append(encoded)
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Waterfall":
+        """
+        :param data: Output of ``to_bytes``
+        :type data: bytes
+        :return: Waterfall
+        :rtype: Waterfall
+        """
+        magic, version, size, url_count = _HEADER.unpack_from(data)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError("Not a packed waterfall, or an unsupported version")
+        position = _HEADER.size
+        columns = []
+        for typecode, count in (("d", size), ("I", size), ("d", size * len(PHASES))):
+            end = position + array(typecode).itemsize * count
+            columns.append(_from_little_endian(typecode, data[position:end]))
+            position = end
+        urls = []
+        for _ in range(url_count):
+            (length,) = _LENGTH.unpack_from(data, position)
+            position += _LENGTH.size
+            end = position + length
+            urls.append(data[position:end].decode("utf-8"))
+            position = end
+        return cls(columns[0], columns[2], columns[1], urls)
@@ -24,6 +24,7 @@ setup(
         tests_require=test_reqs[1:],
         install_requires=install_reqs,
         extras_require={
+            'numpy': ['numpy'],
         },
         project_urls={
             'Changelog': 'https://github.com/haralyzer/haralyzer/blob/master/HISTORY.rst',
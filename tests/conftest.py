@@ -2,6 +2,7 @@
 import json
 import os
 import pytest
+from haralyzer import HarParser
 
 
 @pytest.fixture
@@ -22,6 +23,34 @@ def har_data():
     return load_doc
 
 
+@pytest.fixture(params=[True, False], ids=["numpy", "python"])
+def use_numpy(request):
+    """
+    Runs a test with and without NumPy, and skips the NumPy run when it
+    isn't installed
+    """
+    if request.param:
+        pytest.importorskip("numpy")
+    return request.param
+
+
+@pytest.fixture
+def count_parsers(monkeypatch):
+    """
+    Records every HarParser built during the test, to check what is parsed
+    again. Returns the list of parsers built so far.
+    """
+    built = []
+    original_init = HarParser.__init__
+
+    def counting_init(self, *args, **kwargs):
+        built.append(self)
+        original_init(self, *args, **kwargs)
+
+    monkeypatch.setattr(HarParser, "__init__", counting_init)
+    return built
+
+
 @pytest.fixture
 def header_types():
     """
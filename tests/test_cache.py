@@ -0,0 +1,130 @@
+"""Tests for the on disk summary cache"""
+
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import pytest
+from haralyzer import MultiHarParser
+from haralyzer.cache import SummaryCache, content_hash
+from haralyzer.summary import summarize_har
+
+FILES = [f"multi_test_{i}.har" for i in range(1, 5)]
+
+
+def test_content_hash(har_data):
+    path = har_data("multi_test_1.har", as_path=True)
+    assert content_hash(path) == content_hash(path)
+    assert content_hash(path) != content_hash(har_data("multi_test_2.har", True))
+    data = har_data("multi_test_1.har")
+    assert content_hash(data) == content_hash(json.loads(json.dumps(data)))
+    # Paths hash the bytes of the file
+    with open(path, "rb") as har_file:
+        assert content_hash(path) == hashlib.sha256(har_file.read()).hexdigest()
+
+
+def test_summary_cache(har_data, tmp_path):
+    path = har_data("multi_test_1.har", as_path=True)
+    with SummaryCache(tmp_path / "summaries.db") as cache:
+        assert len(cache) == 0
+        assert cache.get(content_hash(path)) is None
+        summaries = cache.summarize(path)
+        # JSON round trip of the summaries
+        assert summaries == json.loads(json.dumps(summarize_har(path)))
+        assert cache.get(content_hash(path)) == summaries
+        assert len(cache) == 1
+
+    # Summaries persist, and are only valid for the same version
+    with SummaryCache(tmp_path / "summaries.db") as cache:
+        assert cache.get(content_hash(path)) == summaries
+    with SummaryCache(tmp_path / "summaries.db", version="other") as cache:
+        assert len(cache) == 0
+        other = har_data("multi_test_2.har", as_path=True)
+        cache.summarize(other)
+        assert cache.key(other) == content_hash(other)
+        assert cache.prune() == 1
+        assert cache.prune(keep=["unknown"]) == 1
+        assert len(cache) == 0
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_multi_parser_cache(har_data, tmp_path, count_parsers, parallel):
+    paths = [har_data(filename, as_path=True) for filename in FILES]
+    uncached = MultiHarParser(paths, page_id="page_3")
+    database = tmp_path / "summaries.db"
+
+    with MultiHarParser(
+        paths, page_id="page_3", cache=database, parallel=parallel
+    ) as cold:
+        assert cold.summaries == json.loads(json.dumps(uncached.summaries))
+        assert len(cold.cache) == len(FILES)
+    # The parser closes the cache it opened
+    with pytest.raises(sqlite3.ProgrammingError):
+        len(cold.cache)
+    count_parsers.clear()
+
+    # Every page is cached, whatever page_id and align select
+    for page_id, align in (("page_3", "id"), (None, "id"), (0, "order")):
+        with MultiHarParser(
+            paths, page_id=page_id, align=align, cache=database, parallel=parallel
+        ) as warm:
+            expected = MultiHarParser(paths, page_id=page_id, align=align)
+            assert warm.page_load_time == expected.page_load_time
+            assert warm.get_percentiles("ttfb") == expected.get_percentiles("ttfb")
+            assert len(warm.summaries) == len(expected.summaries)
+    expected_parsers = 3 * len(FILES)
+    assert len(count_parsers) == expected_parsers
+
+    # HAR files given as dicts have their own keys, and a cache that was
+    # passed in is left open
+    with SummaryCache(database) as cache:
+        data = [har_data(filename) for filename in FILES]
+        with MultiHarParser(data, page_id="page_3", cache=cache) as dicts:
+            assert dicts.page_load_time == uncached.page_load_time
+        assert len(cache) == 2 * len(FILES)
+        expected_parsers += len(FILES)
+        with MultiHarParser(data, page_id="page_3", cache=cache) as warm:
+            assert warm.page_load_time == uncached.page_load_time
+        assert len(count_parsers) == expected_parsers
+
+        warm = MultiHarParser(iter(paths), page_id="page_3", cache=cache)
+        assert warm.page_load_time == uncached.page_load_time
+        assert warm.add_har(paths[0]) is None
+        assert len(count_parsers) == expected_parsers
+
+        # Runs added later are cached too
+        extra = har_data("multi_test_1.har")
+        extra["log"]["pages"][0]["title"] = "changed"
+        warm.add_har(extra)
+        assert len(cache) == 2 * len(FILES) + 1
+        assert len(count_parsers) == expected_parsers + 1
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_warm_hit_reads_no_json(har_data, tmp_path, monkeypatch, parallel):
+    paths = [har_data(filename, as_path=True) for filename in FILES]
+    database = tmp_path / "summaries.db"
+    with MultiHarParser(paths, page_id="page_3", cache=database) as cold:
+        expected = cold.page_load_time
+
+    def fail(*args, **kwargs):
+        raise AssertionError("json.load called on a warm hit")
+
+    monkeypatch.setattr(json, "load", fail)
+    with MultiHarParser(
+        paths, page_id="page_3", cache=database, parallel=parallel
+    ) as warm:
+        assert warm.page_load_time == expected
+
+    # A changed file is hashed and summarized again
+    monkeypatch.undo()
+    changed = tmp_path / "changed.har"
+    shutil.copyfile(paths[0], changed)
+    with SummaryCache(database) as cache:
+        cache.summarize(changed)
+        data = har_data(FILES[0])
+        data["log"]["pages"][0]["title"] = "changed"
+        changed.write_text(json.dumps(data))
+        os.utime(changed, ns=(0, 0))
+        assert cache.summarize(changed)[0]["title"] == "changed"
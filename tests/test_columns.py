@@ -0,0 +1,138 @@
+"""Tests for the columnar entry filters"""
+
+import math
+import statistics
+import pytest
+from haralyzer import HarPage, HarParser
+from haralyzer.columns import TIMING_PHASES, EntryColumns, EntryView
+
+PAGE_ID = "page_3"
+
+CRITERIA = [
+    {},
+    {"content_type": "image.*"},
+    {"request_type": ".*ET", "status_code": "2.*"},
+    {"content_type": "javascript", "load_time__gt": 100},
+    {"http_version": "HTTP/1.1", "regex": False},
+    {"content_type": "text/html", "regex": False},
+    {"status_code": "3.*"},
+    {"request_type": "POST"},
+    {"url": r"\.js", "host": "cdn"},
+    {"host": "www.cnn.com", "regex": False},
+    {"response_header": {"content-type": "javascript", "server": "apache"}},
+    {"request_header": {"accept": "image/png"}, "status_code": "200"},
+    {"response_header": {"vary": "Accept-Encoding"}, "regex": False},
+]
+
+
+def test_filter_matches_page_filter(har_data, use_numpy):
+    """
+    The columnar filter should select the same entries as
+    HarPage.filter_entries
+    """
+    har_parser = HarParser(har_data("cnn.har"))
+    page = HarPage(PAGE_ID, har_parser=har_parser)
+    columns = EntryColumns(har_parser.har_data["entries"], use_numpy=use_numpy)
+
+    for criteria in CRITERIA:
+        expected = [entry.raw_entry for entry in page.filter_entries(**criteria)]
+        view = columns.filter(page_id=PAGE_ID, **criteria)
+        assert len(view) == len(expected)
+        assert all(entry in expected for entry in view.raw_entries)
+        assert columns.masks.count(columns.mask(page_id=PAGE_ID, **criteria)) == len(
+            expected
+        )
+
+
+def test_entry_view(har_data):
+    har_parser = HarParser(har_data("humanssuck.net.har"))
+    view = har_parser.filter_entries(content_type="image.*")
+    assert isinstance(view, EntryView)
+    assert len(view) == 1
+    assert view[0].url == "http://humanssuck.net/screen_login.gif"
+    assert [entry.url for entry in view] == [view[0].url]
+    assert isinstance(view[1:], EntryView)
+    assert not view[1:]
+    assert not har_parser.filter_entries(page_id="page_1")
+
+    # Entries without a URL or method don't match those criteria
+    har_parser = HarParser(har_data("missing_pageref.har"))
+    assert not har_parser.filter_entries(host="example.com", regex=False)
+    assert not har_parser.filter_entries(url="http")
+    assert not har_parser.filter_entries(request_type="GET")
+    assert len(har_parser.filter_entries(status_code="200")) == len(
+        har_parser.har_data["entries"]
+    )
+
+
+def test_categorical_evaluated_once_per_value(har_data, use_numpy):
+    """
+    Regexes should only be run against distinct values
+    """
+    har_parser = HarParser(har_data("cnn.har"))
+    columns = EntryColumns(har_parser.har_data["entries"], use_numpy=use_numpy)
+    calls = []
+
+    def predicate(value):
+        calls.append(value)
+        return value.startswith("image/")
+
+    selected = columns.mime_type.select(predicate)
+    assert len(calls) == len(set(calls)) == len(columns.mime_type.categories)
+    mask = columns.masks.from_categories(columns.mime_type, selected)
+    assert columns.masks.count(mask) == 57
+
+
+def test_numpy_required(monkeypatch):
+    monkeypatch.setattr("haralyzer.columns.np", None)
+    with pytest.raises(ValueError):
+        EntryColumns([], use_numpy=True)
+    assert EntryColumns([]).masks.name == "bitset"
+
+
+def test_timing_breakdown(har_data, use_numpy):
+    data = har_data("cnn-chrome.har")
+    # Phases that did not apply are -1
+    data["log"]["entries"][0]["timings"]["ssl"] = -1
+    del data["log"]["entries"][1]["timings"]["wait"]
+    har_parser = HarParser(data)
+    page = har_parser.pages[0]
+    columns = EntryColumns(har_parser.har_data["entries"], use_numpy=use_numpy)
+    assert math.isnan(columns.timings["ssl"].values[0])
+    assert math.isnan(columns.timings["wait"].values[1])
+
+    breakdown = columns.timing_breakdown(
+        asset_types=page.asset_types, percentiles=[50, 100]
+    )
+    assert breakdown["count"] == len(page.entries)
+    for phase in TIMING_PHASES:
+        applied = [
+            entry.timings[phase]
+            for entry in page.entries
+            if entry.timings.get(phase, -1) >= 0
+        ]
+        assert breakdown["totals"][phase] == pytest.approx(sum(applied))
+        if applied:
+            assert breakdown["percentiles"][phase] == pytest.approx(
+                {50: statistics.median(applied), 100: max(applied)}
+            )
+        else:
+            assert breakdown["percentiles"][phase] is None
+
+    by_asset_type = {}
+    for entry in page.entries:
+        by_asset_type[page.get_asset_type(entry)] = (
+            by_asset_type.get(page.get_asset_type(entry), 0) + entry.timings["receive"]
+        )
+    assert {
+        asset_type: group["totals"]["receive"]
+        for asset_type, group in breakdown["by_asset_type"].items()
+    } == pytest.approx(by_asset_type)
+    assert sum(group["count"] for group in breakdown["by_host"].values()) == len(
+        page.entries
+    )
+
+    images = columns.timing_breakdown(columns.mask(content_type="image.*"))
+    assert "by_asset_type" not in images
+    assert images["count"] == len(page.filter_entries(content_type="image.*"))
+    assert columns.timing_breakdown(columns.mask(page_id="nope"))["count"] == 0
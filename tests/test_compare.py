@@ -0,0 +1,69 @@
+"""Tests for the comparison of two sets of runs"""
+import random
+import statistics
+import pytest
+from haralyzer import MultiHarParser
+from haralyzer.compare import bootstrap_ci, compare_samples, mann_whitney_u
+
+
+def test_mann_whitney_u():
+    # Same as scipy.stats.mannwhitneyu(..., method="asymptotic")
+    u_statistic, p_value = mann_whitney_u([1, 2, 3], [4, 5, 6])
+    assert u_statistic == 0
+    assert p_value == pytest.approx(0.0808556, abs=1e-6)
+    u_statistic, p_value = mann_whitney_u([1, 2, 2, 3, 5], [2, 3, 4, 4])
+    # Ties share the average of their ranks and shrink the variance
+    assert u_statistic == 6.5
+    assert p_value == pytest.approx(0.450887, abs=1e-6)
+    assert mann_whitney_u([1, 1], [1, 1]) == (2, 1.0)
+    with pytest.raises(ValueError):
+        mann_whitney_u([], [1])
+
+
+def test_bootstrap_ci(use_numpy):
+    rng = random.Random(1)
+    baseline = [rng.gauss(500, 20) for _ in range(200)]
+    candidate = [rng.gauss(530, 20) for _ in range(150)]
+    delta = statistics.mean(candidate) - statistics.mean(baseline)
+    low, high = bootstrap_ci(baseline, candidate, seed=0, use_numpy=use_numpy)
+    assert low < delta < high
+    assert 20 < low and high < 40
+    assert (low, high) == bootstrap_ci(baseline, candidate, seed=0, use_numpy=use_numpy)
+    # Differences of medians of a constant sample are always 0
+    assert bootstrap_ci([1, 1], [1], "median", 100, use_numpy=use_numpy) == (0, 0)
+    with pytest.raises(ValueError):
+        bootstrap_ci(baseline, candidate, "mode")
+    with pytest.raises(ValueError):
+        bootstrap_ci(baseline, candidate, confidence=1)
+
+
+def test_compare_samples():
+    result = compare_samples([1, 2, 3], [4, 5, 6], iterations=100, seed=0)
+    assert result["baseline"] == 2
+    assert result["delta"] == 3
+    assert result["relative"] == 1.5
+    assert result["counts"] == (3, 3)
+    assert result["ci"][0] <= 3 <= result["ci"][1]
+    assert compare_samples([0, 0], [1], iterations=10)["relative"] is None
+
+
+def test_multi_har_parser(har_data):
+    data = [har_data(f"multi_test_{i}.har") for i in range(1, 5)]
+    baseline = MultiHarParser(har_data=data[:3])
+    candidate = MultiHarParser(har_data=data[1:])
+    result = baseline.compare(candidate, iterations=200, urls=True, seed=0)
+    page = result["metrics"]["page"]
+    assert page["baseline"] == pytest.approx(statistics.mean(baseline.get_load_times("page")))
+    assert page["candidate"] == pytest.approx(
+        statistics.mean(candidate.get_load_times("page"))
+    )
+    assert page["ci"][0] <= page["delta"] <= page["ci"][1]
+    assert 0 <= page["p_value"] <= 1
+    assert {"ttfb", "js", "page_size", "transfer_size"} <= set(result["metrics"])
+    assert set(result["urls"]) <= set(baseline.url_matrix().urls)
+    assert result["urls"]
+
+    # Comparing runs with themselves finds no difference
+    same = baseline.compare(baseline, iterations=200)["metrics"]["page"]
+    assert same["delta"] == 0
+    assert same["p_value"] == 1
@@ -2,6 +2,8 @@
 import pytest
 
 from haralyzer import HarEntry, HarPage
+from haralyzer.http import Request
+from haralyzer.urls import normalize_url, split_urls
 
 PAGE_ID = "page_3"
 
@@ -80,6 +82,66 @@ def test_request(har_data):
     assert request.formatted == formatted
 
 
+def test_request_url_components(har_data):
+    """
+    Tests the cached URL components of HarEntry.request
+    """
+    init_data = har_data("humanssuck.net.har")
+    request = HarPage(PAGE_ID, har_data=init_data).entries[0].request
+    assert request.scheme == "http"
+    assert request.hostname == "humanssuck.net"
+    assert request.port == 80
+    assert request.path == "/"
+    assert request.query_params == {}
+    assert request.origin == "http://humanssuck.net"
+
+    # Query params come from the queryString of the HAR file when recorded
+    request = Request(
+        entry={
+            "url": "https://Example.com:8443/a/b?x=1&x=2&y=",
+            "queryString": [{"name": "x", "value": "one"}],
+        }
+    )
+    assert request.scheme == "https"
+    assert request.hostname == "example.com"
+    assert request.port == 8443
+    assert request.path == "/a/b"
+    assert request.query_params == {"x": ["one"]}
+    assert request.origin == "https://example.com:8443"
+
+    request = Request(entry={"url": "https://example.com/?x=1&x=2&y="})
+    assert request.port == 443
+    assert request.query_params == {"x": ["1", "2"], "y": [""]}
+    assert request.origin == "https://example.com"
+
+
+def test_split_urls():
+    """
+    The bulk split should agree with the per request components
+    """
+    urls = [
+        "http://humanssuck.net/",
+        "https://Example.com:8443/a/b?x=1#frag",
+        "https://example.com",
+        "data:image/png;base64,AAAA",
+    ]
+    columns = split_urls(urls)
+    for i, url in enumerate(urls):
+        request = Request(entry={"url": url})
+        assert columns["scheme"][i] == request.scheme
+        assert columns["hostname"][i] == (request.hostname or "")
+        assert columns["port"][i] == request.port
+        assert columns["path"][i] == request.path
+    assert columns["query"] == ["", "x=1", "", ""]
+
+
+def test_normalize_url():
+    assert normalize_url("HTTPS://Example.com:443?b=2&a=1#top") == "https://example.com/"
+    assert normalize_url("http://example.com:8080/a?b=2&a=1", keep_query=True) == (
+        "http://example.com:8080/a?a=1&b=2"
+    )
+
+
 def test_response(har_data):
     """
     Tests the HarEntry.response has the correct data
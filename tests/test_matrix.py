@@ -0,0 +1,83 @@
+"""Tests for the runs by URL matrix"""
+import math
+import statistics
+import pytest
+from haralyzer import MultiHarParser
+from haralyzer.matrix import METRICS, UrlMatrix
+
+
+class Entry:
+    """Just the fields of HarEntry the matrix reads"""
+
+    def __init__(self, url, time, wait=-1, transfer_size=0):
+        self.url = url
+        self.time = time
+        self.timings = {"dns": -1, "wait": wait}
+        self.response = type("Response", (), {"transferSize": transfer_size})
+
+
+RUNS = [
+    [Entry("https://a.com/x?v=1", 10, 4, 100), Entry("https://a.com/y", 5)],
+    [Entry("https://a.com/x?v=2", 30, 8, 100), Entry("https://a.com/x?v=2", 2, 1, 5)],
+    [Entry("https://a.com/z", 1), Entry("https://a.com/x?v=3", 20, 6, 100)],
+]
+
+
+def test_url_matrix(use_numpy):
+    matrix = UrlMatrix(RUNS, use_numpy=use_numpy)
+    assert matrix.shape == (3, 5)
+    # Requests of the same URL in one run add up
+    assert matrix.column("https://a.com/x?v=2", "wait")[1] == 9
+
+    normalized = UrlMatrix(RUNS, normalize=True, use_numpy=use_numpy)
+    assert normalized.urls == ["https://a.com/x", "https://a.com/y", "https://a.com/z"]
+    assert list(normalized.column("https://a.com/x")) == [10, 32, 20]
+    assert list(normalized.column("https://a.com/x", "dns")) == [0, 0, 0]
+    assert list(normalized.column("https://a.com/x", "transfer_size")) == [100, 105, 100]
+    # A URL first seen in a later run is missing from the earlier ones
+    assert [math.isnan(value) for value in normalized.column("https://a.com/z")] == [
+        True,
+        True,
+        False,
+    ]
+
+    stats = normalized.url_stats(percentiles=[50, 100])
+    assert stats["https://a.com/x"]["count"] == 3
+    assert stats["https://a.com/x"]["missing"] == 0
+    assert stats["https://a.com/x"]["mean"] == pytest.approx(statistics.mean([10, 32, 20]))
+    assert stats["https://a.com/x"]["stdev"] == pytest.approx(
+        statistics.stdev([10, 32, 20])
+    )
+    assert stats["https://a.com/x"]["percentiles"] == {50: 20, 100: 32}
+    assert stats["https://a.com/z"]["missing"] == 2
+    assert stats["https://a.com/z"]["stdev"] == 0
+    assert normalized.url_stats("wait")["https://a.com/x"]["max"] == 9
+    assert UrlMatrix(use_numpy=use_numpy).url_stats() == {}
+    with pytest.raises(ValueError):
+        normalized.url_stats("nonexistent")
+
+
+def test_to_numpy():
+    pytest.importorskip("numpy")
+    matrix = UrlMatrix(RUNS, normalize=True)
+    array = matrix.to_numpy("transfer_size")
+    assert array.shape == (3, 3)
+    assert array[:, 0].tolist() == [100, 105, 100]
+    assert [math.isnan(value) for value in array[:, 2]] == [True, True, False]
+    assert matrix.to_numpy("wait")[:, 0].tolist() == [4, 9, 6]
+    assert len(METRICS) == 9
+
+
+def test_multi_har_parser(har_data):
+    data = [har_data(f"multi_test_{i}.har") for i in range(1, 4)]
+    har_parser = MultiHarParser(har_data=data)
+    matrix = har_parser.url_matrix()
+    assert matrix.runs == len(har_parser.pages)
+    for url, stats in matrix.url_stats().items():
+        times = [
+            sum(entry.time for entry in page.entries if entry.url == url)
+            for page in har_parser.pages
+            if any(entry.url == url for entry in page.entries)
+        ]
+        assert stats["count"] + stats["missing"] == 3
+        assert stats["mean"] == pytest.approx(statistics.mean(times))
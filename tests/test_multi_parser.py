@@ -1,6 +1,8 @@
 """Tests for multi parser"""
+import copy
+import statistics
 import pytest
-from haralyzer import MultiHarParser, HarPage
+from haralyzer import MultiHarParser, HarEntry, HarPage
 
 PAGE_ID = "page_3"
 
@@ -34,6 +36,10 @@ def test_load_times(har_data):
     # TODO - Get audio/video load time data
     assert har_parser.video_load_time == 0
     assert har_parser.audio_load_time == 0
+    # Whole means of int load times stay int, like statistics.mean
+    assert isinstance(har_parser.image_load_time, int)
+    assert isinstance(har_parser.time_to_first_byte, int)
+    assert isinstance(har_parser.js_load_time, float)
 
 
 def test_stdev(har_data):
@@ -58,6 +64,311 @@ def test_stdev(har_data):
     assert har_parser.get_stdev("audio") == 0
 
 
+def test_missing_data(har_data):
+    """
+    Metrics the HAR file doesn't have the data for are left out of the
+    summaries, without breaking the other aggregates
+    """
+    data = har_data("missing_pageref.har")
+    har_parser = MultiHarParser(har_data=[data, copy.deepcopy(data)])
+    assert har_parser.page_load_time == 567
+    assert har_parser.get_stdev("page") == 0
+    summary = har_parser.summaries[1]
+    assert summary["sizes"]["page"] is None
+    assert summary["transfer_size"] is None
+    assert har_parser.stats["page"].count == 2
+    assert "page_size" not in har_parser.stats
+
+
+def test_pages_cached(har_data, count_parsers):
+    data = _load_test_data(har_data)
+    har_parser = MultiHarParser(har_data=data)
+    count_parsers.clear()
+    assert har_parser.pages is har_parser.pages
+    assert har_parser.page_load_time == 519
+    assert har_parser.get_stdev("page") == 11
+    assert har_parser.get_stdev("ttfb") == 10
+    assert len(count_parsers) == 3
+
+    # Changes to the HAR data are picked up after invalidating
+    har_parser.har_data.append(har_data("multi_test_4.har"))
+    assert len(har_parser.pages) == 3
+    har_parser.invalidate()
+    assert len(har_parser.pages) == 4
+    assert har_parser.page_load_time != 519
+    assert len(count_parsers) == 7
+
+
+def test_parallel(har_data):
+    paths = [har_data(f"multi_test_{i}.har", as_path=True) for i in range(1, 4)]
+    serial = MultiHarParser(har_data=_load_test_data(har_data))
+    parallel = MultiHarParser(har_data=paths, parallel=True, max_workers=2)
+    assert parallel.summaries == serial.summaries
+    assert "parsers" not in vars(parallel)
+    for asset_type in ["page", "js", "css", "image", "html", "video", "audio"]:
+        assert getattr(parallel, f"{asset_type}_load_time") == getattr(
+            serial, f"{asset_type}_load_time"
+        )
+        assert parallel.get_stdev(asset_type) == serial.get_stdev(asset_type)
+    assert parallel.time_to_first_byte == serial.time_to_first_byte == 70
+    assert parallel.get_stdev("ttfb") == 10
+
+    # Paths also work without a pool, and only the selected page is summarized
+    by_path = MultiHarParser(har_data=paths, page_id=PAGE_ID)
+    assert [summary["page_id"] for summary in by_path.summaries] == [PAGE_ID] * 3
+    assert by_path.page_load_time == MultiHarParser(
+        har_data=paths, page_id=PAGE_ID, parallel=True
+    ).page_load_time
+
+
+@pytest.mark.parametrize("parallel", [False, True], ids=["serial", "parallel"])
+def test_streaming(har_data, parallel):
+    serial = MultiHarParser(har_data=_load_test_data(har_data))
+    streamed = MultiHarParser(
+        har_data=(har_data(f"multi_test_{i}.har", as_path=True) for i in range(1, 4)),
+        parallel=parallel,
+    )
+    assert streamed.streaming
+    assert streamed.page_load_time == 519
+    assert streamed.time_to_first_byte == 70
+    for asset_type in ["page", "ttfb", "js", "css", "image", "html", "video"]:
+        assert streamed.get_stdev(asset_type) == serial.get_stdev(asset_type)
+    stats = streamed.stats["page"]
+    assert stats.count == 3
+    assert stats.mean == serial.stats["page"].mean
+    assert (stats.min, stats.max) == (
+        min(serial.get_load_times("page")),
+        max(serial.get_load_times("page")),
+    )
+    # Nothing but the statistics is kept
+    assert "summaries" not in vars(streamed)
+    with pytest.raises(ValueError):
+        streamed.get_load_times("page")
+    with pytest.raises(ValueError):
+        streamed.pages
+
+
+def test_timing_breakdown(har_data, monkeypatch):
+    har_parser = MultiHarParser(har_data=_load_test_data(har_data, 4))
+    with monkeypatch.context() as patch:
+        # The columns are built from the raw entries, not from HarEntry objects
+        patch.setattr(HarEntry, "__init__", None)
+        breakdown = har_parser.timing_breakdown()
+    pages = [page.timing_breakdown() for page in har_parser.pages]
+    assert breakdown["count"] == sum(page["count"] for page in pages)
+    assert breakdown["totals"]["wait"] == sum(page["totals"]["wait"] for page in pages)
+    assert set(breakdown["by_asset_type"]) == {"text", "css", "image", "js"}
+
+
+def test_percentiles(har_data):
+    har_parser = MultiHarParser(har_data=_load_test_data(har_data))
+    load_times = sorted(har_parser.get_load_times("page"))
+    assert har_parser.get_percentiles("page", [0, 50, 100]) == {
+        0: load_times[0],
+        50: load_times[1],
+        100: load_times[2],
+    }
+    assert set(har_parser.get_percentiles("ttfb")) == {50, 75, 95, 99}
+    assert har_parser.get_percentiles("video") == dict.fromkeys([50, 75, 95, 99], 0)
+    assert sum(count for _, _, count in har_parser.get_histogram("js_size", 4)) == 3
+    with pytest.raises(ValueError):
+        har_parser.get_percentiles("nonexistent")
+
+    # The sketches are within their relative accuracy of the exact values
+    for metric in ["page", "ttfb", "image", "page_size", "transfer_size"]:
+        exact = har_parser.get_percentiles(metric, [0, 50, 100])
+        approximate = har_parser.get_percentiles(metric, [0, 50, 100], exact=False)
+        for value, result in exact.items():
+            assert approximate[value] == pytest.approx(result, rel=0.011, abs=1)
+
+    streamed = MultiHarParser(
+        har_data=(har_data(f"multi_test_{i}.har", as_path=True) for i in range(1, 4)),
+    )
+    assert streamed.get_percentiles("page", [0, 100]) == {
+        0: load_times[0],
+        100: load_times[2],
+    }
+    assert sum(count for _, _, count in streamed.get_histogram("page")) == 3
+    with pytest.raises(ValueError):
+        streamed.get_percentiles("page", exact=True)
+
+
+def test_add_remove_har(har_data, count_parsers):
+    data = _load_test_data(har_data, num_test_files=4)
+    har_parser = MultiHarParser(har_data=data[:3])
+    assert har_parser.page_load_time == 519
+    assert har_parser.get_stdev("ttfb") == 10
+    assert har_parser.asset_types
+    count_parsers.clear()
+    har_id = har_parser.add_har(data[3])
+    assert har_parser.har_ids == [0, 1, 2, 3] and har_id == 3
+    expected = MultiHarParser(har_data=data)
+    for asset_type in ["page", "ttfb", "js", "css", "image", "html"]:
+        assert har_parser.get_stdev(asset_type) == expected.get_stdev(asset_type)
+    assert har_parser.page_load_time == expected.page_load_time
+    assert har_parser.time_to_first_byte == expected.time_to_first_byte
+    assert har_parser.stats["page"].count == 4
+    assert har_parser.get_load_times("page") == expected.get_load_times("page")
+    assert len(har_parser.pages) == 4
+    assert len(count_parsers) == 1 + len(expected.parsers)
+
+    har_parser.remove_har(0)
+    expected = MultiHarParser(har_data=data[1:])
+    assert har_parser.har_ids == [1, 2, 3]
+    assert har_parser.page_load_time == expected.page_load_time
+    assert har_parser.get_stdev("page") == expected.get_stdev("page")
+    assert har_parser.summaries == expected.summaries
+    assert len(count_parsers) == 1 + 4 + len(expected.parsers)
+    with pytest.raises(ValueError):
+        har_parser.remove_har(0)
+
+    # Streamed runs are folded into the running statistics
+    streamed = MultiHarParser(har_data=iter(data[:3]))
+    assert streamed.page_load_time == 519
+    assert streamed.add_har(data[3]) is None
+    assert streamed.stats["page"].count == 4
+    assert streamed.page_load_time == MultiHarParser(har_data=data).page_load_time
+    with pytest.raises(ValueError):
+        streamed.remove_har(0)
+
+
+def test_align(har_data):
+    data = _load_test_data(har_data, num_test_files=4)
+    # The last run calls the page page_0 instead of page_3
+    assert len(MultiHarParser(har_data=data, page_id=PAGE_ID).pages) == 3
+    url = "http://humanssuck.net/"
+    for align, page_id in [("title", url), ("order", 0)]:
+        har_parser = MultiHarParser(har_data=data, page_id=page_id, align=align)
+        assert [page.page_id for page in har_parser.pages] == [PAGE_ID] * 3 + ["page_0"]
+        assert len(har_parser.get_load_times("page")) == 4
+        assert har_parser.summaries[3]["title"] == url
+    # The entries of the last run don't refer to its page, so it has no URL
+    by_url = MultiHarParser(har_data=data, page_id=url, align="url")
+    assert len(by_url.summaries) == 3
+    assert by_url.summaries[0]["url"] == url
+    by_host = MultiHarParser(
+        har_data=data,
+        page_id="humanssuck.net",
+        align=lambda info: info["title"].split("/")[2],
+    )
+    assert len(by_host.summaries) == 4
+    # A lambda can't be sent to the workers, so the parent selects the pages
+    paths = [har_data(f"multi_test_{i}.har", as_path=True) for i in range(1, 5)]
+    by_order = MultiHarParser(paths, page_id=0, align=lambda info: info["order"])
+    in_parallel = MultiHarParser(
+        paths,
+        page_id=0,
+        align=lambda info: info["order"],
+        parallel=True,
+        max_workers=2,
+    )
+    assert in_parallel.page_load_time == by_order.page_load_time
+    assert len(in_parallel.summaries) == 4
+    with pytest.raises(ValueError):
+        MultiHarParser(har_data=data, align="nonexistent")
+
+
+def test_steps(har_data):
+    data = _load_test_data(har_data)
+    runs = [
+        _journey(data[0], data[1], ["page_1", "page_2"]),
+        _journey(data[1], data[2], ["page_8", "page_5"]),
+    ]
+    har_parser = MultiHarParser(har_data=runs)
+    steps = har_parser.steps(align="order")
+    assert list(steps) == [0, 1]
+    assert steps[0]["runs"] == steps[1]["runs"] == 2
+    assert steps[1]["missing"] == 0
+    assert steps[0]["page_ids"] == ["page_1", "page_8"]
+    first_steps = [
+        MultiHarParser(har_data=data[:2]).get_load_times("page"),
+        MultiHarParser(har_data=data[1:3]).get_load_times("page"),
+    ]
+    for step, load_times in zip(steps.values(), first_steps):
+        assert step["stats"]["page"].mean == statistics.mean(load_times)
+    # Both steps load the same URL
+    steps = har_parser.steps(align="url")
+    assert list(steps) == ["http://humanssuck.net/"]
+    assert steps["http://humanssuck.net/"]["runs"] == 2
+    assert steps["http://humanssuck.net/"]["stats"]["page"].count == 4
+    steps = MultiHarParser(har_data=runs + [data[0]], align="order").steps()
+    assert (steps[0]["missing"], steps[1]["missing"]) == (0, 1)
+
+
+def _journey(first, second, page_ids):
+    """Joins the first page of two HAR files into one run of two pages"""
+    log = {"pages": [], "entries": []}
+    for har, page_id in zip([first, second], page_ids):
+        har = copy.deepcopy(har)
+        page = har["log"]["pages"][0]
+        for entry in har["log"]["entries"]:
+            if entry.get("pageref") == page["id"]:
+                log["entries"].append(dict(entry, pageref=page_id))
+        log["pages"].append(dict(page, id=page_id))
+    return {"log": dict(first["log"], **log)}
+
+
+def test_outliers(har_data):
+    data = _load_test_data(har_data, num_test_files=4)
+    slow = copy.deepcopy(data[0])
+    for page in slow["log"]["pages"]:
+        page["pageTimings"]["onLoad"] *= 10
+    data.append(slow)
+    har_parser = MultiHarParser(har_data=data)
+    load_times = har_parser.get_load_times("page")
+    assert len(load_times) == 5
+    assert har_parser.outlier_report == []
+    robust = har_parser.get_robust_stats("page", trim=0.2)
+    assert robust["count"] == 5
+    assert robust["median"] == statistics.median(load_times)
+    assert robust["trimmed_mean"] == statistics.mean(sorted(load_times)[1:-1])
+    assert har_parser.get_robust_stats("video_size")["count"] == 5
+
+    # Changing the policy only reduces the cached summaries again
+    summaries = har_parser.summaries
+    for policy in ["mad", "iqr"]:
+        har_parser.set_outlier_policy(policy)
+        assert har_parser.summaries is summaries
+        assert [row["har_id"] for row in har_parser.outlier_report] == [4]
+        assert har_parser.outlier_report[0]["reason"] == "above"
+        assert har_parser.outlier_report[0]["value"] == max(load_times)
+        assert har_parser.page_load_time == round(statistics.mean(load_times[:4]))
+        assert har_parser.get_load_times("page") == load_times[:4]
+
+    har_parser.set_outlier_policy("trim", 0.2)
+    report = har_parser.outlier_report
+    assert [row["reason"] for row in report] == ["lowest", "highest"]
+    assert har_parser.page_load_time == round(
+        statistics.mean(sorted(load_times)[1:-1])
+    )
+    har_parser.set_outlier_policy(None)
+    assert har_parser.page_load_time == round(statistics.mean(load_times))
+
+    # The report gives the IDs of remove_har
+    har_parser.set_outlier_policy("iqr")
+    har_parser.remove_har(0)
+    assert [row["har_id"] for row in har_parser.outlier_report] == [4]
+    har_parser.remove_har(4)
+    assert har_parser.outlier_report == []
+
+    with pytest.raises(ValueError):
+        MultiHarParser(har_data=data, outliers="nonexistent")
+    for policy, threshold in [("trim", 0.5), ("trim", -0.1), ("mad", -1), ("iqr", 0)]:
+        with pytest.raises(ValueError):
+            MultiHarParser(har_data=data, outliers=policy, outlier_threshold=threshold)
+    with pytest.raises(ValueError):
+        MultiHarParser(har_data=iter(data), outliers="iqr")
+
+    # Streamed runs can't be read again, so their aggregates are kept
+    streamed = MultiHarParser(har_data=iter(data))
+    page_load_time = streamed.page_load_time
+    streamed.set_outlier_policy(None)
+    assert streamed.page_load_time == page_load_time
+    streamed.invalidate()
+    assert streamed.stats["page"].count == len(data)
+    assert streamed.page_load_time == page_load_time
+
+
 def _load_test_data(har_data, num_test_files=3):
     """
     Loads the test files we need and returns them in the proper format.
@@ -1,7 +1,7 @@
 """Test for Har Page"""
 import re
 import pytest
-from haralyzer import HarPage, HarParser
+from haralyzer import HarEntry, HarPage, HarParser
 from haralyzer.errors import PageNotFoundError
 
 BAD_PAGE_ID = "sup_dawg"
@@ -96,6 +96,41 @@ def test_filter_entries(har_data):
     assert len(entries) == 0
 
 
+def test_filter_entries_headers_and_url(har_data):
+    """
+    Tests filtering by headers, URL and host
+    """
+    init_data = har_data("humanssuck.net.har")
+    page = HarPage(PAGE_ID, har_data=init_data)
+
+    entries = page.filter_entries(
+        response_header={"content-type": "image.*", "Server": "nginx"}
+    )
+    assert len(entries) == 1
+    assert entries[0].url == "http://humanssuck.net/screen_login.gif"
+
+    entries = page.filter_entries(
+        response_header={"cache-control": "max-age=2592000"}, regex=False
+    )
+    assert len(entries) == 2
+    assert not page.filter_entries(
+        response_header={"cache-control": "max-age"}, regex=False
+    )
+    assert not page.filter_entries(response_header={"x-not-there": ".*"})
+
+    entries = page.filter_entries(request_header={"accept": "text/css"})
+    assert len(entries) == 1
+    assert entries[0].url == "http://humanssuck.net/test.css"
+
+    assert len(page.filter_entries(host="HUMANSSUCK")) == 4
+    assert len(page.filter_entries(host="humanssuck.net", regex=False)) == 4
+    assert not page.filter_entries(host="humanssuck", regex=False)
+    entries = page.filter_entries(url=r"\.js$", request_type="GET")
+    assert len(entries) == 1
+    assert entries[0].url == "http://humanssuck.net/jquery-1.7.1.min.js"
+    assert not page.filter_entries(url=r"\.JS$")
+
+
 def test_filter_entries_load_time(har_data):
     """
     Tests ability to filter entries by load time
@@ -124,6 +159,46 @@ def test_get_load_time(har_data):
     assert page.get_load_time(status_code="2.*") == 463
 
 
+def test_get_load_time_memo(har_data, monkeypatch):
+    page = HarPage(PAGE_ID, har_data=har_data("humanssuck.net.har"))
+    calls = []
+    filter_entries = page.filter_entries
+    monkeypatch.setattr(
+        page,
+        "filter_entries",
+        lambda **kwargs: calls.append(kwargs) or filter_entries(**kwargs),
+    )
+
+    assert page.get_load_time(request_type="GET") == 463
+    assert page.get_load_time(request_type="GET", **{"async": False}) == 843
+    assert page.get_load_time(request_type="GET", regex=True) == 463
+    assert len(calls) == 1
+    # Any filter_entries criteria can be used
+    assert page.get_load_time(request_header={"Host": "humanssuck.net"}) == 463
+    assert page.get_load_time(request_header={"host": "nope"}) == 0
+    assert len(calls) == 3
+    # Unknown keyword arguments are ignored, as they always were
+    assert page.get_load_time(request_type="GET", foo=1) == 463
+    assert len(calls) == 3
+
+    # Combined from the memoized slices
+    images, css = {"content_type": "image.*"}, {"content_type": ".*css"}
+    assert page.get_combined_load_time(images, css) == page.get_load_time(
+        content_type="image.*|.*css"
+    )
+    assert page.get_combined_load_time(images, images, asynchronous=False) == 304
+    assert page.get_combined_load_time() == 0
+    assert len(calls) == 6
+
+    # The memo is bounded
+    page.load_time_cache_size = 2
+    page.get_load_time(status_code="2.*")
+    page.get_load_time(content_type="image.*")
+    assert len(calls) == 7
+    page.get_load_time(request_type="GET")
+    assert len(calls) == 8
+
+
 def test_entries(har_data):
     init_data = har_data("humanssuck.net.har")
     page = HarPage(PAGE_ID, har_data=init_data)
@@ -145,6 +220,36 @@ def test_iteration(har_data):
         assert next(page)
 
 
+def test_iter_entries(har_data):
+    """
+    The generators should yield the same entries as the cached lists,
+    without caching anything
+    """
+    init_data = har_data("cnn.har")
+    page = HarPage(PAGE_ID, har_data=init_data)
+
+    entries = list(page.iter_entries())
+    assert [entry.raw_entry for entry in entries] == [
+        entry for entry in init_data["log"]["entries"] if entry["pageref"] == PAGE_ID
+    ]
+    sorted_entries = list(page.iter_entries(sort=True))
+    assert [entry.raw_entry for entry in sorted_entries] == [
+        entry.raw_entry for entry in page.entries
+    ]
+    assert [entry.raw_entry for entry in sorted_entries] != [
+        entry.raw_entry for entry in entries
+    ]
+
+    images = page.ifilter_entries(content_type="image.*", sort=True)
+    assert not isinstance(images, list)
+    assert [entry.raw_entry for entry in images] == [
+        entry.raw_entry for entry in page.image_files
+    ]
+    assert len(list(page.ifilter_entries(request_type="get"))) == len(
+        page.get_requests
+    )
+
+
 def test_file_types(har_data):
     """
     Test file type properties
@@ -234,6 +339,63 @@ def test_load_times(har_data):
     assert page.video_load_time == 0
 
 
+def test_fractional_load_times(har_data):
+    """
+    Load times are the exact union of the entry intervals, so fractional
+    timings give fractional load times
+    """
+    page = HarPage("page_1", har_data=har_data("cnn-chrome.har"))
+    assert page.js_load_time == 3124.458
+    assert page.image_load_time == 2621.457
+    assert page.css_load_time == 181.506
+    assert page.html_load_time == 2095.762
+
+    # Entries that take no time don't add any load time
+    init_data = har_data("humanssuck.net.har")
+    for entry in init_data["log"]["entries"]:
+        if entry["response"]["content"]["mimeType"] == "text/css":
+            entry["time"] = 0
+    page = HarPage(PAGE_ID, har_data=init_data)
+    assert page.css_load_time == 0
+
+
+def test_concurrency_profile(har_data):
+    init_data = har_data("humanssuck.net.har")
+    page = HarPage(PAGE_ID, har_data=init_data)
+
+    profile = page.concurrency_profile()
+    assert profile["steps"] == [(0, 1), (153, 0), (183, 3), (259, 2), (487, 1), (493, 0)]
+    assert profile["peak"] == 3
+    assert profile["mean"] == pytest.approx(843 / 493)
+    assert profile["time_at_level"] == {0: 30, 1: 159, 2: 228, 3: 76}
+
+    by_type = page.concurrency_profile(group_by="asset_type")
+    assert set(by_type) == {"text", "css", "image", "js"}
+    assert by_type["image"]["steps"] == [(183, 1), (487, 0)]
+    by_host = page.concurrency_profile(group_by="host")
+    assert by_host == {"humanssuck.net": profile}
+    with pytest.raises(ValueError):
+        page.concurrency_profile(group_by="nothing")
+
+
+def test_timeline_buckets(har_data):
+    init_data = har_data("humanssuck.net.har")
+    page = HarPage(PAGE_ID, har_data=init_data)
+
+    buckets = page.timeline_buckets(100)
+    assert buckets["resolution"] == 100
+    assert list(buckets["active"]) == [1, 4, 3, 2, 2]
+    assert list(buckets["starts"]) == [1, 3, 0, 0, 0]
+    assert list(buckets["bytes"][:3]) == [0, 576, 366]
+    assert sum(buckets["bytes"]) == pytest.approx(
+        sum(entry.response.transferSize for entry in page.entries)
+    )
+
+    buckets = page.timeline_buckets(1000, entries=page.image_files)
+    assert list(buckets["active"]) == [1]
+    assert list(buckets["bytes"]) == pytest.approx([23899])
+
+
 def test_time_to_first_byte(har_data):
     """
     Tests that TTFB is correctly reported as a property of the page.
@@ -276,3 +438,134 @@ def test_duplicate_urls_count(har_data):
     assert page.duplicate_url_request == {
         "http://humanssuck.net/jquery-1.7.1.min.js": 2
     }
+
+
+def test_dependency_graph(har_data):
+    init_data = har_data("humanssuck.net.har")
+    entries = init_data["log"]["entries"]
+    entries[1]["_initiator"] = {"type": "parser", "url": "http://humanssuck.net/"}
+    entries[3]["_initiator"] = {
+        "type": "script",
+        "stack": {
+            "callFrames": [{"functionName": "", "url": ""}],
+            "parent": {"callFrames": [{"url": "http://humanssuck.net/"}]},
+        },
+    }
+    page = HarPage(PAGE_ID, har_data=init_data)
+    assert page.entries[1].initiator["type"] == "parser"
+    assert page.entries[0].initiator == {}
+    assert page.entries[0].priority is None
+
+    graph = page.dependency_graph
+    assert graph.parents == [None, 0, None, 0]
+    assert graph.children == [[1, 3], [], [], []]
+    assert graph.roots == [0, 2]
+    assert graph.chain(3) == [0, 3]
+
+    path = page.critical_path()
+    assert [entry.url for entry in path["entries"]] == [
+        "http://humanssuck.net/",
+        "http://humanssuck.net/jquery-1.7.1.min.js",
+    ]
+    assert path["time"] == 463
+    assert path["start"] == 0
+    assert path["end"] == 493
+    # The gap between the two requests is not part of the chain
+    assert path["load_time_contribution"] == 463
+    assert path["load_time_share"] == 463 / page.page_load_time
+
+
+def test_critical_path_chrome(har_data):
+    page = HarPage("page_1", har_data=har_data("cnn-chrome.har"))
+    assert page.entries[5].priority == "High"
+    path = page.critical_path()
+    # Redirects from cnn.com to edition.cnn.com start the chain
+    assert [entry.url for entry in path["entries"][:3]] == [
+        "http://cnn.com/",
+        "http://www.cnn.com/",
+        "http://edition.cnn.com/",
+    ]
+    assert 0 < path["load_time_share"] < 1
+
+
+def test_active_at_and_overlapping(har_data):
+    page = HarPage(PAGE_ID, har_data=har_data("humanssuck.net.har"))
+    entries = page.entries
+    assert page.active_at(0) == entries[:1]
+    assert page.active_at(153) == []
+    assert page.active_at(183) == entries[1:]
+    assert page.active_at(300.5) == entries[2:]
+    assert page.active_at(493) == []
+
+    assert page.overlapping(150, 184) == entries
+    assert page.overlapping(153, 183) == []
+    # The entry itself is left out
+    assert page.overlapping(entries[2]) == [entries[1], entries[3]]
+    # Also when the entry isn't one of page.entries
+    fresh = list(page.iter_entries())
+    assert fresh[2] is not entries[2]
+    assert page.overlapping(fresh[2]) == [entries[1], entries[3]]
+    with pytest.raises(ValueError):
+        page.overlapping(0)
+
+
+def test_timing_breakdown(har_data):
+    page = HarPage(PAGE_ID, har_data=har_data("humanssuck.net.har"))
+    breakdown = page.timing_breakdown(percentiles=[50])
+    assert breakdown["count"] == 4
+    assert breakdown["totals"]["wait"] == 309
+    assert breakdown["percentiles"]["receive"] == {50: 37.5}
+    assert breakdown["by_host"]["humanssuck.net"]["totals"]["receive"] == 227
+    assert breakdown["by_asset_type"]["js"] == {
+        "count": 1,
+        "totals": {
+            "blocked": 77,
+            "dns": 0,
+            "connect": 0,
+            "ssl": 0,
+            "send": 0,
+            "wait": 81,
+            "receive": 152,
+            "_blocked_queueing": 0,
+        },
+    }
+
+
+def test_entry_offsets(har_data):
+    page = HarPage("page_1", har_data=har_data("cnn-chrome.har"))
+    entry = page.entries[3]
+    assert entry.start_us == 1510574582846000
+    assert entry.end_us == 1510574582950093
+    # The page started at 12:03:02.771
+    assert entry.start_offset == 75000
+    assert entry.end_offset == 179093
+    # The first entry started at 12:03:02.550
+    assert entry.har_start_offset == 296000
+    assert entry.har_end_offset == 400093
+    assert page.entries[0].start_offset == -221000
+    # Entries on their own only know their own start and end
+    standalone = HarEntry(entry.raw_entry)
+    assert (standalone.start_us, standalone.end_us) == (entry.start_us, entry.end_us)
+    assert standalone.start_offset is None
+
+    columns = page.parser.columns
+    assert columns.start.values[:4] == [-221000, -109000, 0, 75000]
+    assert columns.har_start.values[:4] == [0, 112000, 221000, 296000]
+    assert columns.end.values[3] == columns.har_end.values[3] - 221000 == 179093
+
+
+def test_network_idle_periods(har_data):
+    page = HarPage(PAGE_ID, har_data=har_data("humanssuck.net.har"))
+    assert page.network_idle_periods() == {
+        "periods": [(153, 183)],
+        "busy": 463,
+        "idle": 30,
+        # onLoad is after the last response
+        "network_quiet": 567,
+    }
+    assert page.network_idle_periods(min_gap_ms=31)["periods"] == []
+
+    page = HarPage("page_1", har_data=har_data("cnn-chrome.har"))
+    result = page.network_idle_periods(min_gap_ms=100)
+    assert result["periods"][-1] == (4460.459, 4585)
+    assert result["network_quiet"] == 4460.459
@@ -58,6 +58,15 @@ def test_from_string(har_data):
     assert isinstance(parser, HarParser)
 
 
+def test_iter_pages(har_data):
+    har_parser = HarParser(har_data("missing_pageref.har"))
+    pages = har_parser.iter_pages()
+    assert not isinstance(pages, list)
+    assert [page.page_id for page in pages] == [
+        page.page_id for page in har_parser.pages
+    ]
+
+
 def test_init_entry_with_no_pageref(har_data):
     """
     If we find an entry with no pageref it should end up in a HarPage object
@@ -262,6 +271,81 @@ def test_create_asset_timeline(har_data):
         time_key = time_key + datetime.timedelta(milliseconds=1)
 
 
+def test_find_entries(har_data):
+    """
+    Tests the index backed exact match lookups
+    """
+    har_parser = HarParser(har_data("cnn.har"))
+
+    entries = har_parser.find_entries(host="i.cdn.turner.com")
+    assert len(entries) == 11
+    for entry in entries:
+        assert "//i.cdn.turner.com/" in entry.request.url
+
+    entries = har_parser.find_entries(host="WWW.CNN.COM", path_prefix="/.a")
+    assert len(entries) == 29
+    for entry in entries:
+        assert entry.request.url.startswith("http://www.cnn.com/.a/")
+
+    entries = har_parser.find_entries(
+        host="i.cdn.turner.com",
+        status=range(200, 300),
+        mime_type=["image/png", "image/jpeg"],
+    )
+    assert len(entries) == 11
+    assert len(har_parser.find_entries(method="get")) == 145
+    assert len(har_parser.find_entries(status=302)) == 5
+    assert not har_parser.find_entries(host="www.cnn.com", status=302)
+    assert not har_parser.find_entries(path_prefix="/nothing/here")
+    # Segments are matched whole, not as string prefixes
+    assert not har_parser.find_entries(host="www.cnn.com", path_prefix="/.")
+
+
+def test_find_entries_without_url(har_data):
+    """
+    Tests that entries without a URL or a path aren't indexed by host or path
+    """
+    har_parser = HarParser(har_data("missing_pageref.har"))
+    assert not har_parser.find_entries(host="example.com")
+    assert not har_parser.find_entries(path_prefix="/")
+    assert not har_parser.find_entries(method="GET")
+    assert len(har_parser.find_entries(status=200)) == len(
+        har_parser.har_data["entries"]
+    )
+
+    data = har_data("humanssuck.net.har")
+    entries = data["log"]["entries"]
+    entries[0]["request"]["url"] = "data:image/png;base64,iVBORw0KGgo="
+    entries[1]["request"]["url"] = "http://humanssuck.net"
+    har_parser = HarParser(data)
+    rows = har_parser.find_entries(path_prefix="/")
+    assert len(rows) == len(entries) - 1
+    assert rows[0].request.url == "http://humanssuck.net"
+
+
+def test_get_asset_load_time(har_data):
+    """
+    The interval sweep should agree with the per millisecond timeline for
+    whole millisecond data, and keep sub-millisecond precision otherwise.
+    """
+    har_parser = HarParser(har_data("cnn.har"))
+    page = har_parser.pages[0]
+    for content_type in page.asset_types.values():
+        entries = page.filter_entries(content_type=content_type)
+        assert har_parser.get_asset_load_time(entries) == len(
+            har_parser.create_asset_timeline(entries)
+        )
+
+    entries = [
+        HarEntry({"startedDateTime": "2017-11-13T12:03:02.550Z", "time": 10.25}),
+        HarEntry({"startedDateTime": "2017-11-13T12:03:02.555Z", "time": 10}),
+        HarEntry({"startedDateTime": "2017-11-13T12:03:02.600Z", "time": 0.5}),
+    ]
+    assert har_parser.get_asset_load_time(entries) == 15.5
+    assert har_parser.get_asset_load_time(entries[1:2]) == 10
+    assert har_parser.get_asset_load_time([]) == 0
+
+
 def _headers_test(parser, entry, test_data, expects, regex):
     """
     Little helper function to test headers matches
@@ -0,0 +1,102 @@
+"""Tests for the online statistics"""
+import json
+import random
+import statistics
+import pytest
+from haralyzer.stats import (
+    MAD_SCALE,
+    QuantileSketch,
+    RunningStats,
+    histogram,
+    iqr_fences,
+    median_absolute_deviation,
+    percentile,
+    trimmed_mean,
+)
+
+VALUES = [519, 70.5, 149, 74, 379, 70, 11, 10.25, 6, 4]
+
+
+def test_running_stats():
+    stats = RunningStats(VALUES)
+    assert stats.count == len(VALUES)
+    assert stats.total == sum(VALUES)
+    assert stats.min == 4
+    assert stats.max == 519
+    assert stats.mean == statistics.mean(VALUES)
+    assert isinstance(RunningStats([1, 3]).mean, int)
+    assert isinstance(RunningStats([1, 2]).mean, float)
+    assert isinstance(RunningStats([1.0, 3.0]).mean, float)
+    assert stats.variance == pytest.approx(statistics.variance(VALUES))
+    assert stats.stdev == pytest.approx(statistics.stdev(VALUES))
+
+    with pytest.raises(statistics.StatisticsError):
+        RunningStats().mean
+    with pytest.raises(statistics.StatisticsError):
+        RunningStats([1]).variance
+
+
+def test_merge():
+    merged = RunningStats(VALUES[:3]).merge(RunningStats(VALUES[3:]))
+    expected = RunningStats(VALUES)
+    assert merged.count == expected.count
+    assert (merged.min, merged.max) == (expected.min, expected.max)
+    assert merged.mean == pytest.approx(expected.mean)
+    assert merged.variance == pytest.approx(expected.variance)
+
+    empty = RunningStats()
+    assert empty.merge(RunningStats()).count == 0
+    assert empty.merge(RunningStats(VALUES)).stdev == pytest.approx(expected.stdev)
+    assert RunningStats(VALUES).merge(RunningStats()).total == expected.total
+
+    restored = RunningStats.from_dict(json.loads(json.dumps(expected.to_dict())))
+    assert restored.merge(RunningStats([1])).count == expected.count + 1
+
+
+def test_percentile_and_histogram():
+    ordered = sorted(VALUES)
+    assert percentile(ordered, 0) == 4
+    assert percentile(ordered, 100) == 519
+    assert percentile(ordered, 50) == statistics.median(VALUES)
+    assert histogram([1, 2, 2, 10], bins=3) == [(1, 4, 3), (4, 7, 0), (7, 10, 1)]
+    assert histogram([5, 5], bins=3) == [(5, 5, 2)]
+    assert histogram([]) == []
+    with pytest.raises(ValueError):
+        histogram(ordered, bins=0)
+
+
+def test_quantile_sketch():
+    rng = random.Random(1)
+    values = [rng.lognormvariate(5, 1) for _ in range(5000)] + [0] * 50
+    ordered = sorted(values)
+    sketch = QuantileSketch(0.01, values)
+    for value in (1, 50, 95, 99):
+        exact = ordered[int(value / 100 * (len(ordered) - 1))]
+        assert sketch.percentile(value) == pytest.approx(exact, rel=0.01)
+    assert sketch.percentile(0) == 0
+    assert sketch.percentile(100) == max(values)
+    assert sum(count for _, _, count in sketch.histogram()) == len(values)
+    assert QuantileSketch().percentile(50) is None
+
+    # Partial sketches merge into the same sketch, also after a JSON round trip
+    first = QuantileSketch(0.01, values[:2000])
+    second = QuantileSketch(0.01, values[2000:]).to_dict()
+    merged = first.merge(QuantileSketch.from_dict(json.loads(json.dumps(second))))
+    assert merged.to_dict() == sketch.to_dict()
+    with pytest.raises(ValueError):
+        sketch.merge(QuantileSketch(0.05))
+
+
+def test_robust_statistics():
+    ordered = sorted(VALUES)
+    assert trimmed_mean(ordered, 0) == statistics.mean(VALUES)
+    assert trimmed_mean(ordered, 0.1) == statistics.mean(ordered[1:-1])
+    assert trimmed_mean([1, 2, 100], 0.34) == 2
+    assert median_absolute_deviation([1, 1, 2, 2, 4, 6, 9]) == 1
+    assert MAD_SCALE * median_absolute_deviation([1, 2, 3]) == pytest.approx(1.4826)
+    assert iqr_fences([1, 2, 3, 4, 5]) == (-1, 7)
+    assert iqr_fences([1, 2, 3, 4, 5], factor=0) == (2, 4)
+    with pytest.raises(ValueError):
+        trimmed_mean(ordered, 0.5)
+    with pytest.raises(statistics.StatisticsError):
+        median_absolute_deviation([])
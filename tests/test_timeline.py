@@ -0,0 +1,158 @@
+"""Tests for the interval timeline helpers"""
+import datetime
+import pytest
+from haralyzer.timeline import (
+    EntryOffsets,
+    IntervalTree,
+    bucket_activity,
+    concurrency_profile,
+    idle_periods,
+    merge_intervals,
+    parse_timestamp,
+    timestamp_to_microseconds,
+    to_milliseconds,
+    union_length,
+)
+
+
+def test_merge_intervals():
+    intervals = [(5, 10), (0, 3), (3, 4), (8, 12), (20, 20), (15, 16)]
+    assert merge_intervals(intervals) == [(0, 4), (5, 12), (15, 16)]
+    assert union_length(intervals) == 12
+    assert not merge_intervals([])
+
+
+def test_to_milliseconds():
+    assert to_milliseconds(153000) == 153
+    assert isinstance(to_milliseconds(153000), int)
+    assert to_milliseconds(153500) == 153.5
+
+
+def test_concurrency_profile():
+    profile = concurrency_profile([(0, 4000), (2000, 6000), (4000, 5000)], origin=0)
+    # The first interval ending and the last starting at the same time
+    # should not count as three in flight
+    assert profile["steps"] == [(0, 1), (2, 2), (5, 1), (6, 0)]
+    assert profile["peak"] == 2
+    assert profile["time_at_level"] == {1: 3, 2: 3}
+    assert profile["mean"] == 1.5
+
+    empty = concurrency_profile([])
+    assert empty == {"steps": [], "peak": 0, "mean": 0, "time_at_level": {}}
+
+
+def test_bucket_activity(use_numpy):
+    records = [
+        # 1000 bytes received evenly from 10 to 50
+        (1000, 5000, 1000, 1000),
+        (1000, 2000, 2000, 10),
+        # Zero length request
+        (3500, 3500, 3500, 5),
+    ]
+    buckets = bucket_activity(records, 1000, 1000, use_numpy=use_numpy)
+    assert list(buckets["active"]) == [2, 1, 2, 1]
+    assert list(buckets["starts"]) == [2, 0, 1, 0]
+    assert list(buckets["bytes"]) == pytest.approx([260, 250, 255, 250])
+
+    # Requests starting before the origin are clipped to the first bucket
+    buckets = bucket_activity([(0, 2500, 1500, 100)], 1000, 1000, use_numpy=use_numpy)
+    assert list(buckets["active"]) == [1, 1]
+    assert list(buckets["bytes"]) == pytest.approx([50, 50])
+
+    buckets = bucket_activity([], 0, 1000, use_numpy=use_numpy)
+    assert len(buckets["bytes"]) == len(buckets["active"]) == 0
+    with pytest.raises(ValueError):
+        bucket_activity(records, 0, 0, use_numpy=use_numpy)
+
+
+def test_interval_tree():
+    intervals = [(0, 10), (5, 6), (8, 20), (12, 12), (30, 40), (2, 3)]
+    tree = IntervalTree(intervals, "abcdef")
+    assert tree.active_at(5) == ["a", "b"]
+    assert tree.active_at(10) == ["c"]
+    # Zero length intervals last one unit
+    assert tree.active_at(12) == ["c", "d"]
+    assert tree.active_at(20) == []
+    assert tree.overlapping(6, 13) == ["a", "c", "d"]
+    assert tree.overlapping(-10, 100) == list("abcdef")
+    assert tree.overlapping(20, 30) == []
+
+    # Every window of a larger set matches a linear scan
+    intervals = [(start, start + (start * 7) % 23) for start in range(0, 300, 3)]
+    tree = IntervalTree(intervals)
+    for start in range(-5, 320, 4):
+        for end in (start + 1, start + 17):
+            assert tree.overlapping(start, end) == [
+                position
+                for position, (first, last) in enumerate(intervals)
+                if first < end and max(last, first + 1) > start
+            ]
+
+    assert IntervalTree([]).active_at(0) == []
+    with pytest.raises(ValueError):
+        IntervalTree([(0, 1)], [])
+
+
+def test_parse_timestamp():
+    utc = datetime.datetime(2017, 11, 13, 12, 3, 2, 550000, datetime.timezone.utc)
+    assert parse_timestamp("2017-11-13T12:03:02.550Z") == utc
+    assert parse_timestamp("2017-11-13T04:03:02.55-08:00") == utc
+    # Not ISO 8601, so dateutil parses it
+    assert parse_timestamp("Mon, 13 Nov 2017 12:03:02.550 GMT") == utc
+    assert parse_timestamp("") is None
+    assert parse_timestamp("not a date") is None
+    assert timestamp_to_microseconds("1970-01-01T00:00:01.000001Z") == 1000001
+    assert timestamp_to_microseconds("nope") is None
+
+
+def test_entry_offsets():
+    entries = [
+        {"pageref": "page_1", "startedDateTime": "1970-01-01T00:00:02Z", "time": 5},
+        {"pageref": "page_1", "startedDateTime": "1970-01-01T00:00:01Z", "time": 1},
+        {"startedDateTime": "1970-01-01T00:00:03Z", "time": 0.5},
+        {"startedDateTime": "", "time": 1},
+    ]
+    pages = [{"id": "page_1", "startedDateTime": "1970-01-01T00:00:00.5Z"}]
+    offsets = EntryOffsets(entries, pages)
+    assert offsets.start == [2000000, 1000000, 3000000, None]
+    assert offsets.end == [2005000, 1001000, 3000500, None]
+    assert offsets.origin == 1000000
+    assert offsets.page_origin("page_1") == 500000
+    assert offsets.page_origin("unknown") == 3000000
+    assert offsets.page_origin("missing") == 1000000
+    assert offsets.page_offsets() == (
+        [1500000, 500000, 0, None],
+        [1505000, 501000, 500, None],
+    )
+    assert offsets.position(entries[2]) == 2
+    assert offsets.position(dict(entries[2])) is None
+
+    # Without pages, entries are relative to the first entry of their page
+    assert EntryOffsets(entries).page_origin("page_1") == 1000000
+
+
+def test_idle_periods():
+    # Requests at 0-10 ms and 12-20 ms, then a beacon at 50-51 ms
+    intervals = [(12000, 20000), (0, 10000), (5000, 8000), (50000, 51000)]
+    result = idle_periods(intervals, origin=0, min_gap=5000, quiet_after=15000)
+    assert result["periods"] == [(20, 50)]
+    assert result["busy"] == 19
+    # The 2 ms gap is idle time, even if it is too short to be a period
+    assert result["idle"] == 32
+    assert result["network_quiet"] == 20
+
+    # Quiet only counts once nothing starts for min_gap
+    result = idle_periods(intervals, origin=0, min_gap=40000, quiet_after=15000)
+    assert result["periods"] == []
+    assert result["network_quiet"] == 51
+    # Requests before the origin only count from the origin
+    result = idle_periods(intervals, origin=-5000, quiet_after=-5000)
+    assert result["periods"] == [(0, 5), (15, 17), (25, 55)]
+    assert result["network_quiet"] == 0
+
+    assert idle_periods([], quiet_after=1000) == {
+        "periods": [],
+        "busy": 0,
+        "idle": 0,
+        "network_quiet": 1,
+    }
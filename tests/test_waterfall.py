@@ -0,0 +1,55 @@
+"""Tests for the packed waterfall"""
+import json
+import pytest
+from haralyzer import HarPage
+from haralyzer.waterfall import PHASES, Waterfall
+
+PAGE_ID = "page_3"
+
+
+def test_waterfall(har_data):
+    init_data = har_data("humanssuck.net.har")
+    # Phases that did not apply are -1 in HAR files
+    init_data["log"]["entries"][1]["timings"]["ssl"] = -1
+    page = HarPage(PAGE_ID, har_data=init_data)
+
+    waterfall = page.waterfall()
+    assert len(waterfall) == 4
+    assert list(waterfall.offsets) == [0, 183, 183, 183]
+    assert len(waterfall.durations) == 4 * len(PHASES)
+    assert waterfall.urls == [entry.url for entry in page.entries]
+    assert waterfall[0] == {
+        "url": "http://humanssuck.net/",
+        "offset": 0,
+        "blocked": 77,
+        "dns": 0,
+        "connect": 0,
+        "ssl": 0,
+        "send": 0,
+        "wait": 76,
+        "receive": 0,
+    }
+    assert waterfall[1]["ssl"] == 0
+
+    # Repeated URLs share one string
+    entries = page.entries + page.entries[:2]
+    waterfall = page.waterfall(entries)
+    assert len(waterfall) == 6
+    assert len(waterfall.urls) == 4
+    assert list(waterfall.url_index) == [0, 1, 2, 3, 0, 1]
+
+
+def test_waterfall_serialization(har_data):
+    page = HarPage(PAGE_ID, har_data=har_data("humanssuck.net.har"))
+    waterfall = page.waterfall()
+
+    assert Waterfall.from_bytes(waterfall.to_bytes()) == waterfall
+    assert Waterfall.from_dict(json.loads(waterfall.to_json())) == waterfall
+    assert Waterfall.from_bytes(Waterfall([], [], [], []).to_bytes()) == Waterfall(
+        [], [], [], []
+    )
+
+    with pytest.raises(ValueError):
+        Waterfall.from_bytes(b"NOPE" + waterfall.to_bytes()[4:])
+    with pytest.raises(ValueError):
+        Waterfall([0], [0], [0], ["http://humanssuck.net/"])